@@ -3,15 +3,13 @@
 
 import httpx
 from bs4 import BeautifulSoup, Tag
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 import logging
 import html
 import re
-import tempfile
-import os
 from urllib.parse import urlencode, urljoin, quote
-from markitdown import MarkItDown
 import math # For math.ceil for pagination
+import os
 
 from .models import (
     AnayasaBireyselReportSearchRequest,
@@ -20,6 +18,14 @@ from .models import (
     AnayasaBireyselReportSearchResult,
     AnayasaBireyselBasvuruDocumentMarkdown, # Model for Bireysel Başvuru document
 )
+from common_mcp_module.cache import MemoryCache, get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.parsing import only, parse_html
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers():
@@ -32,7 +38,8 @@ class AnayasaBireyselBasvuruApiClient:
     DOCUMENT_MARKDOWN_CHUNK_SIZE = 5000 # Character limit per page
 
     def __init__(self, request_timeout: float = 60.0):
-        self.http_client = httpx.AsyncClient(
+        self.http_client = create_http_client(
+            "anayasa_bireysel",
             base_url=self.BASE_URL,
             headers={
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -43,6 +50,8 @@ class AnayasaBireyselBasvuruApiClient:
             verify=True,
             follow_redirects=True
         )
+        # Full Markdown plus page metadata per document URL; pages are slices of it
+        self.document_cache = MemoryCache("anayasa_bireysel_documents", max_bytes=int(os.getenv("YARGI_ANAYASA_DOCUMENT_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
 
     def _build_query_params_for_bireysel_report(self, params: AnayasaBireyselReportSearchRequest) -> List[Tuple[str, str]]:
         query_params: List[Tuple[str, str]] = []
@@ -57,6 +66,8 @@ class AnayasaBireyselBasvuruApiClient:
         
         return query_params
 
+    @cache_search("anayasa_bireysel.search", keyword_fields=("keywords",))
+    @coalesce("anayasa_bireysel.search")
     async def search_bireysel_basvuru_report(
         self,
         params: AnayasaBireyselReportSearchRequest
@@ -77,7 +88,8 @@ class AnayasaBireyselBasvuruApiClient:
             logger.error(f"AnayasaBireyselBasvuruApiClient: Error processing Bireysel Başvuru Report search request: {e}")
             raise
 
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Only the report area (or its decision divs, if the area is missing) and the count are built into the tree
+        soup = parse_html(html_content, only("div.bulunankararsayisi", "div.HaberBulteni", "div.KararBulteniBirKarar"))
 
         total_records = None
         bulunan_karar_div = soup.find("div", class_="bulunankararsayisi")
@@ -186,7 +198,25 @@ class AnayasaBireyselBasvuruApiClient:
             retrieved_page_number=params.page_to_fetch
         )
 
-    def _convert_html_to_markdown_bireysel(self, full_decision_html_content: str) -> Optional[str]:
+    def iter_search(
+        self,
+        params: AnayasaBireyselReportSearchRequest,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[AnayasaBireyselReportDecisionSummary]:
+        """
+        Yields up to max_results report entries matching params from page 1 on
+        (params.page_to_fetch is ignored; the site fixes the page size), prefetching the
+        next page while the current one is consumed.
+        """
+        async def fetch_page(page_number: int) -> SearchPage:
+            result = await self.search_bireysel_basvuru_report(params.model_copy(update={"page_to_fetch": page_number}))
+            return SearchPage(result.decisions, result.total_records_found)
+
+        return iter_search_results(fetch_page, max_results, None, on_page)
+
+    @staticmethod
+    def _convert_html_to_markdown_bireysel(full_decision_html_content: str) -> Optional[str]:
         if not full_decision_html_content:
             return None
         
@@ -229,26 +259,104 @@ class AnayasaBireyselBasvuruApiClient:
                 else:
                     html_input_for_markdown = processed_html
         
+        if not html_input_for_markdown.strip().lower().startswith(("<html", "<!doctype")):
+            html_input_for_markdown = f"<html><head><meta charset=\"UTF-8\"></head><body>{html_input_for_markdown}</body></html>"
+
         markdown_text = None
-        temp_file_path = None
         try:
-            md_converter = MarkItDown() 
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_file:
-                if not html_input_for_markdown.strip().lower().startswith(("<html", "<!doctype")):
-                    tmp_file.write(f"<html><head><meta charset=\"UTF-8\"></head><body>{html_input_for_markdown}</body></html>")
-                else:
-                    tmp_file.write(html_input_for_markdown)
-                temp_file_path = tmp_file.name
-            
-            conversion_result = md_converter.convert(temp_file_path)
-            markdown_text = conversion_result.text_content
+            markdown_text = convert_html_to_markdown(html_input_for_markdown)
         except Exception as e:
             logger.error(f"AnayasaBireyselBasvuruApiClient: MarkItDown conversion error: {e}")
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
         return markdown_text
 
+    @staticmethod
+    def _extract_metadata_bireysel(html_content: str) -> Dict[str, Optional[str]]:
+        """Reads the application number, dates, deciding unit, decision type and Resmi Gazete info from a decision page."""
+        basvuru_no_from_page = None
+        karar_tarihi_from_page = None
+        basvuru_tarihi_from_page = None
+        karari_veren_birim_from_page = None
+        karar_turu_from_page = None
+        resmi_gazete_info_from_page = None
+
+        soup = parse_html(html_content, only("meta", "div#KararDetaylari"))
+
+        meta_desc_tag = soup.find("meta", attrs={"name": "description"})
+        if meta_desc_tag and meta_desc_tag.get("content"):
+            content = meta_desc_tag["content"]
+            bn_match = re.search(r"B\.\s*No:\s*([\d\/]+)", content)
+            if bn_match: basvuru_no_from_page = bn_match.group(1).strip()
+            
+            date_match = re.search(r"(\d{1,2}\/\d{1,2}\/\d{4}),\s*§", content)
+            if date_match: karar_tarihi_from_page = date_match.group(1).strip()
+
+        karar_detaylari_tab = soup.find("div", id="KararDetaylari")
+        if karar_detaylari_tab:
+            table = karar_detaylari_tab.find("table", class_="table")
+            if table:
+                rows = table.find_all("tr")
+                for row in rows:
+                    cells = row.find_all("td")
+                    if len(cells) == 2:
+                        key = cells[0].get_text(strip=True)
+                        value = cells[1].get_text(strip=True)
+                        if "Kararı Veren Birim" in key: karari_veren_birim_from_page = value
+                        elif "Karar Türü (Başvuru Sonucu)" in key: karar_turu_from_page = value
+                        elif "Başvuru No" in key and not basvuru_no_from_page: basvuru_no_from_page = value
+                        elif "Başvuru Tarihi" in key: basvuru_tarihi_from_page = value
+                        elif "Karar Tarihi" in key and not karar_tarihi_from_page: karar_tarihi_from_page = value
+                        elif "Resmi Gazete Tarih / Sayı" in key: resmi_gazete_info_from_page = value
+
+        return {
+            "basvuru_no_from_page": basvuru_no_from_page,
+            "karar_tarihi_from_page": karar_tarihi_from_page,
+            "basvuru_tarihi_from_page": basvuru_tarihi_from_page,
+            "karari_veren_birim_from_page": karari_veren_birim_from_page,
+            "karar_turu_from_page": karar_turu_from_page,
+            "resmi_gazete_info_from_page": resmi_gazete_info_from_page
+        }
+
+    @staticmethod
+    def _parse_full_document_bireysel(html_content: str) -> Tuple[Dict[str, Optional[str]], Optional[str]]:
+        """Page metadata and Markdown of a decision page, in one conversion-executor job."""
+        metadata = AnayasaBireyselBasvuruApiClient._extract_metadata_bireysel(html_content)
+        return metadata, AnayasaBireyselBasvuruApiClient._convert_html_to_markdown_bireysel(html_content)
+
+    @coalesce("anayasa_bireysel.full_document")
+    async def _get_full_document(self, full_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the decision's page metadata and full Markdown for a document URL, or None
+        if the page was empty. Downloaded, parsed and converted once per document; later
+        page requests are slices of the memoized result.
+        """
+        full_document = self.document_cache.get(full_url)
+        if full_document is not None:
+            return full_document
+        cached_document = await get_document_cache().aget("anayasa_bireysel", full_url)
+        if cached_document is not None:
+            self.document_cache.set(full_url, cached_document, len(cached_document["markdown"].encode("utf-8")))
+            return cached_document
+
+        response = await self.http_client.get(full_url)
+        response.raise_for_status()
+        html_content_from_api = response.text
+
+        if not isinstance(html_content_from_api, str) or not html_content_from_api.strip():
+            logger.warning(f"AnayasaBireyselBasvuruApiClient: Received empty HTML from {full_url}.")
+            return None
+
+        metadata, full_markdown_content = await get_conversion_executor().run(AnayasaBireyselBasvuruApiClient._parse_full_document_bireysel, html_content_from_api)
+
+        full_document = {
+            "metadata": metadata,
+            "markdown": full_markdown_content
+        }
+        if full_markdown_content:
+            self.document_cache.set(full_url, full_document, len(full_markdown_content.encode("utf-8")))
+            await get_document_cache().aset("anayasa_bireysel", full_url, full_document, metadata={"source_url": full_url})
+        return full_document
+
+    @coalesce("anayasa_bireysel.document")
     async def get_decision_document_as_markdown(
         self,
         document_url_path: str, # e.g. /BB/2021/20295
@@ -257,63 +365,18 @@ class AnayasaBireyselBasvuruApiClient:
         full_url = urljoin(self.BASE_URL, document_url_path)
         logger.info(f"AnayasaBireyselBasvuruApiClient: Fetching Bireysel Başvuru document for Markdown (page {page_number}) from URL: {full_url}")
 
-        basvuru_no_from_page = None
-        karar_tarihi_from_page = None
-        basvuru_tarihi_from_page = None
-        karari_veren_birim_from_page = None
-        karar_turu_from_page = None
-        resmi_gazete_info_from_page = None
-
         try:
-            response = await self.http_client.get(full_url)
-            response.raise_for_status()
-            html_content_from_api = response.text
-
-            if not isinstance(html_content_from_api, str) or not html_content_from_api.strip():
-                logger.warning(f"AnayasaBireyselBasvuruApiClient: Received empty HTML from {full_url}.")
+            full_document = await self._get_full_document(full_url)
+            if full_document is None:
                 return AnayasaBireyselBasvuruDocumentMarkdown(
                     source_url=full_url, markdown_chunk=None, current_page=page_number, total_pages=0, is_paginated=False
                 )
 
-            soup = BeautifulSoup(html_content_from_api, 'html.parser')
-
-            meta_desc_tag = soup.find("meta", attrs={"name": "description"})
-            if meta_desc_tag and meta_desc_tag.get("content"):
-                content = meta_desc_tag["content"]
-                bn_match = re.search(r"B\.\s*No:\s*([\d\/]+)", content)
-                if bn_match: basvuru_no_from_page = bn_match.group(1).strip()
-                
-                date_match = re.search(r"(\d{1,2}\/\d{1,2}\/\d{4}),\s*§", content)
-                if date_match: karar_tarihi_from_page = date_match.group(1).strip()
-
-            karar_detaylari_tab = soup.find("div", id="KararDetaylari")
-            if karar_detaylari_tab:
-                table = karar_detaylari_tab.find("table", class_="table")
-                if table:
-                    rows = table.find_all("tr")
-                    for row in rows:
-                        cells = row.find_all("td")
-                        if len(cells) == 2:
-                            key = cells[0].get_text(strip=True)
-                            value = cells[1].get_text(strip=True)
-                            if "Kararı Veren Birim" in key: karari_veren_birim_from_page = value
-                            elif "Karar Türü (Başvuru Sonucu)" in key: karar_turu_from_page = value
-                            elif "Başvuru No" in key and not basvuru_no_from_page: basvuru_no_from_page = value
-                            elif "Başvuru Tarihi" in key: basvuru_tarihi_from_page = value
-                            elif "Karar Tarihi" in key and not karar_tarihi_from_page: karar_tarihi_from_page = value
-                            elif "Resmi Gazete Tarih / Sayı" in key: resmi_gazete_info_from_page = value
-            
-            full_markdown_content = self._convert_html_to_markdown_bireysel(html_content_from_api)
-
+            full_markdown_content = full_document["markdown"]
             if not full_markdown_content:
                 return AnayasaBireyselBasvuruDocumentMarkdown(
                     source_url=full_url,
-                    basvuru_no_from_page=basvuru_no_from_page,
-                    karar_tarihi_from_page=karar_tarihi_from_page,
-                    basvuru_tarihi_from_page=basvuru_tarihi_from_page,
-                    karari_veren_birim_from_page=karari_veren_birim_from_page,
-                    karar_turu_from_page=karar_turu_from_page,
-                    resmi_gazete_info_from_page=resmi_gazete_info_from_page,
+                    **full_document["metadata"],
                     markdown_chunk=None,
                     current_page=page_number,
                     total_pages=0,
@@ -331,12 +394,7 @@ class AnayasaBireyselBasvuruApiClient:
 
             return AnayasaBireyselBasvuruDocumentMarkdown(
                 source_url=full_url,
-                basvuru_no_from_page=basvuru_no_from_page,
-                karar_tarihi_from_page=karar_tarihi_from_page,
-                basvuru_tarihi_from_page=basvuru_tarihi_from_page,
-                karari_veren_birim_from_page=karari_veren_birim_from_page,
-                karar_turu_from_page=karar_turu_from_page,
-                resmi_gazete_info_from_page=resmi_gazete_info_from_page,
+                **full_document["metadata"],
                 markdown_chunk=markdown_chunk,
                 current_page=current_page_clamped,
                 total_pages=total_pages,
@@ -3,15 +3,13 @@
 
 import httpx
 from bs4 import BeautifulSoup
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 import logging
 import html
 import re
-import tempfile
-import os
 from urllib.parse import urlencode, urljoin, quote
-from markitdown import MarkItDown
 import math # For math.ceil for pagination
+import os
 
 from .models import (
     AnayasaNormDenetimiSearchRequest,
@@ -20,6 +18,14 @@ from .models import (
     AnayasaSearchResult,
     AnayasaDocumentMarkdown, # Model for Norm Denetimi document
 )
+from common_mcp_module.cache import MemoryCache, get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.parsing import only, parse_html
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers():
@@ -29,9 +35,11 @@ class AnayasaMahkemesiApiClient:
     BASE_URL = "https://normkararlarbilgibankasi.anayasa.gov.tr"
     SEARCH_PATH_SEGMENT = "Ara"
     DOCUMENT_MARKDOWN_CHUNK_SIZE = 5000 # Character limit per page
+    MAX_RESULTS_PER_PAGE = 50 # The site offers 10, 20, 30, 40 or 50 results per page
 
     def __init__(self, request_timeout: float = 60.0):
-        self.http_client = httpx.AsyncClient(
+        self.http_client = create_http_client(
+            "anayasa",
             base_url=self.BASE_URL,
             headers={
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -42,6 +50,8 @@ class AnayasaMahkemesiApiClient:
             verify=True,
             follow_redirects=True
         )
+        # Full Markdown plus page metadata per document URL; pages are slices of it
+        self.document_cache = MemoryCache("anayasa_documents", max_bytes=int(os.getenv("YARGI_ANAYASA_DOCUMENT_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
 
     def _build_search_query_params_for_aym(self, params: AnayasaNormDenetimiSearchRequest) -> List[Tuple[str, str]]:
         query_params: List[Tuple[str, str]] = []
@@ -86,6 +96,8 @@ class AnayasaMahkemesiApiClient:
             query_params.append(("page", str(params.page_to_fetch)))
         return query_params
 
+    @cache_search("anayasa.search", keyword_fields=("keywords_all", "keywords_any", "keywords_exclude"))
+    @coalesce("anayasa.search")
     async def search_norm_denetimi_decisions(
         self,
         params: AnayasaNormDenetimiSearchRequest
@@ -115,7 +127,8 @@ class AnayasaMahkemesiApiClient:
             logger.error(f"AnayasaMahkemesiApiClient: Error processing Norm Denetimi search request: {e}")
             raise
 
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Parsed whole: the details table of a decision is found through its sibling div
+        soup = parse_html(html_content)
 
         total_records = None
         bulunan_karar_div = soup.find("div", class_="bulunankararsayisi")
@@ -187,7 +200,28 @@ class AnayasaMahkemesiApiClient:
             retrieved_page_number=params.page_to_fetch
         )
 
-    def _convert_html_to_markdown_norm_denetimi(self, full_decision_html_content: str) -> Optional[str]:
+    def iter_search(
+        self,
+        params: AnayasaNormDenetimiSearchRequest,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[AnayasaDecisionSummary]:
+        """
+        Yields up to max_results decisions matching params, fetching pages of the largest
+        offered size from page 1 (results_per_page/page_to_fetch of params are ignored) and
+        prefetching the next page while the current one is consumed.
+        """
+        results_per_page = min(self.MAX_RESULTS_PER_PAGE, max(10, math.ceil(max_results / 10) * 10))
+
+        async def fetch_page(page_number: int) -> SearchPage:
+            result = await self.search_norm_denetimi_decisions(
+                params.model_copy(update={"results_per_page": results_per_page, "page_to_fetch": page_number}))
+            return SearchPage(result.decisions, result.total_records_found)
+
+        return iter_search_results(fetch_page, max_results, results_per_page, on_page)
+
+    @staticmethod
+    def _convert_html_to_markdown_norm_denetimi(full_decision_html_content: str) -> Optional[str]:
         """Converts direct HTML content from an Anayasa Mahkemesi Norm Denetimi decision page to Markdown."""
         if not full_decision_html_content:
             return None
@@ -221,27 +255,109 @@ class AnayasaMahkemesiApiClient:
                 body_tag = soup.find("body")
                 html_input_for_markdown = str(body_tag) if body_tag else processed_html
         
+        # Ensure the content is wrapped in basic HTML structure if it's not already
+        if not html_input_for_markdown.strip().lower().startswith(("<html", "<!doctype")):
+            html_input_for_markdown = f"<html><head><meta charset=\"UTF-8\"></head><body>{html_input_for_markdown}</body></html>"
+
         markdown_text = None
-        temp_file_path = None
         try:
-            md_converter = MarkItDown() 
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_file:
-                # Ensure the content is wrapped in basic HTML structure if it's not already
-                if not html_input_for_markdown.strip().lower().startswith(("<html", "<!doctype")):
-                    tmp_file.write(f"<html><head><meta charset=\"UTF-8\"></head><body>{html_input_for_markdown}</body></html>")
-                else:
-                    tmp_file.write(html_input_for_markdown)
-                temp_file_path = tmp_file.name
-            
-            conversion_result = md_converter.convert(temp_file_path)
-            markdown_text = conversion_result.text_content
+            markdown_text = convert_html_to_markdown(html_input_for_markdown)
         except Exception as e:
             logger.error(f"AnayasaMahkemesiApiClient: MarkItDown conversion error: {e}")
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
         return markdown_text
 
+    @staticmethod
+    def _extract_metadata_norm_denetimi(html_content: str) -> Dict[str, Optional[str]]:
+        """Reads the E.K. No, decision date and Resmi Gazete info from a Norm Denetimi decision page."""
+        decision_ek_no_from_page = None
+        decision_date_from_page = None
+        official_gazette_from_page = None
+
+        # Extract metadata from the page content (E.K. No, Date, RG)
+        soup = parse_html(html_content, only("div.KararMetni", "div.WordSection1"))
+        karar_metni_div = soup.find("div", class_="KararMetni") # Usually within div#Karar
+        if not karar_metni_div: # Fallback if not in KararMetni
+            karar_metni_div = soup.find("div", class_="WordSection1")
+        
+        if karar_metni_div:
+            # Attempt to find E.K. No (Esas No, Karar No)
+            # Norm Denetimi pages often have this in bold <p> tags directly or in the WordSection1
+            # Look for patterns like "Esas No.: YYYY/NN" and "Karar No.: YYYY/NN"
+            
+            esas_no_tag = karar_metni_div.find(lambda tag: tag.name == "p" and tag.find("b") and "Esas No.:" in tag.find("b").get_text())
+            karar_no_tag = karar_metni_div.find(lambda tag: tag.name == "p" and tag.find("b") and "Karar No.:" in tag.find("b").get_text())
+            karar_tarihi_tag = karar_metni_div.find(lambda tag: tag.name == "p" and tag.find("b") and "Karar tarihi:" in tag.find("b").get_text()) # Less common on Norm pages
+            resmi_gazete_tag = karar_metni_div.find(lambda tag: tag.name == "p" and ("Resmî Gazete tarih ve sayısı:" in tag.get_text() or "Resmi Gazete tarih/sayı:" in tag.get_text()))
+
+
+            if esas_no_tag and esas_no_tag.find("b") and karar_no_tag and karar_no_tag.find("b"):
+                esas_str = esas_no_tag.find("b").get_text(strip=True).replace('Esas No.:', '').strip()
+                karar_str = karar_no_tag.find("b").get_text(strip=True).replace('Karar No.:', '').strip()
+                decision_ek_no_from_page = f"E.{esas_str}, K.{karar_str}"
+            
+            if karar_tarihi_tag and karar_tarihi_tag.find("b"):
+                 decision_date_from_page = karar_tarihi_tag.find("b").get_text(strip=True).replace("Karar tarihi:", "").strip()
+            elif karar_metni_div: # Fallback for Karar Tarihi if not in specific tag
+                date_match = re.search(r"Karar Tarihi\s*:\s*([\d\.]+)", karar_metni_div.get_text()) # Norm pages often use DD.MM.YYYY
+                if date_match: decision_date_from_page = date_match.group(1).strip()
+
+
+            if resmi_gazete_tag:
+                # Try to get the bold part first if it exists
+                bold_rg_tag = resmi_gazete_tag.find("b")
+                rg_text_content = bold_rg_tag.get_text(strip=True) if bold_rg_tag else resmi_gazete_tag.get_text(strip=True)
+                official_gazette_from_page = rg_text_content.replace("Resmî Gazete tarih ve sayısı:", "").replace("Resmi Gazete tarih/sayı:", "").strip()
+
+        return {
+            "decision_reference_no_from_page": decision_ek_no_from_page,
+            "decision_date_from_page": decision_date_from_page,
+            "official_gazette_info_from_page": official_gazette_from_page
+        }
+
+    @staticmethod
+    def _parse_full_document_norm_denetimi(html_content: str) -> Tuple[Dict[str, Optional[str]], Optional[str]]:
+        """Page metadata and Markdown of a decision page, in one conversion-executor job."""
+        metadata = AnayasaMahkemesiApiClient._extract_metadata_norm_denetimi(html_content)
+        return metadata, AnayasaMahkemesiApiClient._convert_html_to_markdown_norm_denetimi(html_content)
+
+    @coalesce("anayasa.full_document")
+    async def _get_full_document(self, full_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the decision's page metadata and full Markdown for a document URL, or None
+        if the page was empty. The download, metadata extraction and conversion happen once
+        per document; every later page request is a slice of the memoized result (kept in
+        memory and in the on-disk document cache).
+        """
+        full_document = self.document_cache.get(full_url)
+        if full_document is not None:
+            return full_document
+        cached_document = await get_document_cache().aget("anayasa", full_url)
+        if cached_document is not None:
+            self.document_cache.set(full_url, cached_document, len(cached_document["markdown"].encode("utf-8")))
+            return cached_document
+
+        # Use a new client instance for document fetching if headers/timeout needs to be different,
+        # or reuse self.http_client if settings are compatible. For now, self.http_client.
+        get_response = await self.http_client.get(full_url, headers={"Accept": "text/html"})
+        get_response.raise_for_status()
+        html_content_from_api = get_response.text
+
+        if not isinstance(html_content_from_api, str) or not html_content_from_api.strip():
+            logger.warning(f"AnayasaMahkemesiApiClient: Received empty or non-string HTML from URL {full_url}.")
+            return None
+
+        metadata, full_markdown_content = await get_conversion_executor().run(AnayasaMahkemesiApiClient._parse_full_document_norm_denetimi, html_content_from_api)
+
+        full_document = {
+            "metadata": metadata,
+            "markdown": full_markdown_content
+        }
+        if full_markdown_content:
+            self.document_cache.set(full_url, full_document, len(full_markdown_content.encode("utf-8")))
+            await get_document_cache().aset("anayasa", full_url, full_document, metadata={"source_url": full_url})
+        return full_document
+
+    @coalesce("anayasa.document")
     async def get_decision_document_as_markdown(
         self,
         document_url: str,
@@ -254,67 +370,18 @@ class AnayasaMahkemesiApiClient:
         full_url = urljoin(self.BASE_URL, document_url) if not document_url.startswith("http") else document_url
         logger.info(f"AnayasaMahkemesiApiClient: Fetching Norm Denetimi document for Markdown (page {page_number}) from URL: {full_url}")
 
-        decision_ek_no_from_page = None
-        decision_date_from_page = None
-        official_gazette_from_page = None
-
         try:
-            # Use a new client instance for document fetching if headers/timeout needs to be different,
-            # or reuse self.http_client if settings are compatible. For now, self.http_client.
-            get_response = await self.http_client.get(full_url, headers={"Accept": "text/html"})
-            get_response.raise_for_status()
-            html_content_from_api = get_response.text
-
-            if not isinstance(html_content_from_api, str) or not html_content_from_api.strip():
-                logger.warning(f"AnayasaMahkemesiApiClient: Received empty or non-string HTML from URL {full_url}.")
+            full_document = await self._get_full_document(full_url)
+            if full_document is None:
                 return AnayasaDocumentMarkdown(
                     source_url=full_url, markdown_chunk=None, current_page=page_number, total_pages=0, is_paginated=False
                 )
 
-            # Extract metadata from the page content (E.K. No, Date, RG)
-            soup = BeautifulSoup(html_content_from_api, "html.parser")
-            karar_metni_div = soup.find("div", class_="KararMetni") # Usually within div#Karar
-            if not karar_metni_div: # Fallback if not in KararMetni
-                karar_metni_div = soup.find("div", class_="WordSection1")
-            
-            if karar_metni_div:
-                # Attempt to find E.K. No (Esas No, Karar No)
-                # Norm Denetimi pages often have this in bold <p> tags directly or in the WordSection1
-                # Look for patterns like "Esas No.: YYYY/NN" and "Karar No.: YYYY/NN"
-                
-                esas_no_tag = karar_metni_div.find(lambda tag: tag.name == "p" and tag.find("b") and "Esas No.:" in tag.find("b").get_text())
-                karar_no_tag = karar_metni_div.find(lambda tag: tag.name == "p" and tag.find("b") and "Karar No.:" in tag.find("b").get_text())
-                karar_tarihi_tag = karar_metni_div.find(lambda tag: tag.name == "p" and tag.find("b") and "Karar tarihi:" in tag.find("b").get_text()) # Less common on Norm pages
-                resmi_gazete_tag = karar_metni_div.find(lambda tag: tag.name == "p" and ("Resmî Gazete tarih ve sayısı:" in tag.get_text() or "Resmi Gazete tarih/sayı:" in tag.get_text()))
-
-
-                if esas_no_tag and esas_no_tag.find("b") and karar_no_tag and karar_no_tag.find("b"):
-                    esas_str = esas_no_tag.find("b").get_text(strip=True).replace('Esas No.:', '').strip()
-                    karar_str = karar_no_tag.find("b").get_text(strip=True).replace('Karar No.:', '').strip()
-                    decision_ek_no_from_page = f"E.{esas_str}, K.{karar_str}"
-                
-                if karar_tarihi_tag and karar_tarihi_tag.find("b"):
-                     decision_date_from_page = karar_tarihi_tag.find("b").get_text(strip=True).replace("Karar tarihi:", "").strip()
-                elif karar_metni_div: # Fallback for Karar Tarihi if not in specific tag
-                    date_match = re.search(r"Karar Tarihi\s*:\s*([\d\.]+)", karar_metni_div.get_text()) # Norm pages often use DD.MM.YYYY
-                    if date_match: decision_date_from_page = date_match.group(1).strip()
-
-
-                if resmi_gazete_tag:
-                    # Try to get the bold part first if it exists
-                    bold_rg_tag = resmi_gazete_tag.find("b")
-                    rg_text_content = bold_rg_tag.get_text(strip=True) if bold_rg_tag else resmi_gazete_tag.get_text(strip=True)
-                    official_gazette_from_page = rg_text_content.replace("Resmî Gazete tarih ve sayısı:", "").replace("Resmi Gazete tarih/sayı:", "").strip()
-
-
-            full_markdown_content = self._convert_html_to_markdown_norm_denetimi(html_content_from_api)
-
+            full_markdown_content = full_document["markdown"]
             if not full_markdown_content:
                 return AnayasaDocumentMarkdown(
                     source_url=full_url,
-                    decision_reference_no_from_page=decision_ek_no_from_page,
-                    decision_date_from_page=decision_date_from_page,
-                    official_gazette_info_from_page=official_gazette_from_page,
+                    **full_document["metadata"],
                     markdown_chunk=None,
                     current_page=page_number,
                     total_pages=0,
@@ -332,9 +399,7 @@ class AnayasaMahkemesiApiClient:
 
             return AnayasaDocumentMarkdown(
                 source_url=full_url,
-                decision_reference_no_from_page=decision_ek_no_from_page,
-                decision_date_from_page=decision_date_from_page,
-                official_gazette_info_from_page=official_gazette_from_page,
+                **full_document["metadata"],
                 markdown_chunk=markdown_chunk,
                 current_page=current_page_clamped,
                 total_pages=total_pages,
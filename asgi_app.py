@@ -18,7 +18,15 @@ from starlette.requests import Request
 from starlette.responses import JSONResponse, PlainTextResponse
 
 # Import the main MCP app
-from mcp_server_main import app as mcp_server
+from mcp_server_main import app as mcp_server, clients, lifecycle
+from common_mcp_module.breaker import get_breaker_registry
+from common_mcp_module.cache import get_document_cache
+from common_mcp_module.coalescing import get_request_coalescer
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.limiter import get_limiter_registry
+from common_mcp_module.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, cache_families, get_metrics_registry
+from common_mcp_module.search_cache import get_search_cache
+from common_mcp_module.transport import get_transport_registry
 
 # Add a health check endpoint
 @mcp_server.custom_route("/health", methods=["GET"])
@@ -35,7 +43,8 @@ async def root(request: Request) -> JSONResponse:
         "endpoints": {
             "mcp": "/mcp/",
             "health": "/health",
-            "status": "/status"
+            "status": "/status",
+            "metrics": "/metrics"
         },
         "supported_databases": [
             "Yargıtay (Court of Cassation)",
@@ -59,13 +68,68 @@ async def status(request: Request) -> JSONResponse:
             "description": tool.description[:100] + "..." if len(tool.description) > 100 else tool.description
         })
     
+    # Client-specific sections only for clients already in use; reading them must not load the rest
+    loaded = clients.loaded()
+    client_stats = {}
+    if "kik" in loaded:
+        kik_client = loaded["kik"]
+        client_stats["kik_browser"] = kik_client.browser_stats()
+        client_stats["kik_page_pool"] = kik_client.page_pool.stats()
+        client_stats["kik_search_engine"] = {
+            "mode": kik_client.search_engine,
+            **kik_client.search_engine_counters
+        }
+    if "rekabet" in loaded:
+        client_stats["rekabet_pdf_cache"] = loaded["rekabet"].pdf_cache.stats()
+    anayasa_document_cache = {
+        section: loaded[name].document_cache.stats()
+        for section, name in (("norm_denetimi", "anayasa_norm"), ("bireysel_basvuru", "anayasa_bireysel"))
+        if name in loaded
+    }
+    if anayasa_document_cache:
+        client_stats["anayasa_document_cache"] = anayasa_document_cache
+
     return JSONResponse({
         "status": "operational",
         "tools": tools,
         "total_tools": len(tools),
-        "transport": "streamable_http"
+        "transport": "streamable_http",
+        "lifecycle": lifecycle.stats(),
+        "clients": clients.stats(),
+        "document_cache": get_document_cache().stats(),
+        "http_pools": get_transport_registry().stats(),
+        "upstream_limits": get_limiter_registry().stats(),
+        "circuit_breakers": get_breaker_registry().stats(),
+        "request_coalescing": get_request_coalescer().stats(),
+        "search_cache": get_search_cache().stats(),
+        **client_stats
     })
 
+def collect_component_metrics():
+    """Cache hit ratios and conversion queue depth, read from the components' own counters."""
+    loaded = clients.loaded()
+    memo_caches = [loaded["rekabet"].pdf_cache] if "rekabet" in loaded else []
+    memo_caches += [loaded[name].document_cache for name in ("anayasa_norm", "anayasa_bireysel") if name in loaded]
+    caches = {
+        "document": get_document_cache().stats()["sources"],
+        "search": get_search_cache().stats()["operations"],
+        **{cache.name: {"": cache.stats()} for cache in memo_caches}
+    }
+    conversion = get_conversion_executor().stats()
+    return cache_families(caches) + [
+        ("yargi_conversion_in_flight", "gauge", "Document conversions running or queued.", [({}, conversion["in_flight"])])
+    ]
+
+get_metrics_registry().add_collector(collect_component_metrics)
+
+@mcp_server.custom_route("/metrics", methods=["GET"])
+async def metrics(request: Request) -> PlainTextResponse:
+    """Prometheus scrape endpoint"""
+    registry = get_metrics_registry()
+    if not registry.enabled:
+        return PlainTextResponse("Metrics are disabled (YARGI_METRICS_ENABLED=false).\n", status_code=404)
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Configure CORS middleware
 cors_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 custom_middleware = [
@@ -2,17 +2,23 @@
 
 import httpx
 import base64
-from typing import Optional
+from typing import AsyncIterator, Optional
 import logging
-from markitdown import MarkItDown
-import tempfile
-import os
 
 from .models import (
-    BedestenSearchRequest, BedestenSearchResponse,
+    BedestenSearchRequest, BedestenSearchResponse, BedestenDecisionEntry,
     BedestenDocumentRequest, BedestenDocumentResponse,
     BedestenDocumentMarkdown, BedestenDocumentRequestData
 )
+from common_mcp_module.cache import get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown, convert_pdf_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.metrics import phase_timer
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.retry import READ_ONLY
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -24,9 +30,11 @@ class BedestenApiClient:
     BASE_URL = "https://bedesten.adalet.gov.tr"
     SEARCH_ENDPOINT = "/emsal-karar/searchDocuments"
     DOCUMENT_ENDPOINT = "/emsal-karar/getDocumentContent"
+    MAX_PAGE_SIZE = 100 # Largest pageSize the search endpoint accepts
     
     def __init__(self, request_timeout: float = 60.0):
-        self.http_client = httpx.AsyncClient(
+        self.http_client = create_http_client(
+            "bedesten",
             base_url=self.BASE_URL,
             headers={
                 "Accept": "*/*",
@@ -43,6 +51,8 @@ class BedestenApiClient:
             timeout=request_timeout
         )
     
+    @cache_search("bedesten.search", keyword_fields=("data.phrase",))
+    @coalesce("bedesten.search")
     async def search_documents(self, search_request: BedestenSearchRequest) -> BedestenSearchResponse:
         """
         Search for documents using Bedesten API.
@@ -53,13 +63,16 @@ class BedestenApiClient:
         try:
             response = await self.http_client.post(
                 self.SEARCH_ENDPOINT, 
-                json=search_request.model_dump()
+                json=search_request.model_dump(),
+                extensions=READ_ONLY
             )
             response.raise_for_status()
-            response_json = response.json()
+            with phase_timer("parse"):
+                response_json = response.json()
             
             # Parse and return the response
-            return BedestenSearchResponse(**response_json)
+            with phase_timer("validate"):
+                return BedestenSearchResponse(**response_json)
             
         except httpx.RequestError as e:
             logger.error(f"BedestenApiClient: HTTP request error during search: {e}")
@@ -67,12 +80,37 @@ class BedestenApiClient:
         except Exception as e:
             logger.error(f"BedestenApiClient: Error processing search response: {e}")
             raise
+
+    def iter_search(
+        self,
+        search_request: BedestenSearchRequest,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[BedestenDecisionEntry]:
+        """
+        Yields up to max_results decisions matching search_request, fetching pages of the
+        largest allowed size from page 1 (data.pageSize/pageNumber are ignored) and
+        prefetching the next page while the current one is consumed.
+        """
+        page_size = min(self.MAX_PAGE_SIZE, max(1, max_results))
+
+        async def fetch_page(page_number: int) -> SearchPage:
+            page_data = search_request.data.model_copy(update={"pageSize": page_size, "pageNumber": page_number})
+            response = await self.search_documents(search_request.model_copy(update={"data": page_data}))
+            return SearchPage(response.data.emsalKararList, response.data.total)
+
+        return iter_search_results(fetch_page, max_results, page_size, on_page)
     
+    @coalesce("bedesten.document")
     async def get_document_as_markdown(self, document_id: str) -> BedestenDocumentMarkdown:
         """
         Get document content and convert to markdown.
         Handles both HTML (text/html) and PDF (application/pdf) content types.
         """
+        cached_document = await get_document_cache().aget("bedesten", document_id)
+        if cached_document is not None:
+            return BedestenDocumentMarkdown(**cached_document)
+
         logger.info(f"BedestenApiClient: Fetching document for markdown conversion (ID: {document_id})")
         
         try:
@@ -84,11 +122,14 @@ class BedestenApiClient:
             # Get document
             response = await self.http_client.post(
                 self.DOCUMENT_ENDPOINT,
-                json=doc_request.model_dump()
+                json=doc_request.model_dump(),
+                extensions=READ_ONLY
             )
             response.raise_for_status()
-            response_json = response.json()
-            doc_response = BedestenDocumentResponse(**response_json)
+            with phase_timer("parse"):
+                response_json = response.json()
+            with phase_timer("validate"):
+                doc_response = BedestenDocumentResponse(**response_json)
             
             # Decode base64 content
             content_bytes = base64.b64decode(doc_response.data.content)
@@ -97,21 +138,27 @@ class BedestenApiClient:
             logger.info(f"BedestenApiClient: Document mime type: {mime_type}")
             
             # Convert to markdown based on mime type
+            conversion_succeeded = False
             if mime_type == "text/html":
                 html_content = content_bytes.decode('utf-8')
-                markdown_content = self._convert_html_to_markdown(html_content)
+                markdown_content = await get_conversion_executor().run(BedestenApiClient._convert_html_to_markdown, html_content)
+                conversion_succeeded = bool(markdown_content) and not markdown_content.startswith("Error converting")
             elif mime_type == "application/pdf":
-                markdown_content = self._convert_pdf_to_markdown(content_bytes)
+                markdown_content = await get_conversion_executor().run(BedestenApiClient._convert_pdf_to_markdown, content_bytes)
+                conversion_succeeded = bool(markdown_content) and not markdown_content.startswith("Error converting")
             else:
                 logger.warning(f"Unsupported mime type: {mime_type}")
                 markdown_content = f"Unsupported content type: {mime_type}. Unable to convert to markdown."
             
-            return BedestenDocumentMarkdown(
+            document = BedestenDocumentMarkdown(
                 documentId=document_id,
                 markdown_content=markdown_content,
                 source_url=f"{self.BASE_URL}/document/{document_id}",
                 mime_type=mime_type
             )
+            if conversion_succeeded: # Error placeholders are not cached so they can be retried
+                await get_document_cache().aset("bedesten", document_id, document.model_dump(mode="json"), metadata={"source_url": document.source_url, "mime_type": mime_type})
+            return document
             
         except httpx.RequestError as e:
             logger.error(f"BedestenApiClient: HTTP error fetching document {document_id}: {e}")
@@ -120,23 +167,14 @@ class BedestenApiClient:
             logger.error(f"BedestenApiClient: Error processing document {document_id}: {e}")
             raise
     
-    def _convert_html_to_markdown(self, html_content: str) -> Optional[str]:
+    @staticmethod
+    def _convert_html_to_markdown(html_content: str) -> Optional[str]:
         """Convert HTML to Markdown using MarkItDown"""
         if not html_content:
             return None
             
-        temp_file_path = None
         try:
-            md_converter = MarkItDown()
-            
-            # Write HTML to temp file
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp:
-                tmp.write(html_content)
-                temp_file_path = tmp.name
-            
-            # Convert
-            result = md_converter.convert(temp_file_path)
-            markdown_content = result.text_content
+            markdown_content = convert_html_to_markdown(html_content)
             
             logger.info("Successfully converted HTML to Markdown")
             return markdown_content
@@ -144,28 +182,16 @@ class BedestenApiClient:
         except Exception as e:
             logger.error(f"Error converting HTML to Markdown: {e}")
             return f"Error converting HTML content: {str(e)}"
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
     
-    def _convert_pdf_to_markdown(self, pdf_bytes: bytes) -> Optional[str]:
+    @staticmethod
+    def _convert_pdf_to_markdown(pdf_bytes: bytes) -> Optional[str]:
         """Convert PDF to Markdown using MarkItDown"""
         if not pdf_bytes:
             return None
             
-        temp_file_path = None
         try:
             # MarkItDown supports PDF with markitdown[pdf]
-            md_converter = MarkItDown()
-            
-            # Write PDF to temp file
-            with tempfile.NamedTemporaryFile(mode="wb", delete=False, suffix=".pdf") as tmp:
-                tmp.write(pdf_bytes)
-                temp_file_path = tmp.name
-            
-            # Convert
-            result = md_converter.convert(temp_file_path)
-            markdown_content = result.text_content
+            markdown_content = convert_pdf_to_markdown(pdf_bytes)
             
             logger.info("Successfully converted PDF to Markdown")
             return markdown_content
@@ -173,9 +199,6 @@ class BedestenApiClient:
         except Exception as e:
             logger.error(f"Error converting PDF to Markdown: {e}")
             return f"Error converting PDF content: {str(e)}. The document may be corrupted or in an unsupported format."
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
     
     async def close_client_session(self):
         """Close HTTP client session"""
@@ -0,0 +1,662 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark of every client's search and document paths.
+
+Upstream responses are replayed through an httpx.MockTransport (see replay.py), so the
+numbers are the cost of our own code: parsing the response, validating it into the
+Pydantic models and converting documents to Markdown. Responses come from recordings
+under benchmarks/fixtures/ when present (`--record` captures them from the live sites)
+and from synthetic pages with the structure of the real ones otherwise; the report
+flags every operation that ran on synthetic responses, and --require-recorded makes
+such a run fail. No recordings are committed yet, so until they are, the numbers
+measure our code on hand-written markup rather than the real court pages. The document
+cache, the search cache and the clients' in-memory memoization are disabled, and
+conversion runs on the calling thread so it is measured like the rest.
+
+For each operation the benchmark reports p50/p99/mean latency, the mean split into
+parse (json, BeautifulSoup), validate (Pydantic), convert (Markdown/PDF conversion),
+http (httpx) and other, and the peak memory allocated by one call.
+
+Usage:
+    python benchmarks/bench_clients.py
+    python benchmarks/bench_clients.py --iterations 100 --only yargitay rekabet
+    python benchmarks/bench_clients.py --json baseline.json
+    python benchmarks/bench_clients.py --compare baseline.json --threshold 0.2
+    python benchmarks/bench_clients.py --record   # needs network access
+    python benchmarks/bench_clients.py --require-recorded
+"""
+
+import os
+
+# Measure the work itself: no caches, KİK searches over HTTP only (set before the clients are imported)
+os.environ["YARGI_CACHE_ENABLED"] = "false"
+os.environ["YARGI_SEARCH_CACHE_ENABLED"] = "false"
+os.environ["YARGI_KIK_SEARCH_ENGINE"] = "http"
+
+import argparse
+import asyncio
+import base64
+import cProfile
+import json
+import logging
+import pstats
+import statistics
+import sys
+import time
+import tracemalloc
+from concurrent.futures import Executor, Future
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from bench_conversion import build_decision_html
+from bench_parsing import bireysel_page, kik_page, rekabet_page, site_chrome, uyusmazlik_page
+from replay import FixtureStore, RecordingTransport, Route, install_transport, replay_transport
+
+from anayasa_mcp_module.bireysel_client import AnayasaBireyselBasvuruApiClient
+from anayasa_mcp_module.client import AnayasaMahkemesiApiClient
+from anayasa_mcp_module.models import AnayasaBireyselReportSearchRequest, AnayasaNormDenetimiSearchRequest
+from bedesten_mcp_module.client import BedestenApiClient
+from bedesten_mcp_module.models import BedestenSearchData, BedestenSearchRequest
+from common_mcp_module.cache import MemoryCache
+from common_mcp_module.executor import get_conversion_executor
+from danistay_mcp_module.client import DanistayApiClient
+from danistay_mcp_module.models import DanistayKeywordSearchRequest
+from emsal_mcp_module.client import EmsalApiClient
+from emsal_mcp_module.models import EmsalSearchRequest
+from kik_mcp_module.client import KikApiClient
+from kik_mcp_module.models import KikSearchRequest
+from rekabet_mcp_module.client import RekabetKurumuApiClient
+from rekabet_mcp_module.models import RekabetKurumuSearchRequest
+from uyusmazlik_mcp_module.client import UyusmazlikApiClient
+from uyusmazlik_mcp_module.models import UyusmazlikSearchRequest
+from yargitay_mcp_module.client import YargitayOfficialApiClient
+from yargitay_mcp_module.models import YargitayDetailedSearchRequest
+
+STAGES = ("parse", "validate", "convert", "http", "other")
+# Code locations (file paths, or names of C functions) whose own time counts towards a stage
+STAGE_MARKERS = (
+    ("parse", ("/bs4/", "/soupsieve/", "/lxml/", "/html/parser.py", "/_markupbase.py", "/json/", "_json.")),
+    ("validate", ("/pydantic/", "/pydantic_core/", "pydantic_core.")),
+    ("http", ("/httpx/", "/httpcore/", "/h11/", "/anyio/")),
+)
+
+
+# --- Synthetic stand-ins for the upstream responses ---
+
+def decision_paragraphs(paragraphs: int) -> str:
+    return "".join(
+        f"<p>{i}. Başvuru dosyası incelendi; itirazın kabulüne ilişkin gerekçeler Anayasa'nın ilgili "
+        f"maddeleri çerçevesinde değerlendirilerek aşağıdaki sonuca ulaşılmıştır.</p>"
+        for i in range(paragraphs)
+    )
+
+
+def api_search_response(records: int = 10) -> dict:
+    """Yargıtay, Danıştay and Emsal answer searches with the same DataTables-style JSON."""
+    return {"data": {"data": [
+        {"id": str(900000 + i), "daire": "3. Hukuk Dairesi", "esasNo": f"2024/{i + 1}", "kararNo": f"2024/{i + 500}",
+         "kararTarihi": "01.02.2024", "arananKelime": "arsa payı", "durum": "KESİNLEŞTİ"}
+        for i in range(records)
+    ], "recordsTotal": 1234, "recordsFiltered": 1234, "draw": 1}}
+
+
+def bedesten_search_response(records: int = 10) -> dict:
+    return {"data": {"emsalKararList": [
+        {"documentId": str(1100000 + i), "itemType": {"name": "YARGITAYKARARI", "description": "Yargıtay Kararı"},
+         "birimId": "1", "birimAdi": "3. Hukuk Dairesi", "esasNoYil": 2024, "esasNoSira": i + 1, "kararNoYil": 2024,
+         "kararNoSira": i + 500, "kararTuru": "Bozma", "kararTarihi": "2024-02-01T00:00:00+03:00",
+         "kararTarihiStr": "01.02.2024", "kesinlesmeDurumu": "Kesinleşti", "kararNo": f"2024/{i + 500}", "esasNo": f"2024/{i + 1}"}
+        for i in range(records)
+    ], "total": 1234, "start": 0}, "metadata": {"FMTY": "SUCCESS"}}
+
+
+def anayasa_norm_search_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    decisions = "".join(
+        f'<div class="birkarar"><a href="/ND/2023/{i + 1}"><div class="bkararbaslik">E.2023/{i + 1}, K.2024/{i + 10} Sayılı Karar'
+        f'<div class="BulunanKelimeSayisi">Bulunan Kelime Sayısı {i + 2}</div></div></a>'
+        f'<div class="kararbilgileri">İptal Davası|Cumhurbaşkanı|İptal|Karar Tarihi: 0{i % 9 + 1}/02/2024</div></div>'
+        f'<div class="col-sm-12"><table class="table"><tbody><tr><td>7315</td><td>{i + 5}</td><td>Esas - İptal</td>'
+        f'<td>Anayasaya aykırılık</td><td>2, 13, 35</td><td>9 ay</td></tr></tbody></table></div>'
+        for i in range(10)
+    )
+    return f'{header}<div class="bulunankararsayisi">87 Karar Bulundu</div>{decisions}{footer}'
+
+
+def anayasa_norm_document_page(links: int, paragraphs: int) -> str:
+    header, footer = site_chrome(links)
+    return (f'{header}<div id="Karar"><div class="KararMetni"><p><b>Esas No.: 2023/45</b></p><p><b>Karar No.: 2024/12</b></p>'
+            f'<p>Karar Tarihi: 01.02.2024</p><p>Resmî Gazete tarih ve sayısı: 01.03.2024 - 32000</p>'
+            f'<div class="WordSection1">{decision_paragraphs(paragraphs)}</div></div></div>{footer}')
+
+
+def bireysel_document_page(links: int, paragraphs: int) -> str:
+    header, footer = site_chrome(links)
+    header = header.replace("</head>", '<meta name="description" content="B. No: 2019/19126, 03/04/2022, § 1-120"></head>')
+    details = "".join(f"<tr><td>{key}</td><td>{value}</td></tr>" for key, value in (
+        ("Kararı Veren Birim", "Genel Kurul"), ("Karar Türü (Başvuru Sonucu)", "Esas (İhlal)"),
+        ("Başvuru Tarihi", "01/02/2019"), ("Resmi Gazete Tarih / Sayı", "01/06/2022 - 31853")))
+    return (f'{header}<div id="KararDetaylari"><table class="table">{details}</table></div>'
+            f'<div id="Karar"><span class="kararHtml"><div class="WordSection1">{decision_paragraphs(paragraphs)}</div></span></div>{footer}')
+
+
+def html_document_page(links: int, paragraphs: int) -> str:
+    header, footer = site_chrome(links)
+    return f'{header}<div class="karar">{decision_paragraphs(paragraphs)}</div>{footer}'
+
+
+def rekabet_landing_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    return f'{header}<h1>Karar</h1><a href="/Dosyalar/kararlar/karar.pdf">Karar metni (PDF)</a>{footer}'
+
+
+def build_decision_pdf(pages: int = 3, lines: int = 45) -> bytes:
+    """A small text PDF (Helvetica, ASCII text) like the decisions Rekabet Kurumu publishes."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", "", "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in range(pages):
+        text = " T* ".join(f"({page + 1}.{line} Dosya incelendi; bildirimin izin verilmesine karar verilmistir.) Tj" for line in range(lines))
+        stream = f"BT /F1 10 Tf 14 TL 40 800 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref_offset = len(pdf)
+    pdf += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    pdf += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+    pdf += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode("latin-1")
+    return bytes(pdf)
+
+
+def kik_form_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    years = "".join(f'<option value="{year}">{year}</option>' for year in range(2024, 2009, -1))
+    return (f'{header}<form id="aspnetForm" method="post"><input type="hidden" name="__VIEWSTATE" value="{"x" * (links * 40)}"/>'
+            '<input type="hidden" name="__EVENTVALIDATION" value="ev"/>'
+            '<input type="radio" name="ctl00$ContentPlaceHolder1$kurulKararTip" value="rbUyusmazlik" checked="checked"/>'
+            '<input type="radio" name="ctl00$ContentPlaceHolder1$kurulKararTip" value="rbDuzenleyici"/>'
+            '<input type="text" name="ctl00$ContentPlaceHolder1$txtKararMetni" value=""/>'
+            f'<select name="ctl00$ContentPlaceHolder1$ddlYil"><option value="">Seçiniz</option>{years}</select>'
+            '<a id="ctl00_ContentPlaceHolder1_btnAra" href="javascript:__doPostBack(\'ctl00$ContentPlaceHolder1$btnAra\',\'\')">Ara</a>'
+            f'</form>{footer}')
+
+
+def kik_preview_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    return (f'{header}<form id="aspnetForm"><input type="hidden" name="__VIEWSTATE" value="{"x" * (links * 40)}"/>'
+            '<iframe id="iframe_detayPopUp" src="KurulKararGoster.aspx?KararId=a1b2c3d4"></iframe></form>' + footer)
+
+
+def kik_document_page(links: int, paragraphs: int) -> str:
+    header, footer = site_chrome(links)
+    return f'{header}<span id="{KikApiClient.DOCUMENT_CONTENT_SPAN_ID}">{decision_paragraphs(paragraphs)}</span>{footer}'
+
+
+def _is(method: str, path_test: Callable[[str], bool]) -> Callable[[httpx.Request], bool]:
+    return lambda request: request.method == method and path_test(request.url.path)
+
+
+def build_routes(links: int, paragraphs: int) -> Dict[str, List[Route]]:
+    """Fixture routes per client (the name each client registers with the transport registry)."""
+    decision_html = lambda: build_decision_html(paragraphs)
+    api_paths = ("/aramadetaylist", "/aramalist")
+    routes = {
+        "yargitay": [
+            Route("yargitay", "search.json", _is("POST", lambda path: path in api_paths), api_search_response),
+            Route("yargitay", "document.json", _is("GET", lambda path: path == "/getDokuman"), lambda: {"data": decision_html()}),
+        ],
+        "danistay": [
+            Route("danistay", "search.json", _is("POST", lambda path: path in api_paths), api_search_response),
+            Route("danistay", "document.html", _is("GET", lambda path: path == "/getDokuman"), decision_html),
+        ],
+        "emsal": [
+            Route("emsal", "search.json", _is("POST", lambda path: path in api_paths), api_search_response),
+            Route("emsal", "document.json", _is("GET", lambda path: path == "/getDokuman"), lambda: {"data": decision_html()}),
+        ],
+        "bedesten": [
+            Route("bedesten", "search.json", _is("POST", lambda path: path == BedestenApiClient.SEARCH_ENDPOINT), bedesten_search_response),
+            Route("bedesten", "document.json", _is("POST", lambda path: path == BedestenApiClient.DOCUMENT_ENDPOINT), lambda: {
+                "data": {"content": base64.b64encode(decision_html().encode("utf-8")).decode("ascii"), "mimeType": "text/html", "version": 1},
+                "metadata": {"FMTY": "SUCCESS"}}),
+        ],
+        "anayasa": [
+            Route("anayasa", "search.html", _is("GET", lambda path: path.endswith("/Ara")), lambda: anayasa_norm_search_page(links)),
+            Route("anayasa", "document.html", _is("GET", lambda path: path.startswith("/ND/")), lambda: anayasa_norm_document_page(links, paragraphs)),
+        ],
+        "anayasa_bireysel": [
+            Route("anayasa_bireysel", "search.html", _is("GET", lambda path: path.endswith("/Ara")), lambda: bireysel_page(links)),
+            Route("anayasa_bireysel", "document.html", _is("GET", lambda path: path.startswith("/BB/")), lambda: bireysel_document_page(links, paragraphs)),
+        ],
+        "uyusmazlik": [
+            Route("uyusmazlik", "search.html", _is("POST", lambda path: path == UyusmazlikApiClient.SEARCH_ENDPOINT), lambda: uyusmazlik_page(links)),
+            Route("uyusmazlik", "document.html", _is("GET", lambda path: True), lambda: html_document_page(links, paragraphs)),
+        ],
+        "rekabet": [
+            Route("rekabet", "search.html", _is("GET", lambda path: path == RekabetKurumuApiClient.SEARCH_PATH), lambda: rekabet_page(links)),
+            Route("rekabet", "landing.html", _is("GET", lambda path: path == RekabetKurumuApiClient.DECISION_LANDING_PATH_TEMPLATE), lambda: rekabet_landing_page(links)),
+            Route("rekabet", "decision.pdf", _is("GET", lambda path: path.lower().endswith(".pdf")), build_decision_pdf),
+        ],
+        "kik": [
+            Route("kik", "form.html", _is("GET", lambda path: path == KikApiClient.SEARCH_PAGE_PATH), lambda: kik_form_page(links)),
+            Route("kik", "preview.html", lambda request: _is("POST", lambda path: path == KikApiClient.SEARCH_PAGE_PATH)(request)
+                  and b"btnOnizle" in request.content, lambda: kik_preview_page(links)),
+            Route("kik", "results.html", _is("POST", lambda path: path == KikApiClient.SEARCH_PAGE_PATH), lambda: kik_page(links)),
+            Route("kik", "document.html", _is("GET", lambda path: path == KikApiClient.DOCUMENT_PAGE_PATH), lambda: kik_document_page(links, paragraphs)),
+        ],
+    }
+    return routes
+
+
+# --- Operations ---
+
+class Operation(NamedTuple):
+    client: str
+    name: str
+    call: Callable[[], Awaitable[Any]]
+
+    @property
+    def label(self) -> str:
+        return f"{self.client}.{self.name}"
+
+
+def expect(condition: Any, message: str):
+    if not condition:
+        raise RuntimeError(message)
+
+
+async def yargitay_operations() -> Tuple[Any, List[Operation]]:
+    client = YargitayOfficialApiClient()
+    params = YargitayDetailedSearchRequest(arananKelime="arsa payı")
+
+    async def search():
+        response = await client.search_detailed_decisions(params)
+        expect(response.data.data, "Yargıtay search returned no decisions")
+        return response.data.data
+
+    document_id = (await search())[0].id
+
+    async def document():
+        expect((await client.get_decision_document_as_markdown(document_id)).markdown_content, "Yargıtay document has no Markdown")
+
+    return client, [Operation("yargitay", "search", search), Operation("yargitay", "document", document)]
+
+
+async def danistay_operations() -> Tuple[Any, List[Operation]]:
+    client = DanistayApiClient()
+    params = DanistayKeywordSearchRequest(andKelimeler=["imar", "iptal"])
+
+    async def search():
+        response = await client.search_keyword_decisions(params)
+        expect(response.data.data, "Danıştay search returned no decisions")
+        return response.data.data
+
+    document_id = (await search())[0].id
+
+    async def document():
+        expect((await client.get_decision_document_as_markdown(document_id)).markdown_content, "Danıştay document has no Markdown")
+
+    return client, [Operation("danistay", "search", search), Operation("danistay", "document", document)]
+
+
+async def emsal_operations() -> Tuple[Any, List[Operation]]:
+    client = EmsalApiClient()
+    params = EmsalSearchRequest(keyword="kira")
+
+    async def search():
+        response = await client.search_detailed_decisions(params)
+        expect(response.data.data, "Emsal search returned no decisions")
+        return response.data.data
+
+    document_id = (await search())[0].id
+
+    async def document():
+        expect((await client.get_decision_document_as_markdown(document_id)).markdown_content, "Emsal document has no Markdown")
+
+    return client, [Operation("emsal", "search", search), Operation("emsal", "document", document)]
+
+
+async def bedesten_operations() -> Tuple[Any, List[Operation]]:
+    client = BedestenApiClient()
+    params = BedestenSearchRequest(data=BedestenSearchData(pageSize=10, pageNumber=1, itemTypeList=["YARGITAYKARARI"], phrase="arsa payı"))
+
+    async def search():
+        response = await client.search_documents(params)
+        expect(response.data.emsalKararList, "Bedesten search returned no decisions")
+        return response.data.emsalKararList
+
+    document_id = (await search())[0].documentId
+
+    async def document():
+        expect((await client.get_document_as_markdown(document_id)).markdown_content, "Bedesten document has no Markdown")
+
+    return client, [Operation("bedesten", "search", search), Operation("bedesten", "document", document)]
+
+
+async def anayasa_operations() -> Tuple[Any, List[Operation]]:
+    client = AnayasaMahkemesiApiClient()
+    client.document_cache = MemoryCache("bench_anayasa_documents", max_bytes=0) # Convert on every call
+    params = AnayasaNormDenetimiSearchRequest(keywords_all=["mülkiyet"])
+
+    async def search():
+        result = await client.search_norm_denetimi_decisions(params)
+        expect(result.decisions, "Anayasa norm search returned no decisions")
+        return result.decisions
+
+    document_url = str((await search())[0].decision_page_url)
+
+    async def document():
+        expect((await client.get_decision_document_as_markdown(document_url)).markdown_chunk, "Anayasa norm document has no Markdown")
+
+    return client, [Operation("anayasa", "search", search), Operation("anayasa", "document", document)]
+
+
+async def anayasa_bireysel_operations() -> Tuple[Any, List[Operation]]:
+    client = AnayasaBireyselBasvuruApiClient()
+    client.document_cache = MemoryCache("bench_anayasa_bireysel_documents", max_bytes=0)
+    params = AnayasaBireyselReportSearchRequest(keywords=["mülkiyet"])
+
+    async def search():
+        result = await client.search_bireysel_basvuru_report(params)
+        expect(result.decisions, "Anayasa bireysel search returned no decisions")
+        return result.decisions
+
+    document_path = httpx.URL(str((await search())[0].decision_page_url)).path
+
+    async def document():
+        expect((await client.get_decision_document_as_markdown(document_path)).markdown_chunk, "Anayasa bireysel document has no Markdown")
+
+    return client, [Operation("anayasa_bireysel", "search", search), Operation("anayasa_bireysel", "document", document)]
+
+
+async def uyusmazlik_operations() -> Tuple[Any, List[Operation]]:
+    client = UyusmazlikApiClient()
+    params = UyusmazlikSearchRequest(icerik="görev")
+
+    async def search():
+        result = await client.search_decisions(params)
+        expect(result.decisions, "Uyuşmazlık search returned no decisions")
+        return result.decisions
+
+    document_url = str((await search())[0].document_url)
+
+    async def document():
+        expect((await client.get_decision_document_as_markdown(document_url)).markdown_content, "Uyuşmazlık document has no Markdown")
+
+    return client, [Operation("uyusmazlik", "search", search), Operation("uyusmazlik", "document", document)]
+
+
+async def rekabet_operations() -> Tuple[Any, List[Operation]]:
+    client = RekabetKurumuApiClient()
+    client.pdf_cache = MemoryCache("bench_rekabet_pdf", max_bytes=0) # Download, split and convert on every call
+    params = RekabetKurumuSearchRequest(PdfText="birleşme")
+
+    async def search():
+        result = await client.search_decisions(params)
+        expect(result.decisions, "Rekabet search returned no decisions")
+        return result.decisions
+
+    karar_id = (await search())[0].karar_id
+
+    async def document():
+        result = await client.get_decision_document(karar_id, 1)
+        expect(result.markdown_chunk, f"Rekabet document has no Markdown: {result.error_message}")
+
+    return client, [Operation("rekabet", "search", search), Operation("rekabet", "document", document)]
+
+
+async def kik_operations() -> Tuple[Any, List[Operation]]:
+    client = KikApiClient()
+    params = KikSearchRequest(karar_metni="ihale")
+
+    async def search():
+        result = await client.search_decisions(params)
+        expect(result.decisions, "KİK search returned no decisions")
+        return result.decisions
+
+    karar_id = (await search())[0].karar_id
+
+    async def document():
+        result = await client.get_decision_document_as_markdown(karar_id)
+        expect(result.markdown_chunk, f"KİK document has no Markdown: {result.error_message}")
+
+    # The first call resolves KİK's internal KararId; later calls are the single-GET fast path
+    await document()
+    return client, [Operation("kik", "search", search), Operation("kik", "document", document)]
+
+
+OPERATION_BUILDERS = {
+    "yargitay": yargitay_operations,
+    "danistay": danistay_operations,
+    "emsal": emsal_operations,
+    "bedesten": bedesten_operations,
+    "anayasa": anayasa_operations,
+    "anayasa_bireysel": anayasa_bireysel_operations,
+    "uyusmazlik": uyusmazlik_operations,
+    "rekabet": rekabet_operations,
+    "kik": kik_operations,
+}
+
+
+# --- Measurement ---
+
+class InlineExecutor(Executor):
+    """
+    Runs conversion jobs on the calling thread so their cost is measured, timing them
+    and pausing the profiler while they run (conversion is reported as its own stage).
+    """
+
+    def __init__(self):
+        self.profiler: Optional[cProfile.Profile] = None
+        self.seconds = 0.0
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        future: Future = Future()
+        if self.profiler is not None:
+            self.profiler.disable()
+        started = time.perf_counter()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            self.seconds += time.perf_counter() - started
+            if self.profiler is not None:
+                self.profiler.enable()
+        return future
+
+
+def stage_of(function_key: Tuple[str, int, str]) -> Optional[str]:
+    filename, _, function_name = function_key
+    location = (function_name if filename == "~" else filename).replace("\\", "/")
+    for stage, markers in STAGE_MARKERS:
+        if any(marker in location for marker in markers):
+            return stage
+    return None
+
+
+def profile_shares(profiler: cProfile.Profile) -> Dict[str, float]:
+    """Share of the profiled (non-conversion) time spent in each stage, from the functions' own time."""
+    totals = dict.fromkeys(STAGES, 0.0)
+    for function_key, (_, _, own_time, _, callers) in pstats.Stats(profiler).stats.items():
+        stage = stage_of(function_key)
+        if stage is None and function_key[0] == "~" and callers:
+            # Other C functions (regex, str methods) count towards the code calling them
+            caller_time = sum(caller[2] for caller in callers.values()) or 1.0
+            for caller_key, caller in callers.items():
+                totals[stage_of(caller_key) or "other"] += own_time * caller[2] / caller_time
+            continue
+        totals[stage or "other"] += own_time
+    profiled = sum(totals.values()) or 1.0
+    return {stage: seconds / profiled for stage, seconds in totals.items()}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+async def measure(operation: Operation, executor: InlineExecutor, iterations: int, profile_iterations: int) -> Dict[str, Any]:
+    await operation.call() # Warm-up (lazy imports, converter construction)
+
+    timings, conversion = [], []
+    for _ in range(iterations):
+        executor.seconds = 0.0
+        started = time.perf_counter()
+        await operation.call()
+        timings.append((time.perf_counter() - started) * 1000)
+        conversion.append(executor.seconds * 1000)
+
+    profiler = cProfile.Profile()
+    executor.profiler = profiler
+    profiler.enable()
+    try:
+        for _ in range(profile_iterations):
+            await operation.call()
+    finally:
+        profiler.disable()
+        executor.profiler = None
+    shares = profile_shares(profiler)
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(max(1, profile_iterations)):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            await operation.call()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+
+    mean_ms = statistics.mean(timings)
+    convert_ms = statistics.mean(conversion)
+    rest_ms = max(0.0, mean_ms - convert_ms)
+    stages = {stage: rest_ms * shares[stage] / ((1 - shares["convert"]) or 1.0) for stage in STAGES if stage != "convert"}
+    stages["convert"] = convert_ms
+    return {
+        "p50_ms": statistics.median(timings),
+        "p99_ms": percentile(timings, 0.99),
+        "mean_ms": mean_ms,
+        "stages_ms": {stage: stages[stage] for stage in STAGES},
+        "peak_alloc_kib": max(peaks) / 1024,
+    }
+
+
+def print_report(results: Dict[str, Dict[str, Any]]):
+    stage_columns = "".join(f"{stage:>10}" for stage in STAGES)
+    print(f"{'operation':<27}{'fixtures':>10}{'p50':>10}{'p99':>10}{'mean':>10}{stage_columns}{'peak alloc':>13}")
+    for label, result in results.items():
+        stages = "".join(f"{result['stages_ms'][stage]:>10.2f}" for stage in STAGES)
+        print(f"{label:<27}{result['fixtures']:>10}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['mean_ms']:>10.2f}"
+              f"{stages}{result['peak_alloc_kib']:>9.0f} KiB")
+    print("\nTimes in ms per call; the mean is split by stage (convert is timed directly, the rest is apportioned by profile).")
+    synthetic = [label for label, result in results.items() if result["fixtures"] != "recorded"]
+    if synthetic:
+        scope = "ALL operations" if len(synthetic) == len(results) else f"{len(synthetic)} of {len(results)} operations"
+        print(f"\nWARNING: {scope} ran on synthetic responses ({', '.join(synthetic)}).")
+        print("Their numbers measure hand-written markup, not the real court pages; record fixtures with --record to benchmark real responses.")
+
+
+def synthetic_only(results: Dict[str, Dict[str, Any]]) -> bool:
+    return all(result["fixtures"] == "synthetic" for result in results.values())
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline_path: str, threshold: float) -> bool:
+    """Prints p50 changes against a --json baseline; returns False if any operation regressed beyond threshold."""
+    baseline = json.loads(Path(baseline_path).read_text(encoding="utf-8"))["operations"]
+    regressions = []
+    print(f"\nAgainst {baseline_path} (regression threshold +{threshold:.0%} on p50):")
+    if synthetic_only(results):
+        print("  (synthetic responses only: this checks our own code on hand-written markup, not on real pages)")
+    for label, result in results.items():
+        if label not in baseline:
+            continue
+        before, after = baseline[label]["p50_ms"], result["p50_ms"]
+        change = (after - before) / before if before else 0.0
+        baseline_fixtures = baseline[label].get("fixtures")
+        if baseline_fixtures and baseline_fixtures != result["fixtures"]:
+            # Different responses: the timings are not comparable
+            flag = f"not compared ({baseline_fixtures} -> {result['fixtures']} fixtures)"
+        else:
+            flag = "REGRESSION" if change > threshold else ""
+        if flag == "REGRESSION":
+            regressions.append(label)
+        print(f"  {label:<27}{before:>10.2f} ms -> {after:>8.2f} ms  {change:>+7.1%}  {flag}")
+    if regressions:
+        print(f"\n{len(regressions)} operation(s) regressed: {', '.join(regressions)}")
+    return not regressions
+
+
+async def run(args) -> int:
+    store = FixtureStore(synthetic_only=args.synthetic)
+    routes = build_routes(args.chrome_links, args.paragraphs)
+    if args.record:
+        install_transport(lambda name, client_kwargs: RecordingTransport(store, routes.get(name, []), verify=client_kwargs.get("verify", True)))
+    else:
+        install_transport(lambda name, client_kwargs: replay_transport(store, routes.get(name, [])))
+
+    executor = InlineExecutor()
+    get_conversion_executor()._pool = executor
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in args.only or OPERATION_BUILDERS:
+        client, operations = await OPERATION_BUILDERS[name]()
+        try:
+            if args.record:
+                for operation in operations:
+                    await operation.call()
+                print(f"Recorded {name}: {', '.join(str(store.path(route)) for route in routes[name] if store.path(route).exists())}")
+                continue
+            recorded = [store.load(route).recorded for route in routes[name]]
+            fixtures = "recorded" if all(recorded) else ("mixed" if any(recorded) else "synthetic")
+            for operation in operations:
+                results[operation.label] = {"fixtures": fixtures, **await measure(operation, executor, args.iterations, args.profile_iterations)}
+        finally:
+            await client.close_client_session()
+
+    if args.record:
+        return 0
+    print_report(results)
+    if args.json:
+        Path(args.json).write_text(json.dumps({"iterations": args.iterations, "synthetic_only": synthetic_only(results), "operations": results}, indent=2), encoding="utf-8")
+        print(f"Results written to {args.json}")
+    if args.compare and not compare(results, args.compare, args.threshold):
+        return 1
+    if args.require_recorded and any(result["fixtures"] != "recorded" for result in results.values()):
+        print("\n--require-recorded: some operations had no recorded fixtures.")
+        return 2
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the clients against replayed upstream responses")
+    parser.add_argument("--iterations", type=int, default=50, help="Timed calls per operation (default: 50)")
+    parser.add_argument("--profile-iterations", type=int, default=5, help="Calls profiled for the stage split and allocations (default: 5)")
+    parser.add_argument("--only", nargs="+", choices=sorted(OPERATION_BUILDERS), help="Benchmark only these clients")
+    parser.add_argument("--chrome-links", type=int, default=600, help="Menu links in the synthetic site chrome (default: 600)")
+    parser.add_argument("--paragraphs", type=int, default=200, help="Paragraphs per synthetic decision (default: 200)")
+    parser.add_argument("--synthetic", action="store_true", help="Ignore recorded fixtures and use the synthetic responses")
+    parser.add_argument("--record", action="store_true", help="Record fixtures from the live sites instead of benchmarking")
+    parser.add_argument("--require-recorded", action="store_true", help="Exit 2 if any operation ran on synthetic responses")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON (usable as a --compare baseline)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare p50 latencies with a --json baseline; exit 1 on regression")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p50 slowdown for --compare (default: 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING) # The clients log every request at INFO; errors still surface
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
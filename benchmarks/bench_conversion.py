@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for per-document HTML to Markdown conversion.
+
+Compares the legacy path (a new MarkItDown() per document plus a
+NamedTemporaryFile round-trip) with the shared converter in
+common_mcp_module.conversion, which converts from an in-memory stream.
+
+Usage:
+    python benchmarks/bench_conversion.py
+    python benchmarks/bench_conversion.py --documents 200 --paragraphs 400
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from markitdown import MarkItDown
+
+from common_mcp_module.conversion import convert_html_to_markdown, get_markitdown_converter
+
+
+def build_decision_html(paragraphs: int) -> str:
+    """Builds a decision-like HTML document similar to a Yargıtay /getDokuman payload."""
+    body = "".join(
+        f"<p>{i}. Dava dosyası incelendi; mahkemece verilen kararın usul ve yasaya uygun olduğu "
+        f"anlaşıldığından temyiz itirazlarının reddine karar vermek gerekmiştir.</p>"
+        for i in range(paragraphs)
+    )
+    return (
+        "<html><head><meta charset=\"UTF-8\"><title>Karar</title></head><body>"
+        "<h1>YARGITAY 3. HUKUK DAİRESİ</h1><p><b>Esas No:</b> 2024/1234 <b>Karar No:</b> 2024/5678</p>"
+        f"{body}<p>KARAR: Oybirliğiyle karar verildi.</p></body></html>"
+    )
+
+
+def legacy_convert(html_content: str) -> str:
+    """The conversion path used before the shared service existed."""
+    temp_file_path = None
+    try:
+        md_converter = MarkItDown()
+        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_file:
+            tmp_file.write(html_content)
+            temp_file_path = tmp_file.name
+        return md_converter.convert(temp_file_path).text_content
+    finally:
+        if temp_file_path and os.path.exists(temp_file_path):
+            os.remove(temp_file_path)
+
+
+def measure(label: str, convert, html_content: str, documents: int) -> list:
+    convert(html_content) # Warm-up (imports, lazy converter construction)
+    timings = []
+    for _ in range(documents):
+        start = time.perf_counter()
+        convert(html_content)
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<28} mean {statistics.mean(timings):8.2f} ms   median {statistics.median(timings):8.2f} ms   "
+          f"min {min(timings):8.2f} ms")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-document Markdown conversion")
+    parser.add_argument("--documents", type=int, default=100, help="Documents converted per variant (default: 100)")
+    parser.add_argument("--paragraphs", type=int, default=200, help="Paragraphs per synthetic decision (default: 200)")
+    args = parser.parse_args()
+
+    html_content = build_decision_html(args.paragraphs)
+    print(f"Synthetic decision: {len(html_content.encode('utf-8')) / 1024:.1f} KiB HTML, {args.documents} documents per variant\n")
+
+    assert legacy_convert(html_content) == convert_html_to_markdown(html_content), "Outputs differ between variants"
+
+    before = measure("before (new converter+temp)", legacy_convert, html_content, args.documents)
+    get_markitdown_converter()
+    after = measure("after (shared, in-memory)", convert_html_to_markdown, html_content, args.documents)
+    print(f"\nSpeedup (mean): {statistics.mean(before) / statistics.mean(after):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for parsing search result pages.
+
+Compares the legacy path (the whole page parsed with html.parser) with
+common_mcp_module.parsing: the fastest installed backend (lxml when available)
+and, for the search pages, parsing limited to the elements the clients read.
+
+Each page is the search result page saved for the client benchmark under
+benchmarks/fixtures/<client>/ (captured from the live sites with
+`python benchmarks/bench_clients.py --record`). Pages that were never recorded fall
+back to a synthetic stand-in with the structure of the real one: site chrome (menus,
+scripts, footer) around the result list. The report says which was used; only the
+recorded pages say anything about the speedup on the real court sites.
+
+Usage:
+    python benchmarks/bench_parsing.py
+    python benchmarks/bench_parsing.py --iterations 200 --chrome-links 1500
+    python benchmarks/bench_parsing.py --synthetic   # ignore recorded pages
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup
+
+from common_mcp_module.parsing import HTML_PARSER, only, parse_html
+from kik_mcp_module.client import KikApiClient
+from replay import FixtureStore, Route
+
+
+def site_chrome(links: int) -> tuple:
+    """Header and footer markup shared by every page: navigation menus, inline scripts, footer links."""
+    menu = "".join(f'<li class="menu-item"><a href="/tr/Sayfa/{i}" title="Bağlantı {i}">Menü bağlantısı {i}</a></li>' for i in range(links))
+    script = "<script>var config = {" + ",".join(f'"k{i}": "{i}"' for i in range(links // 4)) + "};</script>"
+    header = f'<html><head><meta charset="UTF-8"><title>Kararlar</title>{script}</head><body><div class="container"><nav><ul class="nav">{menu}</ul></nav>'
+    footer = f'<footer><ul class="footer-links">{menu}</ul><p>Tüm hakları saklıdır.</p></footer></div></body></html>'
+    return header, footer
+
+
+def rekabet_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    tables = "".join(
+        '<table class="equalDivide">'
+        f'<tr><td>01.0{i % 9 + 1}.2024</td><td>24-{i:02d}/123-45</td><td><a href="/tr/Guncel/Ilgili?kararId=guid-{i}">İlgili</a></td></tr>'
+        f'<tr><td>0{i % 9 + 1}.12.2023</td><td>Birleşme ve Devralma</td></tr>'
+        f'<tr><td colspan="5"><a href="/Karar?kararId=guid-{i}">Karar başlığı {i} hakkında nihai karar</a></td></tr>'
+        "</table>"
+        for i in range(10)
+    )
+    return f'{header}<div class="yazi01">Toplam : 1234 <ul class="pagination"><li class="PagedList-skipToLast"><a href="/tr/Kararlar?page=124">Son</a></li></ul></div><div id="kararList">{tables}</div>{footer}'
+
+
+def uyusmazlik_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    rows = "".join(
+        f'<tr><td><div data-rel="popover" data-content="Özet {i}"></div><a href="/Karar/{i}">2024/{i}</a></td>'
+        f'<td>2023/{i}</td><td>Hukuk Bölümü</td><td>Görev Uyuşmazlığı</td><td>Adli Yargı</td><td><a href="/Dosya/{i}.pdf">PDF</a></td></tr>'
+        for i in range(10)
+    )
+    return (f'{header}<div class="pull-right label label-important">245 adet kayıt bulundu</div>'
+            f'<table class="table table-hover"><tr><th>Karar</th><th>Esas</th><th>Bölüm</th><th>Konu</th><th>Sonuç</th><th>PDF</th></tr>{rows}</table>{footer}')
+
+
+def bireysel_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    decisions = "".join(
+        f'<div class="KararBulteniBirKarar"><h4><strong>BAŞVURUCU {i} Başvurusuna İlişkin Karar</strong></h4>'
+        f'<div class="AltiCizili"><a href="/BB/2019/{i}">2019/{i}</a>|Esas (İhlal)|Genel Kurul|Başvuru Tarihi : 01/02/2019|Karar Tarihi : 03/04/2022</div>'
+        f'<table><tr><td>Mülkiyet hakkı</td><td>Müdahale</td><td>İhlal</td><td>Yeniden yargılama</td></tr></table></div>'
+        for i in range(10)
+    )
+    return f'{header}<div class="bulunankararsayisi">532 Karar Bulundu</div><div class="HaberBulteni">{decisions}</div>{footer}'
+
+
+def kik_page(links: int) -> str:
+    header, footer = site_chrome(links)
+    rows = "".join(
+        f'<tr><td><a id="ctl00_grd_ctl{i:02d}_btnOnizle" href="javascript:__doPostBack(\'ctl00$grd$ctl{i:02d}$btnOnizle\',\'\')">Önizle</a></td>'
+        f'<td><span id="ctl00_grd_ctl{i:02d}_lblKno">2024/UH.II-{i}</span></td><td><span id="ctl00_grd_ctl{i:02d}_lblKtar">01.01.2024</span></td>'
+        f'<td><span id="ctl00_grd_ctl{i:02d}_lblIdare">İdare {i}</span></td><td><span id="ctl00_grd_ctl{i:02d}_lblSikayetci">Şirket {i}</span></td>'
+        f'<td><span id="ctl00_grd_ctl{i:02d}_lblIhale">İhale {i}</span></td></tr>'
+        for i in range(10)
+    )
+    viewstate = "x" * (links * 40) # ASP.NET pages carry a large __VIEWSTATE
+    return (f'{header}<form id="aspnetForm"><input type="hidden" name="__VIEWSTATE" value="{viewstate}"/>'
+            f'<table id="grdKurulKararSorguSonuc"><tr><td>Başlık</td></tr><tr><td>Filtre</td></tr>{rows}</table>'
+            f'<div class="gridToplamSayi">Toplam Kayıt Sayısı:512</div><div class="sayfalama"><span class="active">1</span></div></form>{footer}')
+
+
+# (fixture saved by bench_clients.py --record, synthetic page builder, strainer the client uses,
+#  function extracting what the client reads)
+CASES = {
+    "rekabet": ("search.html", rekabet_page, only("div#kararList", "div.yazi01"),
+                lambda soup: [t.get_text("|", strip=True) for t in soup.find("div", id="kararList").find_all("table", class_="equalDivide")]
+                + [soup.find("div", class_="yazi01").get_text(" ", strip=True)]),
+    "uyusmazlik": ("search.html", uyusmazlik_page, only("table.table-hover", "div.label-important"),
+                   lambda soup: [r.get_text("|", strip=True) for r in soup.find("table", class_="table-hover").find_all("tr")]
+                   + [soup.find("div", class_="pull-right label label-important").get_text(strip=True)]),
+    "anayasa_bireysel": ("search.html", bireysel_page, only("div.bulunankararsayisi", "div.HaberBulteni", "div.KararBulteniBirKarar"),
+                         lambda soup: [d.get_text("|", strip=True) for d in soup.find("div", class_="HaberBulteni").find_all("div", class_="KararBulteniBirKarar")]
+                         + [soup.find("div", class_="bulunankararsayisi").get_text(strip=True)]),
+    "kik": ("results.html", kik_page, KikApiClient.RESULTS_PAGE_STRAINER,
+            lambda soup: [r.get_text("|", strip=True) for r in soup.find("table", id="grdKurulKararSorguSonuc").find_all("tr")]
+            + [soup.find("div", class_="gridToplamSayi").get_text(strip=True), soup.find("div", class_="sayfalama").get_text(strip=True)]),
+}
+
+
+def measure(parse, html_content: str, iterations: int) -> float:
+    parse(html_content) # Warm-up
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        parse(html_content)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search result page parsing")
+    parser.add_argument("--iterations", type=int, default=50, help="Parses per variant and page (default: 50)")
+    parser.add_argument("--chrome-links", type=int, default=600, help="Menu links in the synthetic site chrome (default: 600)")
+    parser.add_argument("--synthetic", action="store_true", help="Use the synthetic pages even where recorded ones exist")
+    args = parser.parse_args()
+
+    store = FixtureStore(synthetic_only=args.synthetic)
+
+    print(f"Fast backend: {HTML_PARSER}" + ("" if HTML_PARSER == "lxml" else " (install lxml for the full speedup: pip install yargi-mcp[lxml])"))
+    print(f"{'page':<18}{'fixture':>10}{'size':>10}{'before (html.parser)':>24}{'after (full)':>16}{'after (scoped)':>18}{'speedup':>10}")
+    for name, (fixture_name, build_page, strainer, extract) in CASES.items():
+        fixture = store.load(Route(name, fixture_name, lambda request: False, lambda: build_page(args.chrome_links)))
+        html_content = fixture.body.decode("utf-8", errors="replace")
+        legacy = lambda markup: BeautifulSoup(markup, "html.parser")
+        full = lambda markup: parse_html(markup)
+        scoped = lambda markup: parse_html(markup, strainer)
+        assert extract(legacy(html_content)) == extract(scoped(html_content)), f"{name}: scoped parsing reads different content"
+
+        before = measure(legacy, html_content, args.iterations)
+        after_full = measure(full, html_content, args.iterations)
+        after_scoped = measure(scoped, html_content, args.iterations)
+        print(f"{name:<18}{'recorded' if fixture.recorded else 'synthetic':>10}{len(html_content.encode('utf-8')) / 1024:>8.1f}KiB{before:>21.2f} ms{after_full:>13.2f} ms"
+              f"{after_scoped:>15.2f} ms{before / after_scoped:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
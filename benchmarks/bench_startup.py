@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: how long `import mcp_server_main` takes in a fresh interpreter.
+
+Each run starts a new Python process with `-X importtime`, so nothing is shared with
+earlier runs except the OS file cache (the first run is a warm-up and not counted).
+Two scenarios are measured:
+
+    lazy   import mcp_server_main (what a stdio launch or a serverless cold start pays)
+    eager  the same, then create every API client (the cost that used to be paid at
+           import time and is now spread over the first call of each client's tools)
+
+The report gives the median import time per scenario, which heavy dependencies got
+imported, and the slowest direct imports of mcp_server_main in the lazy scenario.
+
+Usage:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 10 --top 15
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    "lazy": "import mcp_server_main",
+    "eager": "import mcp_server_main; mcp_server_main.clients.preload()",
+}
+HEAVY_MODULES = ("markitdown", "magika", "pypdf", "playwright", "bs4", "lxml", "aiohttp")
+
+
+def run_once(code: str) -> Tuple[float, Dict[Tuple[int, str], int]]:
+    """
+    Runs code in a fresh interpreter; returns its total import time (ms) and the
+    cumulative µs of every imported module, keyed by (nesting depth, name).
+    """
+    with tempfile.TemporaryDirectory() as cache_directory:
+        env = {**os.environ, "PYTHONPATH": str(PROJECT_ROOT), "YARGI_CACHE_DIR": cache_directory}
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+        )
+    imported: Dict[Tuple[int, str], int] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue # Header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2 # One space, then two per nesting level
+        imported[(depth, name.strip())] = int(cumulative)
+    total_ms = sum(microseconds for (depth, _), microseconds in imported.items() if depth == 0) / 1000
+    return total_ms, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark server import time")
+    parser.add_argument("--runs", type=int, default=5, help="Measured runs per scenario (default: 5)")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports of mcp_server_main to list (default: 10)")
+    args = parser.parse_args()
+
+    results: Dict[str, List[float]] = {}
+    modules: Dict[str, Dict[Tuple[int, str], int]] = {}
+    for scenario, code in SCENARIOS.items():
+        run_once(code) # Warm-up: fills the OS file cache and __pycache__
+        timings = []
+        for _ in range(args.runs):
+            total_ms, imported = run_once(code)
+            timings.append(total_ms)
+        results[scenario] = timings
+        modules[scenario] = imported
+
+    print(f"{'scenario':<10}{'median':>12}{'min':>12}{'max':>12}   heavy dependencies imported")
+    for scenario, timings in results.items():
+        names = {name for _, name in modules[scenario]}
+        heavy = [name for name in HEAVY_MODULES if name in names]
+        print(f"{scenario:<10}{statistics.median(timings):>9.0f} ms{min(timings):>9.0f} ms{max(timings):>9.0f} ms   {', '.join(heavy) or '-'}")
+
+    print("\nSlowest imports of mcp_server_main (lazy, last run):")
+    direct = {name: microseconds for (depth, name), microseconds in modules["lazy"].items() if depth == 1}
+    for name, microseconds in sorted(direct.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {microseconds / 1000:>8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Offline replay of upstream responses for the client benchmarks.
+
+Every client builds its httpx.AsyncClient through the shared transport registry, so a
+benchmark can hand all of them an httpx.MockTransport that answers from fixtures
+instead of the network. A fixture is a recorded response body stored under
+benchmarks/fixtures/<client>/<name> (written by `bench_clients.py --record`); when no
+recording exists, a synthetic stand-in with the structure of the real response is used.
+"""
+
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Union
+
+import httpx
+
+from common_mcp_module.transport import get_transport_registry
+
+FIXTURE_DIRECTORY = Path(__file__).resolve().parent / "fixtures"
+
+CONTENT_TYPES = {
+    ".json": "application/json; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+    ".pdf": "application/pdf",
+}
+
+
+class Fixture(NamedTuple):
+    body: bytes
+    content_type: str
+    recorded: bool # False for a synthetic stand-in
+
+
+class Route(NamedTuple):
+    """Requests accepted by `matches` are answered with fixture `name` of the client."""
+    client: str
+    name: str # File name under fixtures/<client>/, its extension sets the content type
+    matches: Callable[[httpx.Request], bool]
+    synthetic: Callable[[], Union[str, bytes, dict]]
+
+
+def _as_bytes(body: Union[str, bytes, dict]) -> bytes:
+    if isinstance(body, bytes):
+        return body
+    if isinstance(body, dict):
+        return json.dumps(body, ensure_ascii=False).encode("utf-8")
+    return body.encode("utf-8")
+
+
+class FixtureStore:
+    """Loads fixtures, preferring recordings over synthetic stand-ins, and saves recordings."""
+
+    def __init__(self, directory: Path = FIXTURE_DIRECTORY, synthetic_only: bool = False):
+        self.directory = directory
+        self.synthetic_only = synthetic_only
+        self._loaded: Dict[str, Fixture] = {}
+
+    def path(self, route: Route) -> Path:
+        return self.directory / route.client / route.name
+
+    def load(self, route: Route) -> Fixture:
+        key = f"{route.client}/{route.name}"
+        if key not in self._loaded:
+            path = self.path(route)
+            content_type = CONTENT_TYPES.get(path.suffix, "application/octet-stream")
+            if path.exists() and not self.synthetic_only:
+                self._loaded[key] = Fixture(path.read_bytes(), content_type, True)
+            else:
+                self._loaded[key] = Fixture(_as_bytes(route.synthetic()), content_type, False)
+        return self._loaded[key]
+
+    def save(self, route: Route, body: bytes):
+        path = self.path(route)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        self._loaded.pop(f"{route.client}/{route.name}", None)
+
+
+def _match(routes: List[Route], request: httpx.Request) -> Optional[Route]:
+    return next((route for route in routes if route.matches(request)), None)
+
+
+def replay_transport(store: FixtureStore, routes: List[Route]) -> httpx.MockTransport:
+    """Answers every request from the first matching route; unmatched requests get a 404."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        route = _match(routes, request)
+        if route is None:
+            return httpx.Response(404, text=f"No fixture for {request.method} {request.url}")
+        fixture = store.load(route)
+        return httpx.Response(200, content=fixture.body, headers={"Content-Type": fixture.content_type})
+    return httpx.MockTransport(handler)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Sends requests to the real site and saves the bodies of successful, routed responses."""
+
+    def __init__(self, store: FixtureStore, routes: List[Route], verify: bool = True):
+        self.store = store
+        self.routes = routes
+        self._transport = httpx.AsyncHTTPTransport(verify=verify)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        route = _match(self.routes, request)
+        if route is None or response.status_code != 200:
+            return response
+        body = await response.aread() # Decoded, so the stored fixture is plain content
+        self.store.save(route, body)
+        # The body was read here, so hand the caller a response it can read again
+        headers = [(key, value) for key, value in response.headers.multi_items()
+                   if key.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+        return httpx.Response(response.status_code, headers=headers, content=body, extensions=response.extensions)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+def install_transport(factory: Callable[[str, dict], httpx.AsyncBaseTransport]):
+    """
+    Makes the transport registry give every client it creates from now on the transport
+    factory(client_name, client_kwargs). Clients must be constructed after this call.
+    """
+    registry = get_transport_registry()
+    create_client = registry.create_client
+
+    def create_replaying_client(name: str, **client_kwargs):
+        client_kwargs["transport"] = factory(name, client_kwargs)
+        return create_client(name, **client_kwargs)
+
+    registry.create_client = create_replaying_client
@@ -0,0 +1,66 @@
+# common_mcp_module/batch.py
+# Concurrent retrieval of several documents for the batch document tool.
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, List, Optional
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_MAX_CONCURRENCY = 5
+
+
+class BatchDocumentItem(BaseModel):
+    """One requested document: either the document or the error that prevented fetching it."""
+    id: str = Field(..., description="The requested document ID.")
+    document: Optional[Any] = Field(None, description="The document, in the same format the source's single-document tool returns.")
+    error: Optional[str] = Field(None, description="Why this document could not be retrieved; the other items are unaffected.")
+
+
+class BatchDocumentResult(BaseModel):
+    """Documents of a batch request, in the order the IDs were given."""
+    source: str
+    items: List[BatchDocumentItem]
+    succeeded: int
+    failed: int
+
+
+def batch_max_concurrency() -> int:
+    """Upper bound on documents fetched at once per batch (YARGI_BATCH_MAX_CONCURRENCY, default 5)."""
+    try:
+        return max(1, int(os.getenv("YARGI_BATCH_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)))
+    except ValueError:
+        return DEFAULT_MAX_CONCURRENCY
+
+
+async def fetch_documents_batch(
+    source: str,
+    ids: List[str],
+    fetch: Callable[[str], Awaitable[Any]],
+    max_concurrency: Optional[int] = None
+) -> BatchDocumentResult:
+    """
+    Fetches every ID with fetch(), at most max_concurrency at a time. A failing ID becomes
+    an item with an error instead of failing the batch, so the wall-clock time is close to
+    the slowest single fetch and one bad ID does not cost the others.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or batch_max_concurrency())
+
+    async def fetch_one(document_id: str) -> BatchDocumentItem:
+        if not document_id or not document_id.strip():
+            return BatchDocumentItem(id=document_id, error="Document ID must be a non-empty string.")
+        async with semaphore:
+            try:
+                return BatchDocumentItem(id=document_id, document=await fetch(document_id.strip()))
+            except Exception as e:
+                logger.warning(f"Batch fetch of {source} document {document_id} failed: {e}")
+                return BatchDocumentItem(id=document_id, error=f"{type(e).__name__}: {e}")
+
+    items = await asyncio.gather(*(fetch_one(document_id) for document_id in ids))
+    failed = sum(1 for item in items if item.error)
+    return BatchDocumentResult(source=source, items=list(items), succeeded=len(items) - failed, failed=failed)
@@ -0,0 +1,218 @@
+# common_mcp_module/breaker.py
+# Per-upstream-host circuit breakers: fail fast while a court backend is down, probe it before resuming.
+
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from .metrics import MetricFamily, get_metrics_registry
+from .retry import RETRYABLE_ERRORS
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_FAILURE_THRESHOLD = 5 # Consecutive failures that open the circuit
+DEFAULT_COOLDOWN_SECONDS = 30.0
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised instead of sending a request while the host's circuit is open."""
+
+
+def _env_number(name: str, default: float, cast=float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"CircuitBreakerRegistry: Ignoring non-numeric {name}={value!r}")
+        return default
+
+
+class CircuitBreaker:
+    """
+    Tracks one upstream host. After failure_threshold consecutive failures (connection
+    errors, timeouts, 5xx responses) the circuit opens and requests fail at once with
+    CircuitOpenError instead of each waiting out the request timeout. After cooldown
+    seconds a single request is let through as a probe (half-open): if it succeeds the
+    circuit closes, if it fails the circuit opens for another cooldown. Other requests
+    keep failing fast while the probe is out.
+    """
+
+    def __init__(self, host: str, failure_threshold: int = DEFAULT_FAILURE_THRESHOLD, cooldown: float = DEFAULT_COOLDOWN_SECONDS):
+        self.host = host
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown = max(0.0, cooldown)
+        self.state = CLOSED
+        self.clients: Set[str] = set()
+        self.last_failure: Optional[str] = None
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._counters = {"opened": 0, "rejected": 0, "probes": 0}
+
+    def retry_in(self) -> float:
+        """Seconds until the next probe may go out (0 unless the circuit is open)."""
+        if self.state != OPEN:
+            return 0.0
+        return max(self._opened_at + self.cooldown - time.monotonic(), 0.0)
+
+    def before_request(self, request: httpx.Request) -> bool:
+        """
+        Admits the request or raises CircuitOpenError. Returns True when the request is
+        the half-open probe, whose outcome decides the circuit.
+        """
+        if self.state == OPEN and self.retry_in() <= 0:
+            self.state = HALF_OPEN
+            logger.info(f"CircuitBreaker: {self.host} half-open; sending a probe request.")
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            self._counters["probes"] += 1
+            return True
+        if self.state == CLOSED:
+            return False
+        self._counters["rejected"] += 1
+        if self.state == HALF_OPEN:
+            raise CircuitOpenError(f"{self.host} is unavailable (last failure: {self.last_failure}); checking whether it has recovered, retry shortly.", request=request)
+        raise CircuitOpenError(
+            f"{self.host} is unavailable: circuit open after {self._consecutive_failures} consecutive failures "
+            f"(last: {self.last_failure}); next attempt in {self.retry_in():.1f}s.",
+            request=request
+        )
+
+    def _open(self):
+        if self.state != OPEN:
+            self._counters["opened"] += 1
+            logger.warning(f"CircuitBreaker: {self.host} circuit open after {self._consecutive_failures} consecutive failures (last: {self.last_failure}); failing fast for {self.cooldown:g}s.")
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+
+    def record_success(self, probe: bool = False):
+        # Only the probe closes the circuit; a straggler admitted while it was closed proves nothing
+        if probe:
+            self._probe_in_flight = False
+            if self.state != CLOSED:
+                logger.info(f"CircuitBreaker: {self.host} recovered; circuit closed.")
+                self.state = CLOSED
+        self._consecutive_failures = 0
+
+    def record_failure(self, reason: str, probe: bool = False):
+        if probe:
+            self._probe_in_flight = False
+        self._consecutive_failures += 1
+        self.last_failure = reason
+        if probe or self._consecutive_failures >= self.failure_threshold:
+            self._open()
+
+    def record_abandoned(self, probe: bool = False):
+        """The request ended without a verdict on the host (cancelled, pool timeout)."""
+        if probe:
+            self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "clients": sorted(self.clients),
+            "consecutive_failures": self._consecutive_failures,
+            "failure_threshold": self.failure_threshold,
+            "cooldown_seconds": self.cooldown,
+            "retry_in_seconds": round(self.retry_in(), 1),
+            "last_failure": self.last_failure,
+            **self._counters
+        }
+
+
+class CircuitBreakerRegistry:
+    """
+    One CircuitBreaker per upstream host, configured by YARGI_BREAKER_FAILURES and
+    YARGI_BREAKER_COOLDOWN; the client that first reaches a host may override them with
+    YARGI_BREAKER_<CLIENT>_* (each client talks to a single host).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        get_metrics_registry().add_collector(self.metric_families)
+
+    @classmethod
+    def from_env(cls) -> "CircuitBreakerRegistry":
+        return cls(enabled=os.getenv("YARGI_BREAKER_ENABLED", "true").lower() not in ("0", "false", "no", "off"))
+
+    def for_host(self, host: str, client_name: str = "") -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            def setting(key: str, default: float, cast=float) -> float:
+                value = _env_number(f"YARGI_BREAKER_{key}", default, cast)
+                return _env_number(f"YARGI_BREAKER_{client_name.upper()}_{key}", value, cast) if client_name else value
+
+            breaker = self._breakers[host] = CircuitBreaker(
+                host,
+                failure_threshold=setting("FAILURES", DEFAULT_FAILURE_THRESHOLD, int),
+                cooldown=setting("COOLDOWN", DEFAULT_COOLDOWN_SECONDS)
+            )
+        if client_name:
+            breaker.clients.add(client_name)
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        hosts = {host: breaker.stats() for host, breaker in self._breakers.items()}
+        return {
+            "enabled": self.enabled,
+            "degraded": sorted(host for host, breaker in self._breakers.items() if breaker.state != CLOSED),
+            "hosts": hosts
+        }
+
+    def metric_families(self) -> List[MetricFamily]:
+        states = [({"host": host}, _STATE_VALUES[breaker.state]) for host, breaker in self._breakers.items()]
+        return [("yargi_upstream_circuit_state", "gauge", "Circuit breaker state per upstream host: 0 closed, 1 half-open, 2 open.", states)]
+
+
+_breaker_registry: Optional[CircuitBreakerRegistry] = None
+
+def get_breaker_registry() -> CircuitBreakerRegistry:
+    """Returns the process-wide CircuitBreakerRegistry, creating it from the environment on first use."""
+    global _breaker_registry
+    if _breaker_registry is None:
+        _breaker_registry = CircuitBreakerRegistry.from_env()
+    return _breaker_registry
+
+
+class CircuitBreakerTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a client's transport so requests to a host whose circuit is open fail at once
+    with CircuitOpenError (an httpx.TransportError, so the clients' existing
+    httpx.RequestError handling applies) and every outcome feeds the host's breaker.
+    """
+
+    def __init__(self, client_name: str, transport: httpx.AsyncBaseTransport, registry: Optional[CircuitBreakerRegistry] = None):
+        self.client_name = client_name
+        self.transport = transport
+        self.registry = registry or get_breaker_registry()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        breaker = self.registry.for_host(request.url.host, self.client_name)
+        probe = breaker.before_request(request)
+        try:
+            response = await self.transport.handle_async_request(request)
+        except RETRYABLE_ERRORS as e: # PoolTimeout (a busy local pool or limiter) says nothing about the host
+            breaker.record_failure(type(e).__name__, probe)
+            raise
+        except BaseException:
+            breaker.record_abandoned(probe)
+            raise
+        if response.status_code >= 500:
+            breaker.record_failure(f"HTTP {response.status_code}", probe)
+        else:
+            breaker.record_success(probe)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,304 @@
+# common_mcp_module/cache.py
+# Shared caching layer used by the *_mcp_module clients.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache", "documents")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024 # 512 MB on disk
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60 # Published decisions do not change; 30 days is a safe default
+
+
+class DocumentCache:
+    """
+    Content-addressed on-disk cache for converted decision documents.
+
+    Every entry is addressed by the SHA-256 of (source, document key) and stored as a
+    JSON file holding the final document payload (the client's *DocumentMarkdown model)
+    plus metadata. The total size on disk is bounded; least recently used entries are
+    evicted first. TTLs can be configured per source, a TTL of 0 disables caching for
+    that source.
+    """
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_CACHE_DIRECTORY,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        source_ttl_seconds: Optional[Dict[str, float]] = None,
+        enabled: bool = True
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.default_ttl_seconds = default_ttl_seconds
+        self.source_ttl_seconds = source_ttl_seconds or {}
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        # path -> (source, size_in_bytes); ordered from least to most recently used
+        self._index: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._index_loaded = False
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "DocumentCache":
+        """
+        Builds a cache from environment variables:
+        YARGI_CACHE_ENABLED, YARGI_CACHE_DIR, YARGI_CACHE_MAX_BYTES, YARGI_CACHE_TTL
+        and per-source overrides such as YARGI_CACHE_TTL_YARGITAY.
+        """
+        source_ttls: Dict[str, float] = {}
+        prefix = "YARGI_CACHE_TTL_"
+        for env_key, env_value in os.environ.items():
+            if env_key.startswith(prefix) and env_value.strip():
+                try:
+                    source_ttls[env_key[len(prefix):].lower()] = float(env_value)
+                except ValueError:
+                    logger.warning(f"DocumentCache: Ignoring non-numeric TTL {env_key}={env_value!r}")
+        return cls(
+            directory=os.getenv("YARGI_CACHE_DIR", DEFAULT_CACHE_DIRECTORY),
+            max_bytes=int(os.getenv("YARGI_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            default_ttl_seconds=float(os.getenv("YARGI_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+            source_ttl_seconds=source_ttls,
+            enabled=os.getenv("YARGI_CACHE_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+        )
+
+    def ttl_for(self, source: str) -> float:
+        return self.source_ttl_seconds.get(source.lower(), self.default_ttl_seconds)
+
+    def _path_for(self, source: str, key: str) -> str:
+        digest = hashlib.sha256(f"{source}\x00{key}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, source, digest[:2], f"{digest}.json")
+
+    def _count(self, source: str, counter: str, amount: int = 1):
+        source_counters = self._counters.setdefault(source, {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expired": 0})
+        source_counters[counter] += amount
+
+    def _ensure_index(self):
+        """Rebuilds the LRU index from the files on disk (file mtime is the last access time)."""
+        if self._index_loaded:
+            return
+        if not os.path.isdir(self.directory):
+            self._index_loaded = True
+            return
+        found = []
+        for root, _dirs, files in os.walk(self.directory):
+            for file_name in files:
+                if not file_name.endswith(".json"):
+                    continue
+                path = os.path.join(root, file_name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                source = os.path.relpath(path, self.directory).split(os.sep)[0]
+                found.append((stat.st_mtime, path, source, stat.st_size))
+        for _mtime, path, source, size in sorted(found):
+            self._index[path] = (source, size)
+            self._total_bytes += size
+        self._index_loaded = True
+        logger.info(f"DocumentCache: Loaded {len(self._index)} entries ({self._total_bytes} bytes) from {self.directory}")
+
+    def _remove(self, path: str):
+        entry = self._index.pop(path, None)
+        if entry:
+            self._total_bytes -= entry[1]
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict_if_needed(self):
+        while self._total_bytes > self.max_bytes and self._index:
+            path, (source, _size) = next(iter(self._index.items()))
+            self._remove(path)
+            self._count(source, "evictions")
+
+    def get(self, source: str, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached payload for (source, key) or None on a miss."""
+        if not self.enabled or self.ttl_for(source) <= 0:
+            return None
+        path = self._path_for(source, key)
+        with self._lock:
+            self._ensure_index()
+            if path not in self._index:
+                self._count(source, "misses")
+                return None
+            try:
+                with open(path, "r", encoding="utf-8") as cache_file:
+                    entry = json.load(cache_file)
+            except (OSError, ValueError) as e:
+                logger.warning(f"DocumentCache: Dropping unreadable entry {path}: {e}")
+                self._remove(path)
+                self._count(source, "misses")
+                return None
+
+            if time.time() - entry.get("created_at", 0) > self.ttl_for(source):
+                self._remove(path)
+                self._count(source, "expired")
+                self._count(source, "misses")
+                return None
+
+            self._index.move_to_end(path)
+            try:
+                os.utime(path, None) # Persist the LRU position across restarts
+            except OSError:
+                pass
+            self._count(source, "hits")
+        logger.info(f"DocumentCache: Hit for {source} document {key}")
+        return entry.get("payload")
+
+    def set(self, source: str, key: str, payload: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None):
+        """Stores a JSON-serialisable payload for (source, key)."""
+        if not self.enabled or self.ttl_for(source) <= 0:
+            return
+        path = self._path_for(source, key)
+        entry = {
+            "source": source,
+            "key": key,
+            "created_at": time.time(),
+            "metadata": metadata or {},
+            "payload": payload
+        }
+        try:
+            serialized = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            logger.warning(f"DocumentCache: Payload for {source} document {key} is not JSON-serialisable: {e}")
+            return
+        if len(serialized) > self.max_bytes:
+            return
+
+        with self._lock:
+            self._ensure_index()
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(temp_path, "wb") as cache_file:
+                    cache_file.write(serialized)
+                os.replace(temp_path, path) # Atomic, readers never see partial files
+            except OSError as e:
+                logger.warning(f"DocumentCache: Could not write entry for {source} document {key}: {e}")
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+                return
+
+            previous = self._index.pop(path, None)
+            if previous:
+                self._total_bytes -= previous[1]
+            self._index[path] = (source, len(serialized))
+            self._total_bytes += len(serialized)
+            self._count(source, "writes")
+            self._evict_if_needed()
+
+    # The async clients use these: reads, writes and the first index scan touch the disk
+    # and must not block the event loop.
+
+    async def aget(self, source: str, key: str) -> Optional[Dict[str, Any]]:
+        """get() on a worker thread."""
+        if not self.enabled or self.ttl_for(source) <= 0:
+            return None
+        return await asyncio.to_thread(self.get, source, key)
+
+    async def aset(self, source: str, key: str, payload: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None):
+        """set() on a worker thread."""
+        if not self.enabled or self.ttl_for(source) <= 0:
+            return
+        await asyncio.to_thread(self.set, source, key, payload, metadata)
+
+    async def aload_index(self):
+        """Scans the cache directory on a worker thread, e.g. in the background at startup."""
+        if not self.enabled or self._index_loaded:
+            return
+        def load():
+            with self._lock:
+                self._ensure_index()
+        await asyncio.to_thread(load)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Hit/miss counters per source plus the current size of the cache. Reports only what
+        is already in memory and skips the lock, which disk reads and writes hold, so the
+        status and metrics routes can call it on the event loop. The size is None until
+        the index has been loaded.
+        """
+        index_loaded = self._index_loaded
+        return {
+            "enabled": self.enabled,
+            "index_loaded": index_loaded,
+            "entries": len(self._index) if index_loaded else None,
+            "total_bytes": self._total_bytes if index_loaded else None,
+            "max_bytes": self.max_bytes,
+            "sources": {source: dict(counters) for source, counters in list(self._counters.items())}
+        }
+
+
+class MemoryCache:
+    """
+    Byte-bounded in-memory LRU cache for intermediate artefacts that are too large or
+    too short-lived for the on-disk DocumentCache (e.g. downloaded PDFs split into pages).
+    Callers pass the size of each value; least recently used entries are evicted once
+    the total exceeds max_bytes.
+    """
+
+    def __init__(self, name: str, max_bytes: int):
+        self.name = name
+        self.max_bytes = max_bytes
+        # key -> (value, size_in_bytes); ordered from least to most recently used
+        self._entries: "OrderedDict[str, Tuple[Any, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counters["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._counters["hits"] += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any, size_bytes: int):
+        """Stores (or re-sizes) an entry; values larger than max_bytes are not cached."""
+        previous = self._entries.pop(key, None)
+        if previous:
+            self._total_bytes -= previous[1]
+        if size_bytes > self.max_bytes:
+            return
+        self._entries[key] = (value, size_bytes)
+        self._total_bytes += size_bytes
+        while self._total_bytes > self.max_bytes and self._entries:
+            _key, (_value, evicted_size) = self._entries.popitem(last=False)
+            self._total_bytes -= evicted_size
+            self._counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "total_bytes": self._total_bytes,
+            "max_bytes": self.max_bytes,
+            **self._counters
+        }
+
+
+_document_cache: Optional[DocumentCache] = None
+
+def get_document_cache() -> DocumentCache:
+    """Returns the process-wide DocumentCache, creating it from the environment on first use."""
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache.from_env()
+    return _document_cache
@@ -0,0 +1,125 @@
+# common_mcp_module/clients.py
+# Registry that imports the API client modules and creates the clients on first use.
+
+import asyncio
+import importlib
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+class LazyClientRegistry:
+    """
+    Creates each API client the first time it is requested, from a "module:Class" spec.
+    The client modules pull in the heavy dependencies (MarkItDown, pypdf, Playwright,
+    BeautifulSoup), so a server whose tools were never called never imports them, and
+    a stdio launch only pays for the tools it actually uses.
+
+    Clients are reachable as attributes (registry.kik) or via get("kik").
+    """
+
+    def __init__(self, specs: Dict[str, str]):
+        self._specs = dict(specs)
+        self._instances: Dict[str, Any] = {}
+        self._load_seconds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._specs:
+            raise KeyError(f"Unknown client {name!r}; known clients: {', '.join(self._specs)}")
+        with self._lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                module_name, class_name = self._specs[name].split(":", 1)
+                started = time.perf_counter()
+                client_class = getattr(importlib.import_module(module_name), class_name)
+                instance = client_class()
+                self._load_seconds[name] = time.perf_counter() - started
+                self._instances[name] = instance
+                logger.info(f"LazyClientRegistry: Loaded client '{name}' in {self._load_seconds[name] * 1000:.0f} ms.")
+        return instance
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self.get(name)
+        except KeyError as e:
+            raise AttributeError(str(e)) from None
+
+    @property
+    def names(self) -> Iterable[str]:
+        return tuple(self._specs)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def loaded(self) -> Dict[str, Any]:
+        """The clients created so far, by name (never triggers loading)."""
+        return dict(self._instances)
+
+    def preload(self, names: Optional[Iterable[str]] = None):
+        """Creates the given clients (all when names is None) ahead of their first use."""
+        for name in (self._specs if names is None else names):
+            self.get(name)
+
+    def preload_from_env(self):
+        """
+        Preloads the clients listed in YARGI_PRELOAD_CLIENTS (comma separated, or "all"),
+        for long-running deployments that prefer a slower start to a slower first call.
+        """
+        requested = os.getenv("YARGI_PRELOAD_CLIENTS", "").strip().lower()
+        if not requested:
+            return
+        if requested == "all":
+            self.preload()
+            return
+        names = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in names if name not in self._specs]
+        if unknown:
+            logger.warning(f"LazyClientRegistry: Ignoring unknown clients in YARGI_PRELOAD_CLIENTS: {', '.join(unknown)}")
+        self.preload(name for name in names if name in self._specs)
+
+    async def aclose(self, timeout: float = 10.0):
+        """
+        Closes the clients created so far (HTTP pools, KİK browser) and forgets them, so a
+        later call creates fresh ones. A client that does not close within timeout seconds
+        is abandoned with a warning rather than holding up shutdown.
+        """
+        with self._lock:
+            instances = self._instances
+            self._instances = {}
+            self._load_seconds = {}
+
+        async def close(name: str, instance: Any):
+            close_session = getattr(instance, "close_client_session", None)
+            if close_session is None:
+                return
+            try:
+                await asyncio.wait_for(close_session(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"LazyClientRegistry: Client '{name}' did not close within {timeout}s.")
+            except Exception as e:
+                logger.error(f"LazyClientRegistry: Error closing client '{name}': {e}")
+
+        await asyncio.gather(*(close(name, instance) for name, instance in instances.items()))
+        if instances:
+            logger.info(f"LazyClientRegistry: Closed clients: {', '.join(instances)}.")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "loaded": name in self._instances,
+                "load_ms": round(self._load_seconds[name] * 1000, 1) if name in self._load_seconds else None
+            }
+            for name in self._specs
+        }
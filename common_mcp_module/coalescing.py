@@ -0,0 +1,118 @@
+# common_mcp_module/coalescing.py
+# Single-flight coalescing of identical concurrent client calls.
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def _key_part(value: Any) -> str:
+    """Stable textual form of one call argument (request models are dumped with sorted keys)."""
+    if isinstance(value, BaseModel):
+        return json.dumps(value.model_dump(mode="json"), sort_keys=True, ensure_ascii=False)
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return repr(value)
+
+
+def make_call_key(name: str, arguments: Dict[str, Any]) -> str:
+    """Key identifying a call by operation name and its bound arguments."""
+    parts = [f"{param}={_key_part(value)}" for param, value in arguments.items()]
+    return f"{name}({', '.join(parts)})"
+
+
+class RequestCoalescer:
+    """
+    Lets identical concurrent calls share one execution.
+
+    The first caller for a key (the leader) starts the call as a task; callers arriving
+    while it is still running await the same task instead of issuing their own upstream
+    request and conversion. Results and exceptions are delivered to every waiter. The
+    shared task is shielded, so a cancelled caller does not cancel it for the others.
+    Nothing is kept once the call finishes; caching is the document/search caches' job.
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._in_flight: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "RequestCoalescer":
+        """Builds a coalescer from YARGI_COALESCING_ENABLED (default: true)."""
+        return cls(enabled=os.getenv("YARGI_COALESCING_ENABLED", "true").lower() not in ("0", "false", "no", "off"))
+
+    def _count(self, name: str, counter: str):
+        name_counters = self._counters.setdefault(name, {"calls": 0, "executions": 0, "deduplicated": 0})
+        name_counters[counter] += 1
+
+    async def run(self, name: str, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Runs call() unless an identical call (same key) is in flight, in which case its result is shared."""
+        if not self.enabled:
+            return await call()
+        self._count(name, "calls")
+        # Tasks belong to a loop, so keys are scoped to the running loop
+        in_flight_key = (id(asyncio.get_running_loop()), key)
+        task = self._in_flight.get(in_flight_key)
+        if task is None:
+            self._count(name, "executions")
+            task = asyncio.ensure_future(call())
+            self._in_flight[in_flight_key] = task
+            task.add_done_callback(functools.partial(self._on_done, in_flight_key))
+        else:
+            self._count(name, "deduplicated")
+            logger.info(f"RequestCoalescer: Joined in-flight call {name}")
+        return await asyncio.shield(task)
+
+    def _on_done(self, in_flight_key: Tuple[int, Hashable], task: asyncio.Task):
+        if self._in_flight.get(in_flight_key) is task:
+            del self._in_flight[in_flight_key]
+        if not task.cancelled():
+            task.exception() # Mark as retrieved even if every waiter was cancelled
+
+    def stats(self) -> Dict[str, Any]:
+        """Per-operation counters: calls, upstream executions and deduplicated calls."""
+        return {
+            "enabled": self.enabled,
+            "in_flight": len(self._in_flight),
+            "operations": {name: dict(counters) for name, counters in self._counters.items()}
+        }
+
+
+_request_coalescer: Optional[RequestCoalescer] = None
+
+def get_request_coalescer() -> RequestCoalescer:
+    """Returns the process-wide RequestCoalescer, creating it from the environment on first use."""
+    global _request_coalescer
+    if _request_coalescer is None:
+        _request_coalescer = RequestCoalescer.from_env()
+    return _request_coalescer
+
+
+def coalesce(name: str):
+    """
+    Decorator for async client methods: identical concurrent calls (same arguments,
+    excluding self) share one execution through the process-wide RequestCoalescer.
+    """
+    def decorator(method: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            # Bind to the signature so f(x), f(x, 1) and f(id=x) share a key when they mean the same call
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = make_call_key(name, dict(list(bound.arguments.items())[1:]))
+            return await get_request_coalescer().run(name, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
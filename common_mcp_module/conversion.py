@@ -0,0 +1,48 @@
+# common_mcp_module/conversion.py
+# Shared HTML/PDF to Markdown conversion service used by all clients.
+
+import io
+import logging
+from functools import lru_cache
+from typing import Optional
+
+from markitdown import MarkItDown, StreamInfo
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+HTML_STREAM_INFO = StreamInfo(mimetype="text/html", extension=".html", charset="utf-8")
+PDF_STREAM_INFO = StreamInfo(mimetype="application/pdf", extension=".pdf")
+
+
+@lru_cache(maxsize=None)
+def get_markitdown_converter(enable_plugins: bool = False) -> MarkItDown:
+    """
+    Returns the MarkItDown converter for this process.
+    Building a converter registers every built-in converter, so it is done once
+    per process (and plugin setting) instead of once per document.
+    """
+    logger.info(f"Creating shared MarkItDown converter (enable_plugins={enable_plugins}).")
+    return MarkItDown(enable_plugins=enable_plugins)
+
+
+def convert_html_to_markdown(html_content: str, enable_plugins: bool = False) -> Optional[str]:
+    """
+    Converts an HTML string to Markdown from an in-memory stream (no temporary files).
+    Conversion errors are raised to the caller, which decides how to report them.
+    """
+    if not html_content:
+        return None
+    html_stream = io.BytesIO(html_content.encode("utf-8"))
+    conversion_result = get_markitdown_converter(enable_plugins).convert_stream(html_stream, stream_info=HTML_STREAM_INFO)
+    return conversion_result.text_content
+
+
+def convert_pdf_to_markdown(pdf_bytes: bytes, enable_plugins: bool = False) -> Optional[str]:
+    """Converts PDF bytes to Markdown from an in-memory stream (no temporary files)."""
+    if not pdf_bytes:
+        return None
+    pdf_stream = io.BytesIO(pdf_bytes)
+    conversion_result = get_markitdown_converter(enable_plugins).convert_stream(pdf_stream, stream_info=PDF_STREAM_INFO)
+    return conversion_result.text_content
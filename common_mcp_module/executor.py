@@ -0,0 +1,133 @@
+# common_mcp_module/executor.py
+# Executor that keeps CPU-bound document conversion off the event loop.
+
+import asyncio
+import functools
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from .metrics import phase_timer
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_QUEUE_DEPTH = 64
+DEFAULT_JOB_TIMEOUT_SECONDS = 120.0
+
+
+class ConversionQueueFullError(RuntimeError):
+    """Raised when more conversions are waiting than the configured queue depth allows."""
+
+
+class ConversionExecutor:
+    """
+    Runs HTML/PDF conversion jobs in a process pool (default) or a thread pool.
+
+    Jobs must be picklable callables when the process pool is used, which is why the
+    client conversion helpers are static methods. The number of jobs that may be
+    running or queued at once is bounded; further submissions fail fast with
+    ConversionQueueFullError. Each job has a timeout after which the awaiting
+    coroutine is released (a job that already started keeps its worker until it ends).
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_queue_depth: int = DEFAULT_MAX_QUEUE_DEPTH,
+        job_timeout_seconds: float = DEFAULT_JOB_TIMEOUT_SECONDS
+    ):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unsupported executor kind: {kind!r} (expected 'process' or 'thread').")
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.max_queue_depth = max(0, max_queue_depth)
+        self.job_timeout_seconds = job_timeout_seconds
+
+        self._pool: Optional[Executor] = None
+        self._in_flight = 0
+        self._counters = {"completed": 0, "failed": 0, "timeouts": 0, "rejected": 0}
+
+    @classmethod
+    def from_env(cls) -> "ConversionExecutor":
+        """
+        Builds an executor from YARGI_CONVERSION_EXECUTOR (process|thread),
+        YARGI_CONVERSION_WORKERS, YARGI_CONVERSION_QUEUE_DEPTH and YARGI_CONVERSION_TIMEOUT.
+        """
+        return cls(
+            kind=os.getenv("YARGI_CONVERSION_EXECUTOR", "process").lower(),
+            max_workers=int(os.getenv("YARGI_CONVERSION_WORKERS", DEFAULT_MAX_WORKERS)),
+            max_queue_depth=int(os.getenv("YARGI_CONVERSION_QUEUE_DEPTH", DEFAULT_MAX_QUEUE_DEPTH)),
+            job_timeout_seconds=float(os.getenv("YARGI_CONVERSION_TIMEOUT", DEFAULT_JOB_TIMEOUT_SECONDS))
+        )
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="conversion")
+            logger.info(f"ConversionExecutor: Started {self.kind} pool with {self.max_workers} workers.")
+        return self._pool
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: Optional[float] = None) -> Any:
+        """Runs func(*args) on the pool and returns its result."""
+        if self._in_flight >= self.max_workers + self.max_queue_depth:
+            self._counters["rejected"] += 1
+            raise ConversionQueueFullError(
+                f"Conversion queue is full ({self._in_flight} jobs in flight); try again shortly."
+            )
+        self._in_flight += 1
+        job_timeout = timeout if timeout is not None else self.job_timeout_seconds
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._get_pool(), functools.partial(func, *args))
+            with phase_timer("convert"): # Includes time queued behind other jobs
+                result = await asyncio.wait_for(future, timeout=job_timeout)
+            self._counters["completed"] += 1
+            return result
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            logger.error(f"ConversionExecutor: {getattr(func, '__qualname__', func)} timed out after {job_timeout}s.")
+            raise
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge PDF); start a fresh pool for the next job.
+            self._counters["failed"] += 1
+            logger.error("ConversionExecutor: Process pool is broken; it will be recreated.")
+            self._pool = None
+            raise
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self._in_flight,
+            **self._counters
+        }
+
+    def shutdown(self, wait: bool = False):
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait, cancel_futures=True)
+            self._pool = None
+            logger.info(f"ConversionExecutor: {self.kind} pool shut down.")
+
+
+_conversion_executor: Optional[ConversionExecutor] = None
+
+def get_conversion_executor() -> ConversionExecutor:
+    """Returns the process-wide ConversionExecutor, creating it from the environment on first use."""
+    global _conversion_executor
+    if _conversion_executor is None:
+        _conversion_executor = ConversionExecutor.from_env()
+    return _conversion_executor
@@ -0,0 +1,192 @@
+# common_mcp_module/lifecycle.py
+# Server lifecycle: starts shared resources, drains in-flight tool calls and closes resources on shutdown.
+
+import asyncio
+import inspect
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+from starlette.applications import Starlette
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_DRAIN_TIMEOUT_SECONDS = 30.0
+
+Hook = Callable[[], Union[None, Awaitable[None]]]
+
+
+class ServerLifecycle:
+    """
+    Runs startup hooks when the server starts and, when it stops, waits up to
+    drain_timeout seconds for tool calls in flight before running the shutdown hooks
+    (closing HTTP pools, the KİK browser, background tasks and the conversion pool).
+    Tool calls arriving while draining are rejected.
+
+    Several apps may share one lifecycle (e.g. a FastAPI app mounting the MCP app);
+    resources start with the first and stop with the last.
+    """
+
+    def __init__(self, drain_timeout: float = DEFAULT_DRAIN_TIMEOUT_SECONDS):
+        self.drain_timeout = drain_timeout
+        self.state = "stopped" # stopped -> running -> draining -> stopped
+        self._startup_hooks: List[Tuple[str, Hook]] = []
+        self._shutdown_hooks: List[Tuple[str, Hook]] = []
+        self._users = 0
+        self._in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+        self._counters = {"starts": 0, "drained_calls": 0, "abandoned_calls": 0, "rejected_calls": 0}
+        self._last_drain_seconds: Optional[float] = None
+
+    @classmethod
+    def from_env(cls) -> "ServerLifecycle":
+        """Builds the lifecycle from YARGI_DRAIN_TIMEOUT (seconds, default 30)."""
+        return cls(drain_timeout=float(os.getenv("YARGI_DRAIN_TIMEOUT", DEFAULT_DRAIN_TIMEOUT_SECONDS)))
+
+    def on_startup(self, hook: Hook) -> Hook:
+        """Registers a hook (sync or async) run at startup, in registration order."""
+        self._startup_hooks.append((getattr(hook, "__name__", repr(hook)), hook))
+        return hook
+
+    def on_shutdown(self, hook: Hook) -> Hook:
+        """Registers a hook (sync or async) run at shutdown, in reverse registration order."""
+        self._shutdown_hooks.append((getattr(hook, "__name__", repr(hook)), hook))
+        return hook
+
+    @staticmethod
+    async def _run_hook(phase: str, name: str, hook: Hook):
+        try:
+            result = hook()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e: # One failing hook must not keep the others from running
+            logger.error(f"ServerLifecycle: {phase} hook {name} failed: {e}", exc_info=True)
+
+    async def startup(self):
+        self._users += 1
+        if self._users > 1:
+            return
+        self.state = "running"
+        self._idle = None # Bound to the event loop it is first awaited on; a restart may use a new loop
+        self._counters["starts"] += 1
+        for name, hook in self._startup_hooks:
+            await self._run_hook("Startup", name, hook)
+        logger.info("ServerLifecycle: Started.")
+
+    async def drain(self):
+        """Stops accepting tool calls and waits for the ones in flight, up to drain_timeout."""
+        if self._users > 1 or self.state != "running":
+            return
+        self.state = "draining"
+        started = time.monotonic()
+        in_flight = self._in_flight
+        if in_flight:
+            logger.info(f"ServerLifecycle: Draining {in_flight} tool calls (timeout {self.drain_timeout}s)...")
+            try:
+                await asyncio.wait_for(self._idle_event().wait(), timeout=self.drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(f"ServerLifecycle: {self._in_flight} tool calls still running after {self.drain_timeout}s; shutting down anyway.")
+            self._counters["abandoned_calls"] += self._in_flight
+            self._counters["drained_calls"] += in_flight - self._in_flight
+        self._last_drain_seconds = time.monotonic() - started
+
+    async def shutdown(self):
+        self._users = max(self._users - 1, 0)
+        if self._users > 0:
+            return
+        await self.drain()
+        for name, hook in reversed(self._shutdown_hooks):
+            await self._run_hook("Shutdown", name, hook)
+        self.state = "stopped"
+        logger.info("ServerLifecycle: Stopped.")
+
+    @asynccontextmanager
+    async def running(self) -> AsyncIterator["ServerLifecycle"]:
+        """Startup on entry, drain and shutdown on exit."""
+        await self.startup()
+        try:
+            yield self
+        finally:
+            await self.shutdown()
+
+    def _idle_event(self) -> asyncio.Event:
+        if self._idle is None:
+            self._idle = asyncio.Event()
+            if self._in_flight == 0:
+                self._idle.set()
+        return self._idle
+
+    @asynccontextmanager
+    async def track(self) -> AsyncIterator[None]:
+        """Counts the enclosed work as in flight; raises ToolError while the server is draining."""
+        if self.state == "draining":
+            self._counters["rejected_calls"] += 1
+            raise ToolError("The server is shutting down; retry the call shortly.")
+        self._in_flight += 1
+        self._idle_event().clear()
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle_event().set()
+
+    def wrap_app(self, http_app: Starlette) -> Starlette:
+        """
+        Puts the lifecycle around an MCP HTTP app's own lifespan (the session manager), so
+        startup runs before sessions are served and in-flight calls are drained while the
+        session manager is still up. Apps that mount the MCP app and pass
+        `lifespan=mcp_app.lifespan` pick this up unchanged.
+        """
+        app_lifespan = http_app.router.lifespan_context
+
+        @asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[Any]:
+            await self.startup()
+            try:
+                async with app_lifespan(app) as state:
+                    try:
+                        yield state
+                    finally:
+                        await self.drain()
+            finally:
+                await self.shutdown()
+
+        http_app.router.lifespan_context = lifespan
+        return http_app
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "in_flight": self._in_flight,
+            "drain_timeout_seconds": self.drain_timeout,
+            "last_drain_seconds": round(self._last_drain_seconds, 3) if self._last_drain_seconds is not None else None,
+            **self._counters
+        }
+
+
+class LifecycleMiddleware(Middleware):
+    """Tracks tool calls in flight for draining and rejects new ones during shutdown."""
+
+    def __init__(self, lifecycle: ServerLifecycle):
+        self.lifecycle = lifecycle
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        async with self.lifecycle.track():
+            return await call_next(context)
+
+
+_server_lifecycle: Optional[ServerLifecycle] = None
+
+def get_server_lifecycle() -> ServerLifecycle:
+    """Returns the process-wide ServerLifecycle, creating it from the environment on first use."""
+    global _server_lifecycle
+    if _server_lifecycle is None:
+        _server_lifecycle = ServerLifecycle.from_env()
+    return _server_lifecycle
@@ -0,0 +1,321 @@
+# common_mcp_module/limiter.py
+# Per-upstream-host concurrency (AIMD) and rate (token bucket) limits shared by all clients.
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import httpx
+
+from .metrics import MetricFamily, get_metrics_registry
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_MIN_IN_FLIGHT = 1
+DEFAULT_RATE = 10.0 # Requests per second; 0 disables the token bucket
+DEFAULT_LATENCY_SPIKE_FACTOR = 3.0
+DECREASE_FACTOR = 0.5
+DECREASE_COOLDOWN_SECONDS = 1.0 # Responses to requests sent before a decrease must not trigger another
+MAX_RETRY_AFTER_SECONDS = 60.0
+LATENCY_EWMA_WEIGHT = 0.1
+LATENCY_WARMUP_SAMPLES = 10
+
+
+def _env_number(name: str, default: float, cast=float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"UpstreamLimiterRegistry: Ignoring non-numeric {name}={value!r}")
+        return default
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """The response's Retry-After header (seconds or HTTP date) in seconds, capped at 60."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER_SECONDS)
+
+
+class HostLimiter:
+    """
+    Limits the requests to one upstream host in two ways:
+
+    - concurrency: at most `limit` requests wait for a response at once. The limit
+      adapts with AIMD: it grows by one per `limit` successful responses up to
+      max_in_flight and halves (down to min_in_flight) on 429/5xx responses,
+      timeouts, connection errors or a response much slower than the recent average;
+    - rate: a token bucket allows `rate` requests per second with bursts of `burst`.
+      A Retry-After on a 429/503 response pauses the host for that long.
+
+    Requests over the limits wait in FIFO order.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        min_in_flight: int = DEFAULT_MIN_IN_FLIGHT,
+        rate: float = DEFAULT_RATE,
+        burst: Optional[float] = None,
+        latency_spike_factor: float = DEFAULT_LATENCY_SPIKE_FACTOR
+    ):
+        self.host = host
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.min_in_flight = max(1, min(int(min_in_flight), self.max_in_flight))
+        self.rate = max(0.0, rate)
+        self.burst = max(1.0, burst if burst is not None else self.rate)
+        self.latency_spike_factor = latency_spike_factor
+        self.limit = float(self.max_in_flight)
+
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._tokens = self.burst
+        self._refilled_at = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._latency_samples = 0
+        self._counters = {"requests": 0, "queued": 0, "queue_timeouts": 0, "decreases": 0, "throttled": 0}
+
+    # --- Admission ---
+
+    def _token_delay(self, now: float) -> float:
+        """Seconds until a request may start by rate; takes the token when it is 0."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.rate <= 0:
+            return 0.0
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self.rate
+
+    def _wake_next(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+    async def acquire(self):
+        """Waits until the host's concurrency and rate limits admit one more request."""
+        queued = False
+        # A concurrency slot first; newcomers line up behind requests already waiting
+        while self._in_flight >= int(self.limit) or (self._waiters and not queued):
+            waiter = asyncio.get_running_loop().create_future()
+            if queued:
+                self._waiters.appendleft(waiter) # Woken but beaten to the slot: keep its place at the front
+            else:
+                self._waiters.append(waiter)
+            queued = True
+            try:
+                await waiter
+            except BaseException:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled():
+                    self._wake_next() # Woken but giving up: pass the wake-up on
+                raise
+        self._in_flight += 1
+        # Then a token; the slot stays reserved meanwhile so later requests cannot overtake
+        try:
+            delay = self._token_delay(time.monotonic())
+            while delay > 0:
+                queued = True
+                await asyncio.sleep(delay)
+                delay = self._token_delay(time.monotonic())
+        except BaseException:
+            self._in_flight -= 1
+            self._wake_next()
+            raise
+        self._counters["requests"] += 1
+        if queued:
+            self._counters["queued"] += 1
+        if self._in_flight < int(self.limit):
+            self._wake_next()
+
+    # --- Feedback ---
+
+    def _decrease(self, reason: str):
+        now = time.monotonic()
+        if now - self._last_decrease < DECREASE_COOLDOWN_SECONDS:
+            return
+        self._last_decrease = now
+        previous = self.limit
+        self.limit = max(float(self.min_in_flight), self.limit * DECREASE_FACTOR)
+        self._counters["decreases"] += 1
+        if int(previous) != int(self.limit):
+            logger.warning(f"HostLimiter: {self.host} concurrency limit {int(previous)} -> {int(self.limit)} ({reason}).")
+
+    def release(self, response: Optional[httpx.Response] = None, error: Optional[BaseException] = None, latency: float = 0.0):
+        """Frees the request's slot and adapts the limit to how the host responded."""
+        self._in_flight = max(self._in_flight - 1, 0)
+        if error is not None:
+            # PoolTimeout means our own connection pool is saturated, not that the host is struggling
+            if isinstance(error, (httpx.TimeoutException, httpx.NetworkError)) and not isinstance(error, httpx.PoolTimeout):
+                self._decrease(type(error).__name__)
+        elif response is not None and (response.status_code == 429 or response.status_code >= 500):
+            self._counters["throttled"] += 1
+            retry_after = retry_after_seconds(response) if response.status_code in (429, 503) else None
+            if retry_after:
+                now = time.monotonic()
+                if now >= self._paused_until: # Log once per pause, not for every throttled response
+                    logger.warning(f"HostLimiter: {self.host} asked to retry after {retry_after:.1f}s; pausing new requests.")
+                self._paused_until = max(self._paused_until, now + retry_after)
+            self._decrease(f"HTTP {response.status_code}")
+        elif response is not None:
+            spike = (
+                self._latency_samples >= LATENCY_WARMUP_SAMPLES and self._latency_ewma is not None
+                and latency > self._latency_ewma * self.latency_spike_factor
+            )
+            self._latency_ewma = latency if self._latency_ewma is None else (
+                (1 - LATENCY_EWMA_WEIGHT) * self._latency_ewma + LATENCY_EWMA_WEIGHT * latency
+            )
+            self._latency_samples += 1
+            if spike:
+                self._decrease(f"latency {latency:.2f}s vs average {self._latency_ewma:.2f}s")
+            else:
+                self.limit = min(float(self.max_in_flight), self.limit + 1.0 / self.limit)
+        self._wake_next()
+
+    def record_queue_timeout(self):
+        """Counts a request that gave up waiting for the limiter."""
+        self._counters["queue_timeouts"] += 1
+
+    @property
+    def waiting(self) -> int:
+        """Requests currently waiting for a concurrency slot."""
+        return len(self._waiters)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": int(self.limit),
+            "max_in_flight": self.max_in_flight,
+            "min_in_flight": self.min_in_flight,
+            "rate": self.rate,
+            "burst": self.burst,
+            "in_flight": self._in_flight,
+            "waiting": self.waiting,
+            "paused_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 1),
+            "latency_average_seconds": round(self._latency_ewma, 3) if self._latency_ewma is not None else None,
+            **self._counters
+        }
+
+
+class UpstreamLimiterRegistry:
+    """
+    One HostLimiter per upstream host, shared by every client that talks to it.
+    Defaults come from YARGI_UPSTREAM_MAX_IN_FLIGHT, YARGI_UPSTREAM_MIN_IN_FLIGHT,
+    YARGI_UPSTREAM_RATE, YARGI_UPSTREAM_BURST and YARGI_UPSTREAM_LATENCY_SPIKE; the
+    client that first reaches a host may override them with YARGI_UPSTREAM_<CLIENT>_*
+    (each client talks to a single host, as with the YARGI_HTTP_<CLIENT>_* pool limits).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._limiters: Dict[str, HostLimiter] = {}
+        get_metrics_registry().add_collector(self.metric_families)
+
+    @classmethod
+    def from_env(cls) -> "UpstreamLimiterRegistry":
+        return cls(enabled=os.getenv("YARGI_UPSTREAM_LIMIT_ENABLED", "true").lower() not in ("0", "false", "no", "off"))
+
+    def for_host(self, host: str, client_name: str = "") -> HostLimiter:
+        limiter = self._limiters.get(host)
+        if limiter is None:
+            def setting(key: str, default: float, cast=float) -> float:
+                value = _env_number(f"YARGI_UPSTREAM_{key}", default, cast)
+                return _env_number(f"YARGI_UPSTREAM_{client_name.upper()}_{key}", value, cast) if client_name else value
+
+            rate = setting("RATE", DEFAULT_RATE)
+            limiter = self._limiters[host] = HostLimiter(
+                host,
+                max_in_flight=setting("MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT, int),
+                min_in_flight=setting("MIN_IN_FLIGHT", DEFAULT_MIN_IN_FLIGHT, int),
+                rate=rate,
+                burst=setting("BURST", max(rate, 1.0)),
+                latency_spike_factor=setting("LATENCY_SPIKE", DEFAULT_LATENCY_SPIKE_FACTOR)
+            )
+        return limiter
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "hosts": {host: limiter.stats() for host, limiter in self._limiters.items()}}
+
+    def metric_families(self) -> List[MetricFamily]:
+        limits, waiting = [], []
+        for host, limiter in self._limiters.items():
+            limits.append(({"host": host}, int(limiter.limit)))
+            waiting.append(({"host": host}, limiter.waiting))
+        return [
+            ("yargi_upstream_concurrency_limit", "gauge", "Current adaptive concurrency limit per upstream host.", limits),
+            ("yargi_upstream_waiting", "gauge", "Requests waiting for the per-host limiter.", waiting),
+        ]
+
+
+_limiter_registry: Optional[UpstreamLimiterRegistry] = None
+
+def get_limiter_registry() -> UpstreamLimiterRegistry:
+    """Returns the process-wide UpstreamLimiterRegistry, creating it from the environment on first use."""
+    global _limiter_registry
+    if _limiter_registry is None:
+        _limiter_registry = UpstreamLimiterRegistry.from_env()
+    return _limiter_registry
+
+
+class LimitedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a client's transport so every request first passes the per-host limiter. A
+    request holds its slot until the response headers arrive. Waiting counts against
+    the client's pool timeout and raises httpx.PoolTimeout when it runs out.
+    """
+
+    def __init__(self, client_name: str, transport: httpx.AsyncBaseTransport, registry: Optional[UpstreamLimiterRegistry] = None):
+        self.client_name = client_name
+        self.transport = transport
+        self.registry = registry or get_limiter_registry()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        limiter = self.registry.for_host(host, self.client_name)
+        pool_timeout = (request.extensions.get("timeout") or {}).get("pool")
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(limiter.acquire(), timeout=pool_timeout)
+        except asyncio.TimeoutError:
+            limiter.record_queue_timeout()
+            raise httpx.PoolTimeout(f"Waited {pool_timeout}s for the {host} request limiter", request=request) from None
+        started = time.perf_counter()
+        metrics = get_metrics_registry()
+        if metrics.enabled:
+            metrics.upstream_queue.observe(started - queued_at, host=host)
+
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException as e:
+            limiter.release(error=e)
+            raise
+        limiter.release(response=response, latency=time.perf_counter() - started)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
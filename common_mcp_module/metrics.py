@@ -0,0 +1,328 @@
+# common_mcp_module/metrics.py
+# Prometheus-style metrics for MCP tools and upstream court sites, rendered in the text exposition format.
+
+import contextvars
+import logging
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import httpx
+from fastmcp.server.middleware import CallNext, Middleware, MiddlewareContext
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Seconds; upstream court sites answer in anything from tens of milliseconds to a minute
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+# A collector returns (name, type, help, [(labels, value), ...]) families computed at scrape time
+MetricFamily = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric(ABC):
+    type_name = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels.get(label, "")) for label in self.label_names)
+
+    def _labels(self, key: LabelValues, **extra: str) -> Dict[str, str]:
+        return {**dict(zip(self.label_names, key)), **extra}
+
+    @abstractmethod
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        """The metric's (sample name, labels, value) lines, in exposition order."""
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, self._labels(key), value) for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts, sum, count)
+        self._values: Dict[LabelValues, List[Any]] = {}
+
+    def observe(self, seconds: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry[0][index] += 1
+                    break
+            entry[1] += seconds
+            entry[2] += 1
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, (bucket_counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", self._labels(key, le=_format_value(bound)), cumulative))
+                samples.append((f"{self.name}_bucket", self._labels(key, le="+Inf"), count))
+                samples.append((f"{self.name}_sum", self._labels(key), total))
+                samples.append((f"{self.name}_count", self._labels(key), count))
+        return samples
+
+
+class MetricsRegistry:
+    """
+    Holds the server's metrics and renders them for a Prometheus scrape. Besides the
+    metrics updated as requests happen, collectors registered with add_collector are
+    called at scrape time for values other components already count (e.g. cache hits).
+    """
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = enabled
+        self._metrics: List[_Metric] = []
+        self._collectors: List[Callable[[], List[MetricFamily]]] = []
+
+        self.tool_calls = self._add(Counter("yargi_tool_calls_total", "MCP tool calls by outcome.", ("tool", "outcome")))
+        self.tool_duration = self._add(Histogram("yargi_tool_duration_seconds", "MCP tool call latency.", ("tool",)))
+        self.tool_in_flight = self._add(Gauge("yargi_tool_in_flight", "MCP tool calls currently running.", ("tool",)))
+        self.upstream_requests = self._add(Counter("yargi_upstream_requests_total", "Requests to upstream sites by response status ('error' when no response arrived).", ("client", "host", "status")))
+        self.upstream_errors = self._add(Counter("yargi_upstream_errors_total", "Failed upstream requests: transport exceptions and HTTP 4xx/5xx responses.", ("client", "host", "error")))
+        self.upstream_in_flight = self._add(Gauge("yargi_upstream_in_flight", "Upstream requests currently waiting for or reading a response.", ("client", "host")))
+        self.upstream_retries = self._add(Counter("yargi_upstream_retries_total", "Upstream request retries by what failed (status code or exception); reason 'exhausted' counts requests that still failed on the last attempt.", ("client", "host", "reason")))
+        self.upstream_queue = self._add(Histogram("yargi_upstream_queue_seconds", "Time requests waited for the per-host concurrency and rate limiter.", ("host",)))
+        self.upstream_phase = self._add(Histogram("yargi_upstream_phase_seconds", "Time spent per upstream response in each phase: network (request until the body is read), parse, validate, convert.", ("host", "phase")))
+
+    @classmethod
+    def from_env(cls) -> "MetricsRegistry":
+        """Builds the registry from YARGI_METRICS_ENABLED (default true)."""
+        return cls(enabled=os.getenv("YARGI_METRICS_ENABLED", "true").lower() not in ("0", "false", "no", "off"))
+
+    def _add(self, metric: _Metric) -> Any:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], List[MetricFamily]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """The metrics in the Prometheus text exposition format (version 0.0.4)."""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for name, labels, value in metric.samples())
+        for collector in self._collectors:
+            try:
+                families = collector()
+            except Exception as e: # A broken collector must not take the whole endpoint down
+                logger.warning(f"MetricsRegistry: Collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, type_name, help_text, samples in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {type_name}")
+                lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+_metrics_registry: Optional[MetricsRegistry] = None
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Returns the process-wide MetricsRegistry, creating it from the environment on first use."""
+    global _metrics_registry
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry.from_env()
+    return _metrics_registry
+
+
+class ToolMetricsMiddleware(Middleware):
+    """Counts MCP tool calls by outcome, times them and tracks the calls in flight per tool."""
+
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry
+
+    async def on_call_tool(self, context: MiddlewareContext, call_next: CallNext) -> Any:
+        registry = self.registry or get_metrics_registry()
+        if not registry.enabled:
+            return await call_next(context)
+        tool = context.message.name
+        registry.tool_in_flight.inc(tool=tool)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call_next(context)
+            outcome = "error" if getattr(result, "isError", False) else "success"
+            return result
+        finally:
+            registry.tool_in_flight.dec(tool=tool)
+            registry.tool_duration.observe(time.perf_counter() - started, tool=tool)
+            registry.tool_calls.inc(tool=tool, outcome=outcome)
+
+# --- Upstream phases ---
+
+# Host of the upstream response the current task received last; parse/validate/convert
+# work that follows is attributed to it
+_current_upstream_host: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("yargi_upstream_host", default=None)
+
+
+def observe_phase(phase: str, seconds: float):
+    """Records time spent in a phase for the upstream host the current task last talked to."""
+    host = _current_upstream_host.get()
+    registry = get_metrics_registry()
+    if host is not None and registry.enabled:
+        registry.upstream_phase.observe(seconds, host=host, phase=phase)
+
+
+@contextmanager
+def phase_timer(phase: str) -> Iterator[None]:
+    """Times the enclosed block as a parse/validate/convert phase of the current upstream response."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(phase, time.perf_counter() - started)
+
+
+class _TimedStream(httpx.AsyncByteStream):
+    """Response body stream that reports when the body was read to the end or closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[], None]):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+
+class MeteredTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a client's transport to count requests and errors per upstream host, track the
+    requests in flight and time the network phase: from sending the request until the
+    response body has been read (or the response closed).
+    """
+
+    def __init__(self, client_name: str, transport: httpx.AsyncBaseTransport, registry: Optional[MetricsRegistry] = None):
+        self.client_name = client_name
+        self.transport = transport
+        self.registry = registry or get_metrics_registry()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        labels = {"client": self.client_name, "host": host}
+        registry = self.registry
+        registry.upstream_in_flight.inc(**labels)
+        started = time.perf_counter()
+        try:
+            response = await self.transport.handle_async_request(request)
+        except BaseException as e: # Cancellation too (tool timeouts, coalescing, prefetch), or the gauge drifts up
+            registry.upstream_in_flight.dec(**labels)
+            registry.upstream_phase.observe(time.perf_counter() - started, host=host, phase="network")
+            if isinstance(e, Exception):
+                registry.upstream_requests.inc(status="error", **labels)
+                registry.upstream_errors.inc(error=type(e).__name__, **labels)
+            raise
+
+        registry.upstream_requests.inc(status=str(response.status_code), **labels)
+        if response.status_code >= 400:
+            registry.upstream_errors.inc(error=f"HTTP {response.status_code}", **labels)
+        _current_upstream_host.set(host)
+        closed = False
+
+        def on_close():
+            nonlocal closed
+            if not closed:
+                closed = True
+                registry.upstream_in_flight.dec(**labels)
+                registry.upstream_phase.observe(time.perf_counter() - started, host=host, phase="network")
+
+        if isinstance(response.stream, httpx.ByteStream):
+            on_close() # Body already in memory (e.g. an httpx.MockTransport response); it is never closed
+        else:
+            response.stream = _TimedStream(response.stream, on_close)
+        return response
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+# --- Scrape-time collectors ---
+
+def cache_families(caches: Dict[str, Dict[str, Dict[str, int]]]) -> List[MetricFamily]:
+    """
+    Hit/miss counters and hit ratios from cache stats, given as
+    {cache: {source: {"hits": n, "misses": n, ...}}}. Stale hits count as hits.
+    """
+    hits, misses, ratios = [], [], []
+    for cache, sources in caches.items():
+        for source, counters in sources.items():
+            labels = {"cache": cache, "source": source}
+            cache_hits = counters.get("hits", 0) + counters.get("stale_hits", 0)
+            cache_misses = counters.get("misses", 0)
+            hits.append((labels, cache_hits))
+            misses.append((labels, cache_misses))
+            if cache_hits + cache_misses:
+                ratios.append((labels, cache_hits / (cache_hits + cache_misses)))
+    return [
+        ("yargi_cache_hits_total", "counter", "Cache hits (including stale search results served while refreshing).", hits),
+        ("yargi_cache_misses_total", "counter", "Cache misses.", misses),
+        ("yargi_cache_hit_ratio", "gauge", "Hits / (hits + misses) since start.", ratios),
+    ]
+
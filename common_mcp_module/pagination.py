@@ -0,0 +1,87 @@
+# common_mcp_module/pagination.py
+# Auto-paginating search iteration that prefetches the next page while the current one is consumed.
+
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, List, NamedTuple, Optional
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_MAX_RESULTS = 100
+
+
+class SearchPage(NamedTuple):
+    """One page of search results plus whatever totals the source reports."""
+    items: List[Any]
+    total: Optional[int] = None # Total matching records
+    total_pages: Optional[int] = None # For sources that report pages rather than records
+
+
+# fetch_page(page_number) -> SearchPage
+PageFetcher = Callable[[int], Awaitable[SearchPage]]
+# on_page(results_so_far, total_records) is awaited once per page, before its items are yielded
+PageCallback = Callable[[int, Optional[int]], Awaitable[None]]
+
+
+class SearchHarvestResult(BaseModel):
+    """All results of a search collected across pages, up to the requested maximum."""
+    source: str
+    decisions: List[Any]
+    total_records: Optional[int] = Field(None, description="Total number of matching records reported by the source, if it reports one.")
+    returned: int
+    complete: bool = Field(..., description="True when every matching record was returned, False when max_results cut the harvest short.")
+
+
+async def iter_search_results(
+    fetch_page: PageFetcher,
+    max_results: int = DEFAULT_MAX_RESULTS,
+    page_size: Optional[int] = None,
+    on_page: Optional[PageCallback] = None
+) -> AsyncIterator[Any]:
+    """
+    Yields the items of pages 1, 2, ... until max_results items were yielded, the
+    reported total is reached or a short/empty page ends the results. The next page is
+    requested as soon as a page arrives, so it downloads while the caller consumes the
+    current one. page_size is the size of a full page; sources whose page size the site
+    fixes pass None and the first page's length is used.
+
+    Close the iterator (contextlib.aclosing) when stopping early so a pending prefetch is
+    cancelled.
+    """
+    yielded = 0
+    page_number = 1
+    pending: Optional[asyncio.Future] = asyncio.ensure_future(fetch_page(page_number)) if max_results > 0 else None
+    try:
+        while pending is not None:
+            page = await pending
+            pending = None
+            if page_size is None and page_number == 1:
+                page_size = len(page.items)
+            items = page.items[:max_results - yielded]
+
+            has_more = (
+                bool(page.items)
+                and yielded + len(items) < max_results
+                and len(page.items) >= (page_size or 1)
+                and (page.total is None or page_number * (page_size or 1) < page.total)
+                and (page.total_pages is None or page_number < page.total_pages)
+            )
+            if has_more:
+                pending = asyncio.ensure_future(fetch_page(page_number + 1))
+
+            yielded += len(items)
+            if on_page is not None:
+                await on_page(yielded, page.total)
+            for item in items:
+                yield item
+            page_number += 1
+        logger.debug(f"iter_search_results: Finished after {page_number - 1} page(s), {yielded} result(s).")
+    finally:
+        if pending is not None:
+            pending.cancel()
+            if pending.done() and not pending.cancelled():
+                pending.exception() # A prefetch nobody will await must not be logged as unretrieved
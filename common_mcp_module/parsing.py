@@ -0,0 +1,98 @@
+# common_mcp_module/parsing.py
+# Shared HTML parsing: the fastest available BeautifulSoup backend, optionally limited to the relevant elements.
+
+import importlib.util
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .metrics import phase_timer
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+_SUPPORTED_PARSERS = ("lxml", "html.parser")
+
+
+class ElementStrainer(SoupStrainer):
+    """
+    Keeps every element (with its whole subtree) that matches any of the given rules.
+    A plain SoupStrainer ANDs its conditions and, while parsing, compares `class` with
+    the raw attribute string, so it can keep neither `div#kararList` plus `div.yazi01`
+    nor a `table` whose class is "table table-hover".
+    """
+
+    def __init__(self, rules: List[Tuple[Optional[str], Dict[str, str]]]):
+        super().__init__()
+        self.rules = rules
+
+    @staticmethod
+    def _matches(name: str, attrs: Dict[str, Any], rule_name: Optional[str], rule_attrs: Dict[str, str]) -> bool:
+        if rule_name is not None and name != rule_name:
+            return False
+        for attribute, expected in rule_attrs.items():
+            value = attrs.get(attribute)
+            if isinstance(value, (list, tuple)):
+                value = " ".join(value)
+            if value is None:
+                return False
+            if attribute == "class":
+                if expected not in value.split() and expected != value:
+                    return False
+            elif value != expected:
+                return False
+        return True
+
+    def allow_tag_creation(self, nsprefix: Optional[str], name: str, attrs: Optional[Dict[str, Any]]) -> bool:
+        attrs = attrs or {}
+        return any(self._matches(name, attrs, rule_name, rule_attrs) for rule_name, rule_attrs in self.rules)
+
+    def allow_string_creation(self, string: str) -> bool:
+        return False # Text outside the kept elements is never needed
+
+
+def only(*elements: str) -> SoupStrainer:
+    """
+    Strainer for the listed elements, written as simple selectors: "tag", "tag#id" or
+    "tag.class" (one class; the element may have others).
+    """
+    rules: List[Tuple[Optional[str], Dict[str, str]]] = []
+    for selector in elements:
+        if "#" in selector:
+            name, element_id = selector.split("#", 1)
+            rules.append((name or None, {"id": element_id}))
+        elif "." in selector:
+            name, css_class = selector.split(".", 1)
+            rules.append((name or None, {"class": css_class}))
+        else:
+            rules.append((selector, {}))
+    return ElementStrainer(rules)
+
+
+def _select_parser() -> str:
+    requested = os.getenv("YARGI_HTML_PARSER", "").strip().lower()
+    lxml_available = importlib.util.find_spec("lxml") is not None
+    if requested and requested not in _SUPPORTED_PARSERS:
+        logger.warning(f"Unknown YARGI_HTML_PARSER={requested!r}; choosing automatically.")
+        requested = ""
+    if requested == "lxml" and not lxml_available:
+        logger.warning("YARGI_HTML_PARSER=lxml but the 'lxml' package is not installed; using html.parser.")
+        return "html.parser"
+    return requested or ("lxml" if lxml_available else "html.parser")
+
+
+HTML_PARSER = _select_parser()
+
+
+def parse_html(markup: Union[str, bytes], parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    """
+    Parses markup with lxml when it is installed (`pip install yargi-mcp[lxml]`), otherwise
+    with html.parser; YARGI_HTML_PARSER forces one of them. With parse_only, only the
+    strained elements are built into the tree, which skips the cost of the rest of a
+    large results page.
+    """
+    with phase_timer("parse"):
+        return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
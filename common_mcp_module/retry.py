@@ -0,0 +1,178 @@
+# common_mcp_module/retry.py
+# Retry policy for upstream requests: exponential backoff with jitter, limited to requests that are safe to repeat.
+
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, FrozenSet, Optional
+
+import httpx
+
+from .limiter import retry_after_seconds
+from .metrics import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_ATTEMPTS = 3 # Including the first; 1 disables retries
+DEFAULT_BACKOFF_SECONDS = 0.5
+DEFAULT_MAX_BACKOFF_SECONDS = 8.0
+DEFAULT_DEADLINE_SECONDS = 30.0
+DEFAULT_RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Methods that only read. PUT and DELETE are idempotent too, but a write is never retried implicitly
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# Pass as `extensions=READ_ONLY` on a request that only reads (e.g. a search form POST) to make it retryable
+READ_ONLY: Dict[str, Any] = {"read_only": True}
+
+# Failures where the request may not have reached the upstream or the answer got lost on the way.
+# PoolTimeout is left out: it means the local pool or limiter is saturated, and retrying adds to it.
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.ReadTimeout, httpx.WriteTimeout, httpx.ReadError, httpx.WriteError, httpx.RemoteProtocolError)
+
+
+def _env_number(name: str, default: float, cast=float) -> float:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"RetryPolicy: Ignoring non-numeric {name}={value!r}")
+        return default
+
+
+class RetryPolicy:
+    """
+    How often and how long to retry a failed upstream request. Attempt n (from 1) waits
+    a random time between 0 and min(max_backoff, backoff * 2**(n-1)) ("full jitter"),
+    or the server's Retry-After when that is longer. No attempt starts once `deadline`
+    seconds have passed since the first one, so retries never stretch a tool call
+    indefinitely.
+    """
+
+    def __init__(
+        self,
+        attempts: int = DEFAULT_ATTEMPTS,
+        backoff: float = DEFAULT_BACKOFF_SECONDS,
+        max_backoff: float = DEFAULT_MAX_BACKOFF_SECONDS,
+        deadline: float = DEFAULT_DEADLINE_SECONDS,
+        retry_statuses: FrozenSet[int] = DEFAULT_RETRY_STATUSES
+    ):
+        self.attempts = max(1, int(attempts))
+        self.backoff = max(0.0, backoff)
+        self.max_backoff = max(self.backoff, max_backoff)
+        self.deadline = deadline
+        self.retry_statuses = frozenset(retry_statuses)
+
+    @classmethod
+    def from_env(cls, client_name: str = "") -> "RetryPolicy":
+        """
+        Builds the policy from YARGI_RETRY_ATTEMPTS, YARGI_RETRY_BACKOFF, YARGI_RETRY_MAX_BACKOFF,
+        YARGI_RETRY_DEADLINE and YARGI_RETRY_STATUSES (comma separated), each of which may be
+        overridden per client with YARGI_RETRY_<CLIENT>_*.
+        """
+        def setting(key: str, default: Any, cast=float) -> Any:
+            value = _env_number(f"YARGI_RETRY_{key}", default, cast)
+            return _env_number(f"YARGI_RETRY_{client_name.upper()}_{key}", value, cast) if client_name else value
+
+        statuses = DEFAULT_RETRY_STATUSES
+        raw_statuses = os.getenv(f"YARGI_RETRY_{client_name.upper()}_STATUSES") if client_name else None
+        raw_statuses = raw_statuses or os.getenv("YARGI_RETRY_STATUSES")
+        if raw_statuses:
+            try:
+                statuses = frozenset(int(status) for status in raw_statuses.split(",") if status.strip())
+            except ValueError:
+                logger.warning(f"RetryPolicy: Ignoring invalid YARGI_RETRY_STATUSES={raw_statuses!r}")
+        return cls(
+            attempts=setting("ATTEMPTS", DEFAULT_ATTEMPTS, int),
+            backoff=setting("BACKOFF", DEFAULT_BACKOFF_SECONDS),
+            max_backoff=setting("MAX_BACKOFF", DEFAULT_MAX_BACKOFF_SECONDS),
+            deadline=setting("DEADLINE", DEFAULT_DEADLINE_SECONDS),
+            retry_statuses=statuses
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.attempts > 1
+
+    def delay(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        """Seconds to wait after failed attempt number `attempt` (1-based)."""
+        delay = random.uniform(0.0, min(self.max_backoff, self.backoff * 2 ** (attempt - 1)))
+        if response is not None:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+        return delay
+
+
+def is_retryable_request(request: httpx.Request) -> bool:
+    """
+    Whether sending the request twice is harmless: GET, HEAD and OPTIONS, and requests of
+    any other method marked with `extensions=READ_ONLY`. Streamed bodies cannot be
+    replayed and are never retried.
+    """
+    if request.method not in READ_ONLY_METHODS and not request.extensions.get("read_only"):
+        return False
+    return isinstance(request.stream, httpx.ByteStream)
+
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps a client's transport to retry requests that are safe to repeat after transient
+    failures: connection errors, timeouts and the policy's retryable statuses (429, 502,
+    503, 504 by default). Each attempt goes through the wrapped transport again, so it
+    is limited and metered like any other request. When the attempts or the deadline run
+    out, the last response is returned (or the last error raised) unchanged, so callers
+    see exactly what they would have seen without retries.
+    """
+
+    def __init__(self, client_name: str, transport: httpx.AsyncBaseTransport, policy: Optional[RetryPolicy] = None):
+        self.client_name = client_name
+        self.transport = transport
+        self.policy = policy or RetryPolicy.from_env(client_name)
+
+    def _count(self, host: str, reason: str):
+        metrics = get_metrics_registry()
+        if metrics.enabled:
+            metrics.upstream_retries.inc(client=self.client_name, host=host, reason=reason)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        policy = self.policy
+        if not is_retryable_request(request):
+            return await self.transport.handle_async_request(request)
+
+        host = request.url.host
+        started = time.monotonic()
+        attempt = 1
+        while True:
+            try:
+                response = await self.transport.handle_async_request(request)
+            except RETRYABLE_ERRORS as e:
+                reason = type(e).__name__
+                if attempt >= policy.attempts:
+                    self._count(host, "exhausted")
+                    raise
+                delay = policy.delay(attempt)
+                if time.monotonic() - started + delay > policy.deadline:
+                    self._count(host, "exhausted")
+                    raise
+            else:
+                if response.status_code not in policy.retry_statuses:
+                    return response
+                reason = str(response.status_code)
+                delay = policy.delay(attempt, response)
+                if attempt >= policy.attempts or time.monotonic() - started + delay > policy.deadline:
+                    self._count(host, "exhausted")
+                    return response
+                await response.aclose() # Hand the connection back before waiting
+
+            self._count(host, reason)
+            logger.info(f"RetryTransport: {request.method} {host}{request.url.path} failed ({reason}); attempt {attempt + 1}/{policy.attempts} in {delay:.2f}s.")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        await self.transport.aclose()
@@ -0,0 +1,241 @@
+# common_mcp_module/search_cache.py
+# Short-lived in-memory cache for search results, keyed by the canonical request.
+
+import asyncio
+import functools
+import inspect
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_TTL_SECONDS = 300.0
+DEFAULT_STALE_TTL_SECONDS = 900.0
+DEFAULT_MAX_ENTRIES = 2000
+
+# Upper-case boolean operators keep their case, the search engines treat them specially
+_KEYWORD_OPERATORS = {"AND", "OR", "NOT"}
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fold_keyword(text: str) -> str:
+    """Collapses whitespace and lower-cases a keyword (Turkish dotted/dotless I aware)."""
+    tokens = _WHITESPACE.sub(" ", text).strip().split(" ")
+    folded = []
+    for token in tokens:
+        if token in _KEYWORD_OPERATORS:
+            folded.append(token)
+        else:
+            folded.append(token.replace("I", "ı").replace("İ", "i").lower())
+    return " ".join(folded)
+
+
+def _fold_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return fold_keyword(value)
+    if isinstance(value, list):
+        return [_fold_value(item) for item in value]
+    return value
+
+
+def canonical_request(request: Any, keyword_fields: Iterable[str] = ()) -> Any:
+    """
+    Canonical form of a search argument. Request models are dumped without None values
+    and without fields left at (or explicitly set to) their defaults; the listed keyword
+    fields (dotted paths for nested models, e.g. "data.phrase") are whitespace/case folded.
+    """
+    if not isinstance(request, BaseModel):
+        return request
+    dumped = request.model_dump(mode="json", exclude_none=True, exclude_defaults=True)
+    for field_path in keyword_fields:
+        container = dumped
+        *parents, leaf = field_path.split(".")
+        for parent in parents:
+            container = container.get(parent) if isinstance(container, dict) else None
+        if isinstance(container, dict) and leaf in container:
+            container[leaf] = _fold_value(container[leaf])
+            if container[leaf] in ("", []):
+                del container[leaf] # An empty keyword is the same as no keyword
+    return dumped
+
+
+class SearchCache:
+    """
+    Bounded in-memory LRU cache for search responses.
+
+    Entries are fresh for the source's TTL. After that they stay servable as stale for
+    a further stale window: a stale hit is answered immediately and the search is
+    refreshed in the background (stale-while-revalidate). Entries older than both are
+    dropped. Search results change as new decisions are published, so TTLs are minutes,
+    not days like the document cache.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        default_ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        stale_ttl_seconds: float = DEFAULT_STALE_TTL_SECONDS,
+        source_ttl_seconds: Optional[Dict[str, float]] = None,
+        enabled: bool = True
+    ):
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self.stale_ttl_seconds = stale_ttl_seconds
+        self.source_ttl_seconds = source_ttl_seconds or {}
+        self.enabled = enabled
+
+        # key -> (stored_at, value); ordered from least to most recently used
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._refreshing: Set[str] = set()
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "SearchCache":
+        """
+        Builds a cache from YARGI_SEARCH_CACHE_ENABLED, YARGI_SEARCH_CACHE_MAX_ENTRIES,
+        YARGI_SEARCH_CACHE_TTL, YARGI_SEARCH_CACHE_STALE_TTL and per-source overrides
+        such as YARGI_SEARCH_CACHE_TTL_YARGITAY.
+        """
+        source_ttls: Dict[str, float] = {}
+        prefix = "YARGI_SEARCH_CACHE_TTL_"
+        for env_key, env_value in os.environ.items():
+            if env_key.startswith(prefix) and env_value.strip():
+                try:
+                    source_ttls[env_key[len(prefix):].lower()] = float(env_value)
+                except ValueError:
+                    logger.warning(f"SearchCache: Ignoring non-numeric TTL {env_key}={env_value!r}")
+        return cls(
+            max_entries=int(os.getenv("YARGI_SEARCH_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+            default_ttl_seconds=float(os.getenv("YARGI_SEARCH_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+            stale_ttl_seconds=float(os.getenv("YARGI_SEARCH_CACHE_STALE_TTL", DEFAULT_STALE_TTL_SECONDS)),
+            source_ttl_seconds=source_ttls,
+            enabled=os.getenv("YARGI_SEARCH_CACHE_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+        )
+
+    def ttl_for(self, source: str) -> float:
+        return self.source_ttl_seconds.get(source.lower(), self.default_ttl_seconds)
+
+    def _count(self, name: str, counter: str):
+        name_counters = self._counters.setdefault(name, {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "evictions": 0})
+        name_counters[counter] += 1
+
+    @staticmethod
+    def _copy(value: Any) -> Any:
+        # Callers get their own copy so a tool post-processing a response cannot alter the cached one
+        return value.model_copy(deep=True) if isinstance(value, BaseModel) else value
+
+    def _store(self, name: str, key: str, value: Any):
+        self._entries[key] = (time.monotonic(), self._copy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._count(name, "evictions")
+
+    async def fetch(self, name: str, source: str, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the cached response for key, or awaits call() and caches its result."""
+        ttl = self.ttl_for(source)
+        if not self.enabled or ttl <= 0:
+            return await call()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age <= ttl:
+                self._entries.move_to_end(key)
+                self._count(name, "hits")
+                return self._copy(entry[1])
+            if age <= ttl + self.stale_ttl_seconds:
+                self._entries.move_to_end(key)
+                self._count(name, "stale_hits")
+                self._schedule_refresh(name, key, call)
+                return self._copy(entry[1])
+            del self._entries[key]
+
+        self._count(name, "misses")
+        value = await call()
+        self._store(name, key, value)
+        return value
+
+    def _schedule_refresh(self, name: str, key: str, call: Callable[[], Awaitable[Any]]):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.ensure_future(self._refresh(name, key, call))
+        self._background_tasks.add(task) # Keep a reference until the refresh finishes
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _refresh(self, name: str, key: str, call: Callable[[], Awaitable[Any]]):
+        try:
+            value = await call()
+            self._store(name, key, value)
+            self._count(name, "refreshes")
+        except Exception as e:
+            # The stale entry keeps being served until it expires; the next miss surfaces the error
+            logger.warning(f"SearchCache: Background refresh of {name} failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def aclose(self):
+        """Cancels background refreshes still running (server shutdown); cached entries are kept."""
+        tasks = list(self._background_tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+            logger.info(f"SearchCache: Cancelled {len(tasks)} background refreshes.")
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per search operation plus the current number of entries."""
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "refreshing": len(self._refreshing),
+            "operations": {name: dict(counters) for name, counters in self._counters.items()}
+        }
+
+
+_search_cache: Optional[SearchCache] = None
+
+def get_search_cache() -> SearchCache:
+    """Returns the process-wide SearchCache, creating it from the environment on first use."""
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache.from_env()
+    return _search_cache
+
+
+def cache_search(name: str, keyword_fields: Iterable[str] = ()):
+    """
+    Decorator for async client search methods. The cache key is the operation name plus
+    the canonical form of the bound arguments (see canonical_request); the source used
+    for TTL overrides is the part of the name before the first dot ("yargitay.search").
+    """
+    keyword_fields = tuple(keyword_fields)
+    source = name.split(".", 1)[0]
+
+    def decorator(method: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = {param: canonical_request(value, keyword_fields) for param, value in list(bound.arguments.items())[1:]}
+            key = f"{name}:{json.dumps(arguments, sort_keys=True, ensure_ascii=False, default=str)}"
+            return await get_search_cache().fetch(name, source, key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
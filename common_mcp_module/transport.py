@@ -0,0 +1,196 @@
+# common_mcp_module/transport.py
+# Shared factory for the httpx clients used by the *_mcp_module clients.
+
+import importlib.util
+import logging
+import os
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+
+from .breaker import CircuitBreakerTransport, get_breaker_registry
+from .limiter import LimitedTransport, get_limiter_registry
+from .metrics import MeteredTransport, get_metrics_registry
+from .retry import RetryPolicy, RetryTransport
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+
+_TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def _env_number(name: str, default: Optional[float], cast=int) -> Optional[float]:
+    value = os.getenv(name)
+    if value is None or not value.strip():
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        logger.warning(f"HttpTransportRegistry: Ignoring non-numeric {name}={value!r}")
+        return default
+
+
+class HttpTransportRegistry:
+    """
+    Builds every client's httpx.AsyncClient with the same pool configuration and keeps
+    track of them so their connection pools can be inspected.
+
+    Each client talks to a single upstream host, so the per-client overrides
+    (YARGI_HTTP_<CLIENT>_MAX_CONNECTIONS etc.) are effectively per-host limits.
+    HTTP/2 is only enabled when the optional `h2` package is installed
+    (`pip install yargi-mcp[http2]`); otherwise clients fall back to HTTP/1.1.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self._h2_available = importlib.util.find_spec("h2") is not None
+        self._clients: "weakref.WeakValueDictionary[str, httpx.AsyncClient]" = weakref.WeakValueDictionary()
+        self._client_settings: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_env(cls) -> "HttpTransportRegistry":
+        """
+        Builds the registry from YARGI_HTTP_MAX_CONNECTIONS, YARGI_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        YARGI_HTTP_KEEPALIVE_EXPIRY and YARGI_HTTP2.
+        """
+        return cls(
+            max_connections=_env_number("YARGI_HTTP_MAX_CONNECTIONS", DEFAULT_MAX_CONNECTIONS),
+            max_keepalive_connections=_env_number("YARGI_HTTP_MAX_KEEPALIVE_CONNECTIONS", DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            keepalive_expiry=_env_number("YARGI_HTTP_KEEPALIVE_EXPIRY", DEFAULT_KEEPALIVE_EXPIRY, float),
+            http2=os.getenv("YARGI_HTTP2", "false").lower() in _TRUE_VALUES
+        )
+
+    def limits_for(self, name: str) -> httpx.Limits:
+        """Pool limits for a client, honouring YARGI_HTTP_<NAME>_* overrides."""
+        prefix = f"YARGI_HTTP_{name.upper()}_"
+        return httpx.Limits(
+            max_connections=_env_number(prefix + "MAX_CONNECTIONS", self.max_connections),
+            max_keepalive_connections=_env_number(prefix + "MAX_KEEPALIVE_CONNECTIONS", self.max_keepalive_connections),
+            keepalive_expiry=_env_number(prefix + "KEEPALIVE_EXPIRY", self.keepalive_expiry, float)
+        )
+
+    def http2_for(self, name: str) -> bool:
+        """Whether HTTP/2 is requested for a client (YARGI_HTTP2_<NAME> overrides YARGI_HTTP2)."""
+        override = os.getenv(f"YARGI_HTTP2_{name.upper()}")
+        requested = override.lower() in _TRUE_VALUES if override else self.http2
+        if requested and not self._h2_available:
+            logger.warning(f"HttpTransportRegistry: HTTP/2 requested for '{name}' but the 'h2' package is not installed; using HTTP/1.1.")
+            return False
+        return requested
+
+    def create_client(self, name: str, **client_kwargs: Any) -> httpx.AsyncClient:
+        """
+        Returns a new httpx.AsyncClient for the named client. Keyword arguments are passed
+        through to httpx; explicit `limits` or `http2` arguments take precedence over the
+        registry configuration.
+        """
+        client_kwargs.setdefault("limits", self.limits_for(name))
+        client_kwargs.setdefault("http2", self.http2_for(name))
+        metered = get_metrics_registry().enabled
+        limited = get_limiter_registry().enabled
+        breaker = get_breaker_registry().enabled
+        retry_policy = RetryPolicy.from_env(name)
+        if metered or limited or breaker or retry_policy.enabled:
+            # httpx only builds its own transport when none is given, so build the pooled one here
+            transport = client_kwargs.get("transport") or httpx.AsyncHTTPTransport(
+                verify=client_kwargs.get("verify", True),
+                trust_env=client_kwargs.get("trust_env", True),
+                http2=client_kwargs["http2"],
+                limits=client_kwargs["limits"]
+            )
+            if metered:
+                transport = MeteredTransport(name, transport)
+            if limited: # Outside the metering, so time spent queued is not counted as network time
+                transport = LimitedTransport(name, transport)
+            if breaker: # Outside the limiter, so requests to a host that is down fail without queueing
+                transport = CircuitBreakerTransport(name, transport)
+            if retry_policy.enabled: # Each retry passes the breaker and limiter as a request of its own
+                transport = RetryTransport(name, transport, retry_policy)
+            client_kwargs["transport"] = transport
+        client = httpx.AsyncClient(**client_kwargs)
+        self._clients[name] = client
+        limits: httpx.Limits = client_kwargs["limits"]
+        self._client_settings[name] = {
+            "max_connections": limits.max_connections,
+            "max_keepalive_connections": limits.max_keepalive_connections,
+            "keepalive_expiry": limits.keepalive_expiry,
+            "http2": client_kwargs["http2"]
+        }
+        logger.info(f"HttpTransportRegistry: Created HTTP client '{name}' ({limits}, http2={client_kwargs['http2']}).")
+        return client
+
+    @staticmethod
+    def _pool_stats(client: httpx.AsyncClient) -> Dict[str, Any]:
+        """Reads connection counts from the client's httpcore pool (best effort, internal API)."""
+        transport = getattr(client, "_transport", None)
+        while hasattr(transport, "transport"): # Unwrap RetryTransport, LimitedTransport and similar wrappers
+            transport = transport.transport
+        pool = getattr(transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        idle = sum(1 for connection in connections if connection.is_idle())
+        http2_connections = sum(1 for connection in connections if "HTTP/2" in connection.info())
+        return {
+            "connections": len(connections),
+            "active": len(connections) - idle,
+            "idle": idle,
+            "http2_connections": http2_connections,
+            "queued_requests": sum(1 for request in getattr(pool, "_requests", []) if request.is_queued())
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Configuration and current pool utilisation for every registered client."""
+        clients: Dict[str, Any] = {}
+        for name, settings in self._client_settings.items():
+            client = self._clients.get(name)
+            client_stats: Dict[str, Any] = dict(settings)
+            if client is None or client.is_closed:
+                client_stats["state"] = "closed"
+            else:
+                client_stats["state"] = "open"
+                try:
+                    pool_stats = self._pool_stats(client)
+                    pool_stats["utilisation"] = round(pool_stats["active"] / settings["max_connections"], 3) if settings["max_connections"] else None
+                    client_stats.update(pool_stats)
+                except Exception as e: # Pool internals differ between httpcore versions
+                    logger.debug(f"HttpTransportRegistry: Could not read pool stats for '{name}': {e}")
+            clients[name] = client_stats
+        return {
+            "http2_available": self._h2_available,
+            "defaults": {
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+                "keepalive_expiry": self.keepalive_expiry,
+                "http2": self.http2
+            },
+            "clients": clients
+        }
+
+
+_transport_registry: Optional[HttpTransportRegistry] = None
+
+def get_transport_registry() -> HttpTransportRegistry:
+    """Returns the process-wide HttpTransportRegistry, creating it from the environment on first use."""
+    global _transport_registry
+    if _transport_registry is None:
+        _transport_registry = HttpTransportRegistry.from_env()
+    return _transport_registry
+
+
+def create_http_client(name: str, **client_kwargs: Any) -> httpx.AsyncClient:
+    """Shortcut for get_transport_registry().create_client(name, **client_kwargs)."""
+    return get_transport_registry().create_client(name, **client_kwargs)
@@ -2,22 +2,29 @@
 
 import httpx
 from bs4 import BeautifulSoup 
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional, Union
 import logging
 import html
 import re
-import tempfile
-import os
-from markitdown import MarkItDown
 
 from .models import (
     DanistayKeywordSearchRequest,
     DanistayDetailedSearchRequest,
     DanistayApiResponse,
+    DanistayApiDecisionEntry,
     DanistayDocumentMarkdown,
     DanistayKeywordSearchRequestData,
     DanistayDetailedSearchRequestData
 )
+from common_mcp_module.cache import get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.metrics import phase_timer
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.retry import READ_ONLY
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers():
@@ -28,9 +35,11 @@ class DanistayApiClient:
     KEYWORD_SEARCH_ENDPOINT = "/aramalist"
     DETAILED_SEARCH_ENDPOINT = "/aramadetaylist"
     DOCUMENT_ENDPOINT = "/getDokuman"
+    MAX_PAGE_SIZE = 100 # Largest pageSize the search endpoints accept
 
     def __init__(self, request_timeout: float = 30.0):
-        self.http_client = httpx.AsyncClient(
+        self.http_client = create_http_client(
+            "danistay",
             base_url=self.BASE_URL,
             headers={
                 "Content-Type": "application/json; charset=UTF-8", # Arama endpoint'leri için
@@ -44,6 +53,8 @@ class DanistayApiClient:
     def _prepare_keywords_for_api(self, keywords: List[str]) -> List[str]:
         return ['"' + k.strip('"') + '"' for k in keywords if k and k.strip()]
 
+    @cache_search("danistay.search_keyword", keyword_fields=("andKelimeler", "orKelimeler", "notAndKelimeler", "notOrKelimeler"))
+    @coalesce("danistay.search_keyword")
     async def search_keyword_decisions(
         self,
         params: DanistayKeywordSearchRequest
@@ -60,6 +71,8 @@ class DanistayApiClient:
         logger.info(f"DanistayApiClient: Performing KEYWORD search via {self.KEYWORD_SEARCH_ENDPOINT} with payload: {final_payload}")
         return await self._execute_api_search(self.KEYWORD_SEARCH_ENDPOINT, final_payload)
 
+    @cache_search("danistay.search_detailed")
+    @coalesce("danistay.search_detailed")
     async def search_detailed_decisions(
         self,
         params: DanistayDetailedSearchRequest
@@ -86,13 +99,37 @@ class DanistayApiClient:
         logger.info(f"DanistayApiClient: Performing DETAILED search via {self.DETAILED_SEARCH_ENDPOINT} with payload: {final_payload}")
         return await self._execute_api_search(self.DETAILED_SEARCH_ENDPOINT, final_payload)
 
+    def iter_search(
+        self,
+        params: Union[DanistayKeywordSearchRequest, DanistayDetailedSearchRequest],
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[DanistayApiDecisionEntry]:
+        """
+        Yields up to max_results decisions of a keyword or detailed search, fetching pages
+        of the largest allowed size from page 1 (pageSize/pageNumber of params are ignored)
+        and prefetching the next page while the current one is consumed.
+        """
+        page_size = min(self.MAX_PAGE_SIZE, max(1, max_results))
+        search = self.search_keyword_decisions if isinstance(params, DanistayKeywordSearchRequest) else self.search_detailed_decisions
+
+        async def fetch_page(page_number: int) -> SearchPage:
+            response = await search(params.model_copy(update={"pageSize": page_size, "pageNumber": page_number}))
+            if not response.data:
+                return SearchPage([], 0)
+            return SearchPage(response.data.data, response.data.recordsTotal)
+
+        return iter_search_results(fetch_page, max_results, page_size, on_page)
+
     async def _execute_api_search(self, endpoint: str, payload: Dict) -> DanistayApiResponse:
         try:
-            response = await self.http_client.post(endpoint, json=payload)
+            response = await self.http_client.post(endpoint, json=payload, extensions=READ_ONLY)
             response.raise_for_status()
-            response_json_data = response.json()
+            with phase_timer("parse"):
+                response_json_data = response.json()
             logger.debug(f"DanistayApiClient: Raw API response from {endpoint}: {response_json_data}")
-            api_response_parsed = DanistayApiResponse(**response_json_data)
+            with phase_timer("validate"):
+                api_response_parsed = DanistayApiResponse(**response_json_data)
             if api_response_parsed.data and api_response_parsed.data.data:
                 for decision_item in api_response_parsed.data.data:
                     if decision_item.id:
@@ -105,7 +142,8 @@ class DanistayApiClient:
             logger.error(f"DanistayApiClient: Error processing or validating search response from {endpoint}: {e}")
             raise
 
-    def _convert_html_to_markdown_danistay(self, direct_html_content: str) -> Optional[str]:
+    @staticmethod
+    def _convert_html_to_markdown_danistay(direct_html_content: str) -> Optional[str]:
         """
         Converts direct HTML content (assumed from Danıştay /getDokuman) to Markdown.
         """
@@ -124,25 +162,15 @@ class DanistayApiClient:
         html_input_for_markdown = processed_html
 
         markdown_text = None
-        temp_file_path = None
         try:
-            md_converter = MarkItDown() # Basic conversion
-            
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_file:
-                tmp_file.write(html_input_for_markdown) # Write the full HTML string
-                temp_file_path = tmp_file.name
-            
-            conversion_result = md_converter.convert(temp_file_path)
-            markdown_text = conversion_result.text_content
+            markdown_text = convert_html_to_markdown(html_input_for_markdown)
             logger.info("DanistayApiClient: HTML to Markdown conversion successful.")
         except Exception as e:
             logger.error(f"DanistayApiClient: Error during MarkItDown HTML to Markdown conversion: {e}")
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
         
         return markdown_text
 
+    @coalesce("danistay.document")
     async def get_decision_document_as_markdown(self, id: str) -> DanistayDocumentMarkdown:
         """
         Retrieves a specific Danıştay decision by ID and returns its content as Markdown.
@@ -150,6 +178,10 @@ class DanistayApiClient:
         """
         document_api_url = f"{self.DOCUMENT_ENDPOINT}?id={id}"
         source_url = f"{self.BASE_URL}{document_api_url}"
+        cached_document = await get_document_cache().aget("danistay", id)
+        if cached_document is not None:
+            return DanistayDocumentMarkdown(**cached_document)
+
         logger.info(f"DanistayApiClient: Fetching Danistay document for Markdown (ID: {id}) from {source_url}")
 
         try:
@@ -170,13 +202,16 @@ class DanistayApiClient:
                     source_url=source_url
                 )
 
-            markdown_content = self._convert_html_to_markdown_danistay(html_content_from_api)
+            markdown_content = await get_conversion_executor().run(DanistayApiClient._convert_html_to_markdown_danistay, html_content_from_api)
 
-            return DanistayDocumentMarkdown(
+            document = DanistayDocumentMarkdown(
                 id=id,
                 markdown_content=markdown_content,
                 source_url=source_url
             )
+            if markdown_content:
+                await get_document_cache().aset("danistay", id, document.model_dump(mode="json"), metadata={"source_url": source_url})
+            return document
         except httpx.RequestError as e:
             logger.error(f"DanistayApiClient: HTTP error fetching Danistay document (ID: {id}): {e}")
             raise
@@ -2,20 +2,27 @@
 
 import httpx
 # from bs4 import BeautifulSoup # Uncomment if needed for advanced HTML pre-processing
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
 import logging
 import html
 import re
-import tempfile
-import os
-from markitdown import MarkItDown
 
 from .models import (
     EmsalSearchRequest,
     EmsalDetailedSearchRequestData, 
     EmsalApiResponse,
+    EmsalApiDecisionEntry,
     EmsalDocumentMarkdown
 )
+from common_mcp_module.cache import get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.metrics import phase_timer
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.retry import READ_ONLY
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers():
@@ -26,9 +33,11 @@ class EmsalApiClient:
     BASE_URL = "https://emsal.uyap.gov.tr"
     DETAILED_SEARCH_ENDPOINT = "/aramadetaylist" 
     DOCUMENT_ENDPOINT = "/getDokuman"
+    MAX_PAGE_SIZE = 100 # Largest pageSize the search endpoint accepts
 
     def __init__(self, request_timeout: float = 30.0):
-        self.http_client = httpx.AsyncClient(
+        self.http_client = create_http_client(
+            "emsal",
             base_url=self.BASE_URL,
             headers={
                 "Content-Type": "application/json; charset=UTF-8",
@@ -39,6 +48,8 @@ class EmsalApiClient:
             verify=False # As per user's original FastAPI code
         )
 
+    @cache_search("emsal.search", keyword_fields=("keyword",))
+    @coalesce("emsal.search")
     async def search_detailed_decisions(
         self,
         params: EmsalSearchRequest
@@ -69,15 +80,39 @@ class EmsalApiClient:
         logger.info(f"EmsalApiClient: Performing DETAILED search with payload: {final_payload}")
         return await self._execute_api_search(self.DETAILED_SEARCH_ENDPOINT, final_payload)
 
+    def iter_search(
+        self,
+        params: EmsalSearchRequest,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[EmsalApiDecisionEntry]:
+        """
+        Yields up to max_results decisions matching params, fetching pages of the largest
+        allowed size from page 1 (page_size/page_number of params are ignored) and
+        prefetching the next page while the current one is consumed.
+        """
+        page_size = min(self.MAX_PAGE_SIZE, max(1, max_results))
+
+        async def fetch_page(page_number: int) -> SearchPage:
+            response = await self.search_detailed_decisions(
+                params.model_copy(update={"page_size": page_size, "page_number": page_number}))
+            if not response.data:
+                return SearchPage([], 0)
+            return SearchPage(response.data.data, response.data.recordsTotal)
+
+        return iter_search_results(fetch_page, max_results, page_size, on_page)
+
     async def _execute_api_search(self, endpoint: str, payload: Dict) -> EmsalApiResponse:
         """Helper method to execute search POST request and process response for Emsal."""
         try:
-            response = await self.http_client.post(endpoint, json=payload)
+            response = await self.http_client.post(endpoint, json=payload, extensions=READ_ONLY)
             response.raise_for_status()
-            response_json_data = response.json()
+            with phase_timer("parse"):
+                response_json_data = response.json()
             logger.debug(f"EmsalApiClient: Raw API response from {endpoint}: {response_json_data}")
             
-            api_response_parsed = EmsalApiResponse(**response_json_data)
+            with phase_timer("validate"):
+                api_response_parsed = EmsalApiResponse(**response_json_data)
 
             if api_response_parsed.data and api_response_parsed.data.data:
                 for decision_item in api_response_parsed.data.data:
@@ -92,7 +127,8 @@ class EmsalApiClient:
             logger.error(f"EmsalApiClient: Error processing or validating Emsal search response from {endpoint}: {e}")
             raise
 
-    def _clean_html_and_convert_to_markdown_emsal(self, html_content_from_api_data_field: str) -> Optional[str]:
+    @staticmethod
+    def _clean_html_and_convert_to_markdown_emsal(html_content_from_api_data_field: str) -> Optional[str]:
         """
         Cleans HTML (from Emsal API 'data' field containing HTML string)
         and converts it to Markdown using MarkItDown.
@@ -114,25 +150,15 @@ class EmsalApiClient:
         html_input_for_markdown = content 
 
         markdown_text = None
-        temp_file_path = None
         try:
-            md_converter = MarkItDown()
-            
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_file:
-                tmp_file.write(html_input_for_markdown)
-                temp_file_path = tmp_file.name
-            
-            conversion_result = md_converter.convert(temp_file_path)
-            markdown_text = conversion_result.text_content
+            markdown_text = convert_html_to_markdown(html_input_for_markdown)
             logger.info("EmsalApiClient: HTML to Markdown conversion successful.")
         except Exception as e:
             logger.error(f"EmsalApiClient: Error during MarkItDown HTML to Markdown conversion for Emsal: {e}")
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
         
         return markdown_text
 
+    @coalesce("emsal.document")
     async def get_decision_document_as_markdown(self, id: str) -> EmsalDocumentMarkdown:
         """
         Retrieves a specific Emsal decision by ID and returns its content as Markdown.
@@ -140,6 +166,10 @@ class EmsalApiClient:
         """
         document_api_url = f"{self.DOCUMENT_ENDPOINT}?id={id}"
         source_url = f"{self.BASE_URL}{document_api_url}"
+        cached_document = await get_document_cache().aget("emsal", id)
+        if cached_document is not None:
+            return EmsalDocumentMarkdown(**cached_document)
+
         logger.info(f"EmsalApiClient: Fetching Emsal document for Markdown (ID: {id}) from {source_url}")
 
         try:
@@ -147,20 +177,24 @@ class EmsalApiClient:
             response.raise_for_status()
             
             # Emsal /getDokuman returns JSON with HTML in 'data' field (confirmed by user example)
-            response_json = response.json()
+            with phase_timer("parse"):
+                response_json = response.json()
             html_content_from_api = response_json.get("data")
 
             if not isinstance(html_content_from_api, str) or not html_content_from_api.strip():
                 logger.warning(f"EmsalApiClient: Received empty or non-string HTML in 'data' field for Emsal ID {id}.")
                 return EmsalDocumentMarkdown(id=id, markdown_content=None, source_url=source_url)
 
-            markdown_content = self._clean_html_and_convert_to_markdown_emsal(html_content_from_api)
+            markdown_content = await get_conversion_executor().run(EmsalApiClient._clean_html_and_convert_to_markdown_emsal, html_content_from_api)
 
-            return EmsalDocumentMarkdown(
+            document = EmsalDocumentMarkdown(
                 id=id,
                 markdown_content=markdown_content,
                 source_url=source_url
             )
+            if markdown_content:
+                await get_document_cache().aset("emsal", id, document.model_dump(mode="json"), metadata={"source_url": source_url})
+            return document
         except httpx.RequestError as e:
             logger.error(f"EmsalApiClient: HTTP error fetching Emsal document (ID: {id}): {e}")
             raise
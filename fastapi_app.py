@@ -15,12 +15,13 @@ from datetime import datetime
 
 from fastapi import FastAPI, HTTPException, Query, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
 # Import the main MCP app
 from mcp_server_main import app as mcp_server
 from asgi_app import custom_middleware
+from common_mcp_module.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, get_metrics_registry
 
 # Create MCP ASGI app
 mcp_asgi_app = mcp_server.http_app(path="/mcp")
@@ -249,6 +250,14 @@ async def get_statistics():
         }
     })
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    registry = get_metrics_registry()
+    if not registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled (YARGI_METRICS_ENABLED=false)")
+    return PlainTextResponse(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Add a simple authentication example (optional)
 # Uncomment to enable basic token authentication
 """
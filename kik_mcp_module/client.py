@@ -10,15 +10,14 @@ from playwright.async_api import (
 )
 from bs4 import BeautifulSoup
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
 import urllib.parse 
 import base64 # Base64 için
 import re
 import html as html_parser 
-from markitdown import MarkItDown 
-import os
 import math 
-import tempfile
+import os
+import time
 
 from .models import (
     KikSearchRequest,
@@ -27,12 +26,86 @@ from .models import (
     KikDocumentMarkdown,
     KikKararTipi
 )
+from .page_pool import KikPagePool, KikPageSlot
+from .postback import KikPostbackError, PostbackSession, isolated_cookie_policy, postback_target
+from common_mcp_module.cache import MemoryCache, get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.parsing import only, parse_html
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 
+_TRUE_VALUES = ("1", "true", "yes", "on")
+# Nothing on the KİK pages we read needs these to render the form, grid or decision text
+_BLOCKED_RESOURCE_TYPES = {"image", "font", "stylesheet", "media"}
+_BLOCKED_URL_PATTERN = re.compile(r"google-analytics\.com|googletagmanager\.com|doubleclick\.net|mc\.yandex\.|hotjar\.com|facebook\.net")
+
+def _playwright_rss_bytes() -> Optional[int]:
+    """
+    Resident memory of this process's Playwright driver and browser processes, read from
+    /proc (Linux only, None elsewhere). Conversion pool workers are children too, so only
+    processes whose command line mentions playwright are counted.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    try:
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f"/proc/{entry}/stat", "r") as stat_file:
+                    # The command name may contain spaces/parentheses; fields resume after the last ')'
+                    parent_pid = int(stat_file.read().rsplit(")", 1)[1].split()[1])
+            except (OSError, IndexError, ValueError):
+                continue
+            children.setdefault(parent_pid, []).append(int(entry))
+    except OSError:
+        return None
+
+    total_bytes = 0
+    pending = list(children.get(os.getpid(), []))
+    while pending:
+        pid = pending.pop()
+        pending.extend(children.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as cmdline_file:
+                if b"playwright" not in cmdline_file.read():
+                    continue
+            with open(f"/proc/{pid}/status", "r") as status_file:
+                for line in status_file:
+                    if line.startswith("VmRSS:"):
+                        total_bytes += int(line.split()[1]) * 1024
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_bytes
+
+class _PhaseTimer:
+    """Collects the duration of each phase of one KİK operation and logs them as one line."""
+
+    def __init__(self, operation: str):
+        self.operation = operation
+        self._started = self._last = time.perf_counter()
+        self._phases: List[str] = []
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self._phases.append(f"{phase}={(now - self._last) * 1000:.0f}ms")
+        self._last = now
+
+    def log(self):
+        total_ms = (time.perf_counter() - self._started) * 1000
+        logger.info(f"KIK timing {self.operation}: {', '.join(self._phases)}, total={total_ms:.0f}ms")
+
 class KikApiClient:
     BASE_URL = "https://ekap.kik.gov.tr"
     SEARCH_PAGE_PATH = "/EKAP/Vatandas/kurulkararsorgu.aspx"
+    DOCUMENT_PAGE_PATH = "/EKAP/Vatandas/KurulKararGoster.aspx"
+    DOCUMENT_CONTENT_SPAN_ID = "ctl00_ContentPlaceHolder1_lblKarar"
     FIELD_LOCATORS = {
         "karar_tipi_radio_group": "input[name='ctl00$ContentPlaceHolder1$kurulKararTip']",
         "karar_no": "input[name='ctl00$ContentPlaceHolder1$txtKararNo']",
@@ -50,53 +123,162 @@ class KikApiClient:
     RESULTS_TABLE_ID = "grdKurulKararSorguSonuc"
     NO_RESULTS_MESSAGE_SELECTOR = "div#ctl00_MessageContent1" 
     VALIDATION_SUMMARY_SELECTOR = "div#ctl00_ValidationSummary1"
+    # The parts of a results page _result_from_soup reads; the rest of the page is not parsed
+    RESULTS_PAGE_STRAINER = only(f"table#{RESULTS_TABLE_ID}", NO_RESULTS_MESSAGE_SELECTOR, VALIDATION_SUMMARY_SELECTOR, "div.gridToplamSayi", "div.sayfalama")
     MODAL_CLOSE_BUTTON_SELECTOR = "div#detayPopUp.in a#btnKapatPencere_0.close"
     DOCUMENT_MARKDOWN_CHUNK_SIZE = 5000 
+    SEARCH_ENGINES = ("auto", "http", "playwright")
+    USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.0.0 Safari/537.36"
 
     def __init__(self, request_timeout: float = 60000): 
         self.playwright_instance: Optional[async_playwright] = None
         self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
-        self.page: Optional[Page] = None
         self.request_timeout = request_timeout 
         self._lock = asyncio.Lock()
+        # Each concurrent search/document fetch checks out its own context + page
+        self.page_pool = KikPagePool(
+            browser_factory=self._ensure_browser_ready,
+            context_options={
+                "user_agent": self.USER_AGENT,
+                "java_script_enabled": True,
+            },
+            size=int(os.getenv("YARGI_KIK_PAGE_POOL_SIZE", 2)),
+            max_uses=int(os.getenv("YARGI_KIK_PAGE_MAX_USES", 50)),
+            request_timeout=request_timeout,
+            context_setup=self._setup_context
+        )
+        # Wait on the DOM conditions each step needs instead of networkidle and fixed sleeps
+        self.fast_waits = os.getenv("YARGI_KIK_FAST_WAITS", "true").lower() in _TRUE_VALUES
+        self.block_resources = os.getenv("YARGI_KIK_BLOCK_RESOURCES", "true").lower() in _TRUE_VALUES
+        # "auto" replays the form postbacks over HTTP and only falls back to Playwright when that fails
+        self.search_engine = os.getenv("YARGI_KIK_SEARCH_ENGINE", "auto").lower()
+        if self.search_engine not in self.SEARCH_ENGINES:
+            logger.warning(f"Unknown YARGI_KIK_SEARCH_ENGINE '{self.search_engine}', using 'auto'.")
+            self.search_engine = "auto"
+        self.search_engine_counters = {"http": 0, "playwright": 0, "http_fallbacks": 0}
+        self._http_client = None
+        # Rows per results page whose unknown KararId a browser-less search resolves before returning.
+        # Each costs a sequential preview postback, so by default (0) a search only fills in KararIds
+        # already known and the rest are resolved when their document is first fetched.
+        self.resolve_document_urls = max(0, int(os.getenv("YARGI_KIK_RESOLVE_DOCUMENT_URLS", 0)))
+        # karar_id -> KİK's internal KararId; backed by the on-disk "kik_karar_id" map
+        self.karar_id_params = MemoryCache("kik_karar_id", max_bytes=4 * 1024 * 1024)
+        # Chromium is launched on first use and closed again after this many idle seconds (0 keeps it)
+        self.browser_idle_timeout = float(os.getenv("YARGI_KIK_BROWSER_IDLE_TIMEOUT", 600))
+        self.prewarm = os.getenv("YARGI_KIK_PREWARM", "false").lower() in _TRUE_VALUES
+        self._reaper_task: Optional[asyncio.Task] = None
+        self._prewarm_task: Optional[asyncio.Task] = None
+        self.browser_counters = {"launches": 0, "idle_shutdowns": 0, "last_launch_seconds": None, "total_launch_seconds": 0.0}
+
+    def _get_http_client(self):
+        """Pooled httpx client for browser-less searches; cookies are kept per PostbackSession, not here."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = create_http_client(
+                "kik",
+                headers={"User-Agent": self.USER_AGENT, "Accept": "text/html,application/xhtml+xml"},
+                timeout=self.request_timeout / 1000,
+                follow_redirects=False # Redirects would drop the session's cookies
+            )
+            self._http_client.cookies.jar.set_policy(isolated_cookie_policy())
+        return self._http_client
 
-    async def _ensure_playwright_ready(self, force_new_page: bool = False):
+    async def _ensure_browser_ready(self) -> Browser:
+        """Starts Playwright and the shared Chromium on first use (or after it disconnected)."""
         async with self._lock:
-            browser_recreated = False
-            context_recreated = False
-            if not self.playwright_instance:
-                self.playwright_instance = await async_playwright().start()
             if not self.browser or not self.browser.is_connected():
-                if self.browser: await self.browser.close()
+                launch_started = time.perf_counter()
+                if not self.playwright_instance:
+                    self.playwright_instance = await async_playwright().start()
+                if self.browser:
+                    try: await self.browser.close()
+                    except PlaywrightError: pass
                 self.browser = await self.playwright_instance.chromium.launch(headless=True) 
-                browser_recreated = True 
-            if not self.context or browser_recreated:
-                if self.context: await self.context.close()
-                if not self.browser: raise PlaywrightError("Browser not initialized.")
-                self.context = await self.browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/100.0.0.0 Safari/537.36",
-                    java_script_enabled=True,
-                )
-                context_recreated = True 
-            if not self.page or self.page.is_closed() or force_new_page or context_recreated or browser_recreated:
-                if self.page and not self.page.is_closed(): await self.page.close()
-                if not self.context: raise PlaywrightError("Context is None.")
-                self.page = await self.context.new_page()
-                if not self.page: raise PlaywrightError("Failed to create new page.")
-                self.page.set_default_navigation_timeout(self.request_timeout)
-                self.page.set_default_timeout(self.request_timeout)
-            if not self.page or self.page.is_closed(): 
-                raise PlaywrightError("Playwright page initialization failed.")
-            logger.debug("_ensure_playwright_ready completed.")
+                launch_seconds = round(time.perf_counter() - launch_started, 3)
+                self.browser_counters["launches"] += 1
+                self.browser_counters["last_launch_seconds"] = launch_seconds
+                self.browser_counters["total_launch_seconds"] = round(self.browser_counters["total_launch_seconds"] + launch_seconds, 3)
+                logger.info(f"KikApiClient: Launched Chromium in {launch_seconds:.2f}s.")
+                self._start_idle_reaper()
+            if not self.browser: raise PlaywrightError("Browser not initialized.")
+            logger.debug("_ensure_browser_ready completed.")
+            return self.browser
+
+    def _start_idle_reaper(self):
+        if self.browser_idle_timeout > 0 and (self._reaper_task is None or self._reaper_task.done()):
+            self._reaper_task = asyncio.ensure_future(self._reap_idle_browser())
+
+    async def _reap_idle_browser(self):
+        """Closes Chromium and Playwright once no page has been used for browser_idle_timeout seconds."""
+        check_interval = max(1.0, min(60.0, self.browser_idle_timeout / 4))
+        while self.browser is not None:
+            await asyncio.sleep(check_interval)
+            idle_seconds = time.monotonic() - self.page_pool.last_activity
+            if self.page_pool.in_use or idle_seconds < self.browser_idle_timeout:
+                continue
+            async with self._lock:
+                # Re-checked under the lock: a checkout may have started while we waited for it
+                if self.page_pool.in_use or time.monotonic() - self.page_pool.last_activity < self.browser_idle_timeout:
+                    continue
+                logger.info(f"KikApiClient: Closing Chromium after {idle_seconds:.0f}s without KIK browser use.")
+                await self._close_browser_locked()
+                self.browser_counters["idle_shutdowns"] += 1
+
+    async def _close_browser_locked(self):
+        await self.page_pool.close()
+        if self.browser:
+            try: await self.browser.close()
+            except PlaywrightError: pass
+            self.browser = None
+        if self.playwright_instance:
+            await self.playwright_instance.stop(); self.playwright_instance = None
+
+    def start_background_tasks(self):
+        """Starts the optional background prewarm (YARGI_KIK_PREWARM); needs a running event loop. Idempotent."""
+        if self.prewarm and self._prewarm_task is None:
+            self._prewarm_task = asyncio.ensure_future(self._prewarm_browser())
+
+    async def _prewarm_browser(self):
+        try:
+            # Checking a slot out and back in launches Chromium and leaves one ready page in the pool
+            async with self.page_pool.slot():
+                pass
+            logger.info("KikApiClient: Browser pre-warmed.")
+        except Exception as e:
+            logger.warning(f"KikApiClient: Browser pre-warm failed, it will be launched on first use: {e}")
+
+    def browser_stats(self) -> Dict[str, Any]:
+        """Launch counts and timings, idle state and resident memory of the Playwright browser."""
+        running = bool(self.browser and self.browser.is_connected())
+        return {
+            "running": running,
+            "idle_timeout_seconds": self.browser_idle_timeout,
+            "idle_seconds": round(time.monotonic() - self.page_pool.last_activity, 1),
+            "prewarm": self.prewarm,
+            "rss_bytes": _playwright_rss_bytes() if running else 0,
+            **self.browser_counters
+        }
+
+    async def _setup_context(self, context: BrowserContext):
+        if self.block_resources:
+            await context.route("**/*", self._route_request)
+
+    @staticmethod
+    async def _route_request(route):
+        request = route.request
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES or _BLOCKED_URL_PATTERN.search(request.url):
+            await route.abort()
+        else:
+            await route.continue_()
 
     async def close_client_session(self):
+        if self._http_client and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        for task in (self._reaper_task, self._prewarm_task):
+            if task and not task.done():
+                try: task.cancel()
+                except RuntimeError: pass # Started on an event loop that has since closed (the client outlived an earlier server run)
         async with self._lock:
-            # ... (öncekiyle aynı)
-            if self.page and not self.page.is_closed(): await self.page.close(); self.page = None
-            if self.context: await self.context.close(); self.context = None
-            if self.browser: await self.browser.close(); self.browser = None
-            if self.playwright_instance: await self.playwright_instance.stop(); self.playwright_instance = None
+            await self._close_browser_locked()
             logger.info("KikApiClient (Playwright): Resources closed.")
 
     def _parse_decision_entries_from_soup(self, soup: BeautifulSoup, search_karar_tipi: KikKararTipi) -> List[KikDecisionEntry]:
@@ -156,124 +338,398 @@ class KikApiClient:
         except: pass
         return 1
 
+    def _result_from_soup(self, soup: BeautifulSoup, search_params: KikSearchRequest) -> KikSearchResult:
+        """Builds the search result from a results page, whichever engine produced it."""
+        validation_summary_tag = soup.find("div", id=self.VALIDATION_SUMMARY_SELECTOR.split('[')[0].split(':')[0])
+        if validation_summary_tag and validation_summary_tag.get_text(strip=True) and \
+           ("display: none" not in validation_summary_tag.get("style", "").lower() if validation_summary_tag.has_attr("style") else True) and \
+           validation_summary_tag.get_text(strip=True) != "":
+            return KikSearchResult(decisions=[], total_records=0, current_page=search_params.page)
+        message_content_div = soup.find("div", id=self.NO_RESULTS_MESSAGE_SELECTOR.split(':')[0])
+        if message_content_div and "kayıt bulunamamıştır" in message_content_div.get_text(strip=True).lower():
+            return KikSearchResult(decisions=[], total_records=0, current_page=1)
+
+        # _parse_decision_entries_from_soup'a arama yapılan karar_tipi'ni gönder
+        decisions = self._parse_decision_entries_from_soup(soup, search_params.karar_tipi)
+        total_records = self._parse_total_records_from_soup(soup)
+        current_page_from_html = self._parse_current_page_from_soup(soup)
+        return KikSearchResult(decisions=decisions, total_records=total_records, current_page=current_page_from_html)
+
+    def _is_search_response(self, soup: BeautifulSoup) -> bool:
+        """Whether a page is an answer to the search: a result grid, the no-results message or validation errors."""
+        if soup.find("table", {"id": self.RESULTS_TABLE_ID}):
+            return True
+        message_content_div = soup.find("div", id=self.NO_RESULTS_MESSAGE_SELECTOR.split(':')[0])
+        if message_content_div and "kayıt bulunamamıştır" in message_content_div.get_text(strip=True).lower():
+            return True
+        validation_summary_tag = soup.find("div", id=self.VALIDATION_SUMMARY_SELECTOR.split('[')[0].split(':')[0])
+        return bool(validation_summary_tag and validation_summary_tag.get_text(strip=True))
+
+    @classmethod
+    def _form_field_name(cls, selector_key: str) -> str:
+        return re.search(r"name='([^']+)'", cls.FIELD_LOCATORS[selector_key]).group(1)
+
+    def _pager_event_target(self, soup: BeautifulSoup, page: int) -> str:
+        """Event target of the pager link for `page`, falling back to the grid's usual control numbering."""
+        table = soup.find("table", {"id": self.RESULTS_TABLE_ID})
+        for link in (table.find_all("a") if table else []):
+            target = postback_target(link.get("href"))
+            if target and "grdKurulKararSorguSonuc" in target and link.get_text(strip=True) == str(page):
+                return target
+        return f"ctl00$ContentPlaceHolder1$grdKurulKararSorguSonuc$ctl14$ctl{page + 2:02d}"
+
+    async def _search_via_http(self, search_params: KikSearchRequest, session: Optional[PostbackSession] = None) -> KikSearchResult:
+        """
+        Browser-less search: replays the radio, search button and pager postbacks the Playwright
+        engine triggers, posting the form fields directly. Raises KikPostbackError when a
+        response is not the expected page, so the caller can fall back to Playwright.
+        A caller passing its own session can keep posting back on the results page.
+        """
+        timer = _PhaseTimer("http search")
+        session = session or PostbackSession(self._get_http_client(), f"{self.BASE_URL}{self.SEARCH_PAGE_PATH}")
+        await session.open()
+        timer.mark("open")
+
+        radio_name = self._form_field_name('karar_tipi_radio_group')
+        karar_tipi_value = search_params.karar_tipi.value
+        if session.fields.get(radio_name) != karar_tipi_value:
+            await session.post_back(f"ctl00$ContentPlaceHolder1${karar_tipi_value}", {radio_name: karar_tipi_value})
+            if session.fields.get(radio_name) != karar_tipi_value:
+                raise KikPostbackError(f"Decision type postback did not select {karar_tipi_value}.")
+            timer.mark("karar_tipi")
+
+        # Karar No'yu KİK sitesine göndermeden önce '_' -> '/' dönüşümü yap
+        karar_no_for_kik_form = search_params.karar_no.replace('_', '/') if search_params.karar_no else None
+        yil_select = session.soup.find("select", {"name": self._form_field_name('yil')})
+        first_yil_option = yil_select.find("option") if yil_select else None
+        form_values = {
+            self._form_field_name('karar_metni'): search_params.karar_metni,
+            self._form_field_name('karar_no'): karar_no_for_kik_form,
+            self._form_field_name('karar_tarihi_baslangic'): search_params.karar_tarihi_baslangic,
+            self._form_field_name('karar_tarihi_bitis'): search_params.karar_tarihi_bitis,
+            self._form_field_name('resmi_gazete_sayisi'): search_params.resmi_gazete_sayisi,
+            self._form_field_name('resmi_gazete_tarihi'): search_params.resmi_gazete_tarihi,
+            self._form_field_name('basvuru_konusu_ihale'): search_params.basvuru_konusu_ihale,
+            self._form_field_name('basvuru_sahibi'): search_params.basvuru_sahibi,
+            self._form_field_name('ihaleyi_yapan_idare'): search_params.ihaleyi_yapan_idare,
+            self._form_field_name('yil'): search_params.yil or (first_yil_option.get("value", "") if first_yil_option else ""),
+        }
+        search_button = session.soup.find("a", id=self.FIELD_LOCATORS['search_button_id'])
+        search_target = postback_target(search_button.get("href") if search_button else None) \
+            or self.FIELD_LOCATORS['search_button_id'].replace('_', '$')
+        soup = await session.post_back(search_target, form_values)
+        timer.mark("search")
+
+        if search_params.page > 1 and soup.find("table", {"id": self.RESULTS_TABLE_ID}):
+            # The pager posts the same criteria, as the filled-in browser form would
+            soup = await session.post_back(self._pager_event_target(soup, search_params.page), form_values)
+            timer.mark("pager")
+
+        if not self._is_search_response(soup):
+            raise KikPostbackError("Search postback did not return a results page.")
+        result = self._result_from_soup(soup, search_params)
+        timer.mark("parse")
+        timer.log()
+        return result
+
+    def _document_url(self, karar_id_param: str) -> str:
+        return f"{self.BASE_URL}{self.DOCUMENT_PAGE_PATH}?KararId={urllib.parse.quote(karar_id_param)}"
+
+    async def _lookup_karar_id_param(self, karar_id_b64: str) -> Optional[str]:
+        """KİK's internal KararId for a decision resolved earlier, from memory or the on-disk map."""
+        karar_id_param = self.karar_id_params.get(karar_id_b64)
+        if karar_id_param is None:
+            cached = await get_document_cache().aget("kik_karar_id", karar_id_b64)
+            if cached:
+                karar_id_param = cached["karar_id_param"]
+                self.karar_id_params.set(karar_id_b64, karar_id_param, len(karar_id_b64) + len(karar_id_param))
+        return karar_id_param
+
+    async def _remember_karar_id_param(self, karar_id_b64: str, karar_id_param: str):
+        self.karar_id_params.set(karar_id_b64, karar_id_param, len(karar_id_b64) + len(karar_id_param))
+        await get_document_cache().aset("kik_karar_id", karar_id_b64, {"karar_id_param": karar_id_param},
+                                        metadata={"source_url": self._document_url(karar_id_param)})
+
+    async def _with_document_urls(self, result: KikSearchResult, session: Optional[PostbackSession] = None) -> KikSearchResult:
+        """
+        Fills document_url on the page's entries whose KararId is already known, from memory
+        or the on-disk map; get_decision_document_as_markdown resolves the others on first
+        fetch. Only when resolve_document_urls is set does a browser-less search resolve up
+        to that many unknown rows itself, by posting each row's preview button back on the
+        results page. Those postbacks chain the page's view state, so they run one after
+        another and delay the search response. A failed preview leaves the remaining rows
+        without a URL rather than failing the search.
+        """
+        unresolved = []
+        for decision in result.decisions:
+            karar_id_param = await self._lookup_karar_id_param(decision.karar_id)
+            if karar_id_param:
+                decision.document_url = self._document_url(karar_id_param)
+            else:
+                unresolved.append(decision)
+        if session is None or not unresolved or not self.resolve_document_urls:
+            return result
+        for decision in unresolved[:self.resolve_document_urls]:
+            try:
+                karar_id_param = await self._preview_karar_id_param(session, decision)
+            except Exception as e:
+                logger.warning(f"KikApiClient: Could not resolve document URLs for the rest of the page ({e}).")
+                break
+            await self._remember_karar_id_param(decision.karar_id, karar_id_param)
+            decision.document_url = self._document_url(karar_id_param)
+        return result
+
+    @coalesce("kik.search")
     async def search_decisions(self, search_params: KikSearchRequest) -> KikSearchResult:
-        await self._ensure_playwright_ready()
-        page = self.page 
-        search_url = f"{self.BASE_URL}{self.SEARCH_PAGE_PATH}"
+        if self.search_engine != "playwright":
+            try:
+                session = PostbackSession(self._get_http_client(), f"{self.BASE_URL}{self.SEARCH_PAGE_PATH}")
+                result = await self._search_via_http(search_params, session)
+                self.search_engine_counters["http"] += 1
+                return await self._with_document_urls(result, session)
+            except Exception as e:
+                if self.search_engine == "http":
+                    logger.error(f"Error during browser-less KIK decision search: {e}", exc_info=True)
+                    return KikSearchResult(decisions=[], current_page=search_params.page)
+                self.search_engine_counters["http_fallbacks"] += 1
+                logger.warning(f"Browser-less KIK search failed ({e}); falling back to Playwright.")
         try:
-            if page.url != search_url:
-                await page.goto(search_url, wait_until="networkidle", timeout=self.request_timeout)
-            search_button_selector = f"a[id='{self.FIELD_LOCATORS['search_button_id']}']"
-            await page.wait_for_selector(search_button_selector, state="visible", timeout=self.request_timeout)
-
-            current_karar_tipi_value = search_params.karar_tipi.value
-            radio_locator_selector = f"{self.FIELD_LOCATORS['karar_tipi_radio_group']}[value='{current_karar_tipi_value}']"
-            if not await page.locator(radio_locator_selector).is_checked():
-                 js_target_radio = f"ctl00$ContentPlaceHolder1${current_karar_tipi_value}"
-                 async with page.expect_navigation(wait_until="networkidle", timeout=self.request_timeout):
-                     await page.evaluate(f"javascript:__doPostBack('{js_target_radio}','')")
+            async with self.page_pool.slot() as slot:
+                result = await self._search_on_slot(slot, search_params)
+            self.search_engine_counters["playwright"] += 1
+            return await self._with_document_urls(result)
+        except Exception as e: 
+            logger.error(f"Error during KIK decision search: {e}", exc_info=True)
+            return KikSearchResult(decisions=[], current_page=search_params.page)
+
+    def iter_search(
+        self,
+        search_params: KikSearchRequest,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[KikDecisionEntry]:
+        """
+        Yields up to max_results decisions matching search_params from page 1 on
+        (search_params.page is ignored; the site fixes the page size). The next page is
+        fetched on another pool slot / postback session while the current one is consumed.
+        """
+        async def fetch_page(page_number: int) -> SearchPage:
+            result = await self.search_decisions(search_params.model_copy(update={"page": page_number}))
+            return SearchPage(result.decisions, result.total_records or None)
+
+        return iter_search_results(fetch_page, max_results, None, on_page)
+
+    async def _search_on_slot(self, slot: KikPageSlot, search_params: KikSearchRequest) -> KikSearchResult:
+        """Runs a search on a checked-out page; errors propagate so the caller can discard the slot."""
+        page = slot.page
+        search_url = f"{self.BASE_URL}{self.SEARCH_PAGE_PATH}"
+        query_key = search_params.model_dump_json(exclude={"page"})
+        if search_params.page > 1 and slot.last_query != query_key:
+            # Pager postbacks only work on a page already showing this query's result grid
+            await self._search_on_slot(slot, search_params.model_copy(update={"page": 1}))
+        slot.last_query = None
+        timer = _PhaseTimer(f"playwright search page {search_params.page}")
+        navigation_wait = "domcontentloaded" if self.fast_waits else "networkidle"
+        if page.url != search_url:
+            await page.goto(search_url, wait_until=navigation_wait, timeout=self.request_timeout)
+        search_button_selector = f"a[id='{self.FIELD_LOCATORS['search_button_id']}']"
+        await page.wait_for_selector(search_button_selector, state="visible", timeout=self.request_timeout)
+        timer.mark("navigate")
+
+        current_karar_tipi_value = search_params.karar_tipi.value
+        radio_locator_selector = f"{self.FIELD_LOCATORS['karar_tipi_radio_group']}[value='{current_karar_tipi_value}']"
+        if not await page.locator(radio_locator_selector).is_checked():
+             js_target_radio = f"ctl00$ContentPlaceHolder1${current_karar_tipi_value}"
+             async with page.expect_navigation(wait_until=navigation_wait, timeout=self.request_timeout):
+                 await page.evaluate(f"javascript:__doPostBack('{js_target_radio}','')")
+             if self.fast_waits:
+                 await page.wait_for_selector(search_button_selector, state="visible", timeout=self.request_timeout)
+             else:
                  await page.wait_for_timeout(1000) 
+             timer.mark("karar_tipi")
 
-            async def fill_if_value(selector_key: str, value: Optional[str]):
-                if value is not None: await page.fill(self.FIELD_LOCATORS[selector_key], value)
-            
-            # Karar No'yu KİK sitesine göndermeden önce '_' -> '/' dönüşümü yap
-            karar_no_for_kik_form = None
-            if search_params.karar_no: # search_params.karar_no Claude'dan '_' ile gelmiş olabilir
-                karar_no_for_kik_form = search_params.karar_no.replace('_', '/')
-                logger.info(f"Using karar_no '{karar_no_for_kik_form}' (transformed from '{search_params.karar_no}') for KIK form.")
-            
-            await fill_if_value('karar_metni', search_params.karar_metni)
-            await fill_if_value('karar_no', karar_no_for_kik_form) # Dönüştürülmüş halini kullan
-            # ... (diğer fill_if_value çağrıları aynı) ...
-            await fill_if_value('karar_tarihi_baslangic', search_params.karar_tarihi_baslangic)
-            await fill_if_value('karar_tarihi_bitis', search_params.karar_tarihi_bitis)
-            await fill_if_value('resmi_gazete_sayisi', search_params.resmi_gazete_sayisi)
-            await fill_if_value('resmi_gazete_tarihi', search_params.resmi_gazete_tarihi)
-            await fill_if_value('basvuru_konusu_ihale', search_params.basvuru_konusu_ihale)
-            await fill_if_value('basvuru_sahibi', search_params.basvuru_sahibi)
-            await fill_if_value('ihaleyi_yapan_idare', search_params.ihaleyi_yapan_idare)
-
-            if search_params.yil:
-                await page.select_option(self.FIELD_LOCATORS['yil'], value=search_params.yil)
-
-            action_is_search_button_click = (search_params.page == 1)
-            event_target_for_submit: str
-            if action_is_search_button_click:
-                event_target_for_submit = self.FIELD_LOCATORS['search_button_id']
-            else: # Pagination
-                page_link_ctl_number = search_params.page + 2 
-                event_target_for_submit = f"ctl00$ContentPlaceHolder1$grdKurulKararSorguSonuc$ctl14$ctl{page_link_ctl_number:02d}"
-            
-            try:
-                async with page.expect_navigation(wait_until="networkidle", timeout=self.request_timeout):
-                    if action_is_search_button_click:
-                        await page.locator(search_button_selector).click()
-                    else: 
-                        await page.evaluate(f"javascript:__doPostBack('{event_target_for_submit}','')")
-            except PlaywrightTimeoutError:
+        async def fill_if_value(selector_key: str, value: Optional[str]):
+            # Empty values are filled too, clearing whatever an earlier search left on this pooled page
+            await page.fill(self.FIELD_LOCATORS[selector_key], value or "")
+        
+        # Karar No'yu KİK sitesine göndermeden önce '_' -> '/' dönüşümü yap
+        karar_no_for_kik_form = None
+        if search_params.karar_no: # search_params.karar_no Claude'dan '_' ile gelmiş olabilir
+            karar_no_for_kik_form = search_params.karar_no.replace('_', '/')
+            logger.info(f"Using karar_no '{karar_no_for_kik_form}' (transformed from '{search_params.karar_no}') for KIK form.")
+        
+        await fill_if_value('karar_metni', search_params.karar_metni)
+        await fill_if_value('karar_no', karar_no_for_kik_form) # Dönüştürülmüş halini kullan
+        # ... (diğer fill_if_value çağrıları aynı) ...
+        await fill_if_value('karar_tarihi_baslangic', search_params.karar_tarihi_baslangic)
+        await fill_if_value('karar_tarihi_bitis', search_params.karar_tarihi_bitis)
+        await fill_if_value('resmi_gazete_sayisi', search_params.resmi_gazete_sayisi)
+        await fill_if_value('resmi_gazete_tarihi', search_params.resmi_gazete_tarihi)
+        await fill_if_value('basvuru_konusu_ihale', search_params.basvuru_konusu_ihale)
+        await fill_if_value('basvuru_sahibi', search_params.basvuru_sahibi)
+        await fill_if_value('ihaleyi_yapan_idare', search_params.ihaleyi_yapan_idare)
+
+        if search_params.yil:
+            await page.select_option(self.FIELD_LOCATORS['yil'], value=search_params.yil)
+        else:
+            await page.select_option(self.FIELD_LOCATORS['yil'], index=0) # "All years", not a previous search's year
+
+        timer.mark("fill")
+
+        action_is_search_button_click = (search_params.page == 1)
+        event_target_for_submit: str
+        if action_is_search_button_click:
+            event_target_for_submit = self.FIELD_LOCATORS['search_button_id']
+        else: # Pagination
+            page_link_ctl_number = search_params.page + 2 
+            event_target_for_submit = f"ctl00$ContentPlaceHolder1$grdKurulKararSorguSonuc$ctl14$ctl{page_link_ctl_number:02d}"
+        
+        try:
+            async with page.expect_navigation(wait_until=navigation_wait, timeout=self.request_timeout):
+                if action_is_search_button_click:
+                    await page.locator(search_button_selector).click()
+                else: 
+                    await page.evaluate(f"javascript:__doPostBack('{event_target_for_submit}','')")
+        except PlaywrightTimeoutError:
+            if not self.fast_waits:
                 await page.wait_for_timeout(2000) 
-            
-            results_table_dom_selector = f"table#{self.RESULTS_TABLE_ID}"
-            try:
+        timer.mark("submit")
+        
+        results_table_dom_selector = f"table#{self.RESULTS_TABLE_ID}"
+        try:
+            if self.fast_waits:
+                # Result rows start after the two header rows; an empty search shows a message instead
+                await page.wait_for_function(
+                    f"""
+                    () => {{
+                        const rows = document.querySelectorAll('{results_table_dom_selector} tr');
+                        const message = document.querySelector('{self.NO_RESULTS_MESSAGE_SELECTOR}');
+                        const validation = document.querySelector('{self.VALIDATION_SUMMARY_SELECTOR}');
+                        return rows.length > 2 ||
+                               (message && message.innerText.toLocaleLowerCase('tr').includes('kayıt bulunamamıştır')) ||
+                               (validation && validation.innerText.trim() !== '');
+                    }}
+                    """,
+                    timeout=30000
+                )
+            else:
                 await page.wait_for_selector(results_table_dom_selector, timeout=30000, state="attached")
                 await page.wait_for_timeout(2000) 
-            except PlaywrightTimeoutError:
-                logger.warning(f"Timeout waiting for results table '{results_table_dom_selector}'.")
-            
-            html_content = await page.content()
-            soup = BeautifulSoup(html_content, "html.parser")
-            # ... (hata ve sonuç yok mesajı kontrolü aynı) ...
-            validation_summary_tag = soup.find("div", id=self.VALIDATION_SUMMARY_SELECTOR.split('[')[0].split(':')[0])
-            if validation_summary_tag and validation_summary_tag.get_text(strip=True) and \
-               ("display: none" not in validation_summary_tag.get("style", "").lower() if validation_summary_tag.has_attr("style") else True) and \
-               validation_summary_tag.get_text(strip=True) != "":
-                return KikSearchResult(decisions=[], total_records=0, current_page=search_params.page)
-            message_content_div = soup.find("div", id=self.NO_RESULTS_MESSAGE_SELECTOR.split(':')[0])
-            if message_content_div and "kayıt bulunamamıştır" in message_content_div.get_text(strip=True).lower():
-                return KikSearchResult(decisions=[], total_records=0, current_page=1)
-
-            # _parse_decision_entries_from_soup'a arama yapılan karar_tipi'ni gönder
-            decisions = self._parse_decision_entries_from_soup(soup, search_params.karar_tipi)
-            total_records = self._parse_total_records_from_soup(soup)
-            current_page_from_html = self._parse_current_page_from_soup(soup)
-            return KikSearchResult(decisions=decisions, total_records=total_records, current_page=current_page_from_html)
-        except Exception as e: 
-            logger.error(f"Error during KIK decision search: {e}", exc_info=True)
-            return KikSearchResult(decisions=[], current_page=search_params.page)
-
-    def _clean_html_for_markdown(self, html_content: str) -> str:
+        except PlaywrightTimeoutError:
+            logger.warning(f"Timeout waiting for results table '{results_table_dom_selector}'.")
+        timer.mark("results")
+        
+        html_content = await page.content()
+        soup = parse_html(html_content, self.RESULTS_PAGE_STRAINER)
+        if soup.find("table", {"id": self.RESULTS_TABLE_ID}): slot.last_query = query_key
+        result = self._result_from_soup(soup, search_params)
+        timer.mark("parse")
+        timer.log()
+        return result
+
+    @staticmethod
+    def _clean_html_for_markdown(html_content: str) -> str:
         # ... (öncekiyle aynı) ...
         if not html_content: return ""
         return html_parser.unescape(html_content)
 
-    def _convert_html_to_markdown_internal(self, html_fragment: str) -> Optional[str]:
+    @staticmethod
+    def _convert_html_to_markdown_internal(html_fragment: str) -> Optional[str]:
         # ... (öncekiyle aynı) ...
         if not html_fragment: return None
-        cleaned_html = self._clean_html_for_markdown(html_fragment)
-        markdown_output = None; temp_file_path = None
+        cleaned_html = KikApiClient._clean_html_for_markdown(html_fragment)
+        markdown_output = None
         try:
-            md_converter = MarkItDown(enable_plugins=True, remove_alt_whitespace=True, keep_underline=True)
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_html_file:
-                tmp_html_file.write(cleaned_html); temp_file_path = tmp_html_file.name
-            markdown_output = md_converter.convert(temp_file_path).text_content
+            markdown_output = convert_html_to_markdown(cleaned_html, enable_plugins=True)
             if markdown_output: markdown_output = re.sub(r'\n{3,}', '\n\n', markdown_output).strip()
         except Exception as e: logger.error(f"MarkItDown conversion error: {e}", exc_info=True)
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path): os.remove(temp_file_path)
         return markdown_output
 
 
+    async def _resolve_karar_id_param_via_http(self, karar_tipi: KikKararTipi, karar_no: str) -> Optional[str]:
+        """
+        Finds KİK's internal KararId without a browser: a targeted search followed by the
+        preview postback, whose response carries the KurulKararGoster.aspx iframe URL.
+        Returns None if the search has no exact match.
+        """
+        session = PostbackSession(self._get_http_client(), f"{self.BASE_URL}{self.SEARCH_PAGE_PATH}")
+        search_results = await self._search_via_http(KikSearchRequest(karar_no=karar_no, karar_tipi=karar_tipi, page=1), session)
+        decision = next((entry for entry in search_results.decisions
+                         if entry.karar_no_str == karar_no and entry.karar_tipi == karar_tipi), None)
+        if decision is None:
+            return None
+        return await self._preview_karar_id_param(session, decision)
+
+    async def _preview_karar_id_param(self, session: PostbackSession, decision: KikDecisionEntry) -> str:
+        """Posts a results row's preview button back and reads the KararId from the KurulKararGoster.aspx iframe URL."""
+        soup = await session.post_back(decision.preview_event_target)
+        iframe_tag = soup.find("iframe", {"id": "iframe_detayPopUp"})
+        iframe_src = iframe_tag.get("src") if iframe_tag else None
+        if not iframe_src or "KararId=" not in iframe_src:
+            # The modal may be opened by a startup script instead of a pre-filled src attribute
+            match = re.search(r"KurulKararGoster\.aspx\?KararId=([^'\"&\s<]+)", str(soup))
+            iframe_src = f"{self.DOCUMENT_PAGE_PATH}?KararId={match.group(1)}" if match else None
+        if not iframe_src:
+            raise KikPostbackError(f"Preview postback for Karar No {decision.karar_no_str} returned no document URL.")
+        query_params = urllib.parse.parse_qs(urllib.parse.urlparse(html_parser.unescape(iframe_src)).query)
+        karar_id_param = query_params.get("KararId", [None])[0]
+        if not karar_id_param:
+            raise KikPostbackError(f"Document URL for Karar No {decision.karar_no_str} has no KararId.")
+        return karar_id_param
+
+    async def _fetch_full_markdown_via_http(self, karar_id_param: str) -> str:
+        """Downloads KurulKararGoster.aspx for a KararId with a single GET and converts the decision text."""
+        response = await self._get_http_client().get(self._document_url(karar_id_param))
+        if response.status_code != 200:
+            raise KikPostbackError(f"Unexpected HTTP {response.status_code} for KararId {karar_id_param}.")
+        soup = parse_html(response.text, only(f"span#{self.DOCUMENT_CONTENT_SPAN_ID}"))
+        karar_content_span = soup.find("span", {"id": self.DOCUMENT_CONTENT_SPAN_ID})
+        if karar_content_span is None:
+            raise KikPostbackError(f"Decision page for KararId {karar_id_param} has no decision text.")
+        full_markdown_content = await get_conversion_executor().run(KikApiClient._convert_html_to_markdown_internal, karar_content_span.decode_contents())
+        if not full_markdown_content:
+            raise KikPostbackError(f"Markdown conversion of KararId {karar_id_param} returned empty content.")
+        return full_markdown_content
+
+    async def _remember_document(self, karar_id_b64: str, karar_id_param: str, full_markdown_content: str) -> Dict[str, Any]:
+        await self._remember_karar_id_param(karar_id_b64, karar_id_param)
+        full_document = {
+            "karar_id_param": karar_id_param,
+            "source_url": self._document_url(karar_id_param),
+            "markdown": full_markdown_content
+        }
+        await get_document_cache().aset("kik", karar_id_b64, full_document, metadata={"source_url": full_document["source_url"]})
+        return full_document
+
+    def _document_page(
+            self,
+            karar_id_b64: str,
+            karar_tipi: KikKararTipi,
+            karar_no: str,
+            full_document: Dict[str, Any],
+            page_number: int
+        ) -> KikDocumentMarkdown:
+        full_markdown_content = full_document["markdown"]
+        content_length = len(full_markdown_content); total_pages = math.ceil(content_length / self.DOCUMENT_MARKDOWN_CHUNK_SIZE) or 1
+        current_page_clamped = max(1, min(page_number, total_pages))
+        start_index = (current_page_clamped - 1) * self.DOCUMENT_MARKDOWN_CHUNK_SIZE
+        markdown_chunk = full_markdown_content[start_index : start_index + self.DOCUMENT_MARKDOWN_CHUNK_SIZE]
+        return KikDocumentMarkdown(
+            retrieved_with_karar_id=karar_id_b64,
+            retrieved_karar_no=karar_no,
+            retrieved_karar_tipi=karar_tipi,
+            kararIdParam=full_document["karar_id_param"], 
+            markdown_chunk=markdown_chunk, source_url=full_document["source_url"],
+            current_page=current_page_clamped, total_pages=total_pages,
+            is_paginated=(total_pages > 1), full_content_char_count=content_length
+        )
+
+    @coalesce("kik.document")
     async def get_decision_document_as_markdown(
             self, 
             karar_id_b64: str, 
             page_number: int = 1 
         ) -> KikDocumentMarkdown:
-        await self._ensure_playwright_ready()
-        # Bu metodun kendi içinde yeni bir 'page' nesnesi ('doc_page_for_content') kullanacağını unutmayın,
-        # ana 'self.page' arama sonuçları sayfasında kalır.
-        current_main_page = self.page # Ana arama sonuçları sayfasını referans alalım
-
         try:
             decoded_key = base64.b64decode(karar_id_b64.encode('utf-8')).decode('utf-8')
             karar_tipi_value, karar_no_for_search = decoded_key.split('|', 1)
@@ -283,6 +739,50 @@ class KikApiClient:
             logger.error(f"Invalid karar_id format. Could not decode Base64 or split: {karar_id_b64}. Error: {e_decode}")
             return KikDocumentMarkdown(retrieved_with_karar_id=karar_id_b64, error_message="Invalid karar_id format.", current_page=page_number)
 
+        cached_document = await get_document_cache().aget("kik", karar_id_b64)
+        if cached_document is not None:
+            return self._document_page(karar_id_b64, original_karar_tipi, karar_no_for_search, cached_document, page_number)
+
+        # Fast path: a known KararId (or one resolved by replaying the form postbacks) is a single GET
+        karar_id_param = await self._lookup_karar_id_param(karar_id_b64)
+        if karar_id_param or self.search_engine != "playwright":
+            try:
+                if not karar_id_param:
+                    karar_id_param = await self._resolve_karar_id_param_via_http(original_karar_tipi, karar_no_for_search)
+                    if karar_id_param is None:
+                        return KikDocumentMarkdown(
+                            retrieved_with_karar_id=karar_id_b64, retrieved_karar_no=karar_no_for_search, retrieved_karar_tipi=original_karar_tipi,
+                            error_message=f"Decision with Karar No '{karar_no_for_search}' (Tipi: {original_karar_tipi.value}) not found by internal search.",
+                            current_page=page_number, total_pages=1, is_paginated=False
+                        )
+                full_markdown_content = await self._fetch_full_markdown_via_http(karar_id_param)
+                full_document = await self._remember_document(karar_id_b64, karar_id_param, full_markdown_content)
+                return self._document_page(karar_id_b64, original_karar_tipi, karar_no_for_search, full_document, page_number)
+            except Exception as e:
+                if self.search_engine == "http":
+                    logger.error(f"Error in browser-less KIK document retrieval for Karar ID {karar_id_b64}: {e}", exc_info=True)
+                    return KikDocumentMarkdown(
+                        retrieved_with_karar_id=karar_id_b64, retrieved_karar_no=karar_no_for_search, retrieved_karar_tipi=original_karar_tipi,
+                        error_message=f"General error: {str(e)}", current_page=page_number, total_pages=1, is_paginated=False
+                    )
+                logger.warning(f"Browser-less KIK document retrieval failed ({e}); falling back to Playwright.")
+
+        async with self.page_pool.slot() as slot:
+            return await self._get_document_on_slot(slot, karar_id_b64, original_karar_tipi, karar_no_for_search, page_number)
+
+    async def _get_document_on_slot(
+            self,
+            slot: KikPageSlot,
+            karar_id_b64: str,
+            original_karar_tipi: KikKararTipi,
+            karar_no_for_search: str,
+            page_number: int
+        ) -> KikDocumentMarkdown:
+        # Bu metodun kendi içinde yeni bir 'page' nesnesi ('doc_page_for_content') kullanacağını unutmayın,
+        # slot'un ana sayfası arama sonuçları sayfasında kalır.
+        current_main_page = slot.page # Ana arama sonuçları sayfasını referans alalım
+        timer = _PhaseTimer("playwright document")
+
         default_error_response_data = {
             "retrieved_with_karar_id": karar_id_b64,
             "retrieved_karar_no": karar_no_for_search,
@@ -294,7 +794,7 @@ class KikApiClient:
         # Ana arama sayfasında olduğumuzdan emin olalım
         if self.SEARCH_PAGE_PATH not in current_main_page.url:
             logger.info(f"Not on search page ({current_main_page.url}). Navigating to {self.SEARCH_PAGE_PATH} before targeted search for document.")
-            await current_main_page.goto(f"{self.BASE_URL}{self.SEARCH_PAGE_PATH}", wait_until="networkidle", timeout=self.request_timeout)
+            await current_main_page.goto(f"{self.BASE_URL}{self.SEARCH_PAGE_PATH}", wait_until="domcontentloaded" if self.fast_waits else "networkidle", timeout=self.request_timeout)
             await current_main_page.wait_for_selector(f"a[id='{self.FIELD_LOCATORS['search_button_id']}']", state="visible", timeout=self.request_timeout)
 
         targeted_search_params = KikSearchRequest(
@@ -303,9 +803,13 @@ class KikApiClient:
             page=1 
         )
         logger.info(f"Performing targeted search for Karar No: {karar_no_for_search}")
-        # search_decisions kendi içinde _ensure_playwright_ready çağırır ve self.page'i kullanır.
-        # Bu, current_main_page ile aynı olmalı.
-        search_results = await self.search_decisions(targeted_search_params)
+        # Arama aynı slot üzerinde yapılır; modal postback'i bu sayfadaki sonuç tablosuna dayanır.
+        try:
+            search_results = await self._search_on_slot(slot, targeted_search_params)
+        except Exception as e:
+            logger.error(f"Error during targeted KIK search for Karar No {karar_no_for_search}: {e}", exc_info=True)
+            search_results = KikSearchResult(decisions=[], current_page=1)
+        timer.mark("search")
 
         if not search_results.decisions:
             default_error_response_data["error_message"] = f"Decision with Karar No '{karar_no_for_search}' (Tipi: {original_karar_tipi.value}) not found by internal search."
@@ -330,9 +834,11 @@ class KikApiClient:
 
         try:
             logger.info(f"Evaluating __doPostBack on main page to show modal for: {decision_preview_event_target}")
-            # Bu evaluate, self.page (yani current_main_page) üzerinde çalışır
+            # Bu evaluate, slot.page (yani current_main_page) üzerinde çalışır
+            slot.last_query = None # Postback sayfanın view state'ini değiştirir
             await current_main_page.evaluate(f"javascript:__doPostBack('{decision_preview_event_target}','')")
-            await current_main_page.wait_for_timeout(1000) 
+            if not self.fast_waits: # The wait for the iframe src below is enough
+                await current_main_page.wait_for_timeout(1000) 
             logger.info(f"Executed __doPostBack for {decision_preview_event_target} on main page.")
             
             iframe_selector = "iframe#iframe_detayPopUp"
@@ -360,7 +866,7 @@ class KikApiClient:
                  logger.warning(f"Timeout waiting for KIK iframe src for {decision_preview_event_target}. Trying to parse from static content after presumed update.")
                  html_after_postback = await current_main_page.content()
                  # ... (fallback parsing öncekiyle aynı, default_error_response_data set edilir ve return edilir) ...
-                 soup_after_postback = BeautifulSoup(html_after_postback, "html.parser")
+                 soup_after_postback = parse_html(html_after_postback, only("div#detayPopUp"))
                  detay_popup_div = soup_after_postback.find("div", {"id": "detayPopUp", "class": re.compile(r"\bin\b")})
                  if not detay_popup_div: detay_popup_div = soup_after_postback.find("div", {"id": "detayPopUp", "style": re.compile(r"display:\s*block", re.I)})
                  iframe_tag = detay_popup_div.find("iframe", {"id": "iframe_detayPopUp"}) if detay_popup_div else None
@@ -386,9 +892,10 @@ class KikApiClient:
                  default_error_response_data["error_message"]="KararId (KIK internal ID) not found in extracted iframe URL."
                  return KikDocumentMarkdown(**default_error_response_data)
 
+            timer.mark("modal")
             logger.info(f"Fetching KIK decision content from iframe URL using a new Playwright page: {iframe_document_url_str}")
             
-            doc_page_for_content = await self.context.new_page() 
+            doc_page_for_content = await slot.context.new_page() 
             try:
                 # `goto` metoduna MUTLAK URL verilmeli. Loglanan URL'nin mutlak olduğundan emin olalım.
                 await doc_page_for_content.goto(iframe_document_url_str, wait_until="domcontentloaded", timeout=self.request_timeout)
@@ -402,10 +909,13 @@ class KikApiClient:
                 if doc_page_for_content and not doc_page_for_content.is_closed(): 
                     await doc_page_for_content.close() 
 
-            soup_decision_detail = BeautifulSoup(document_html_content, "html.parser")
-            karar_content_span = soup_decision_detail.find("span", {"id": "ctl00_ContentPlaceHolder1_lblKarar"})
+            timer.mark("content")
+            soup_decision_detail = parse_html(document_html_content, only(f"span#{self.DOCUMENT_CONTENT_SPAN_ID}"))
+            karar_content_span = soup_decision_detail.find("span", {"id": self.DOCUMENT_CONTENT_SPAN_ID})
             actual_decision_html = karar_content_span.decode_contents() if karar_content_span else document_html_content
-            full_markdown_content = self._convert_html_to_markdown_internal(actual_decision_html)
+            full_markdown_content = await get_conversion_executor().run(KikApiClient._convert_html_to_markdown_internal, actual_decision_html)
+            timer.mark("convert")
+            timer.log()
 
             if not full_markdown_content:
                  default_error_response_data["error_message"]="Markdown conversion failed or returned empty content."
@@ -415,10 +925,7 @@ class KikApiClient:
                  except: pass
                  return KikDocumentMarkdown(**default_error_response_data)
 
-            content_length = len(full_markdown_content); total_pages = math.ceil(content_length / self.DOCUMENT_MARKDOWN_CHUNK_SIZE) or 1
-            current_page_clamped = max(1, min(page_number, total_pages))
-            start_index = (current_page_clamped - 1) * self.DOCUMENT_MARKDOWN_CHUNK_SIZE
-            markdown_chunk = full_markdown_content[start_index : start_index + self.DOCUMENT_MARKDOWN_CHUNK_SIZE]
+            full_document = await self._remember_document(karar_id_b64, karar_id_param_from_url_on_doc_page, full_markdown_content)
             
             try: 
                 if await current_main_page.locator(self.MODAL_CLOSE_BUTTON_SELECTOR).is_visible(timeout=2000): 
@@ -426,15 +933,7 @@ class KikApiClient:
                     await current_main_page.wait_for_selector(f"div#detayPopUp:not(.in)", timeout=5000) 
             except: pass
 
-            return KikDocumentMarkdown(
-                retrieved_with_karar_id=karar_id_b64,
-                retrieved_karar_no=karar_no_for_search,
-                retrieved_karar_tipi=original_karar_tipi,
-                kararIdParam=karar_id_param_from_url_on_doc_page, 
-                markdown_chunk=markdown_chunk, source_url=iframe_document_url_str,
-                current_page=current_page_clamped, total_pages=total_pages,
-                is_paginated=(total_pages > 1), full_content_char_count=content_length
-            )
+            return self._document_page(karar_id_b64, original_karar_tipi, karar_no_for_search, full_document, page_number)
         except Exception as e: 
             logger.error(f"Error in get_decision_document_as_markdown for Karar ID {karar_id_b64}: {e}", exc_info=True)
             default_error_response_data["error_message"] = f"General error: {str(e)}"
@@ -35,6 +35,7 @@ class KikDecisionEntry(BaseModel):
     idare_str: Optional[str] = Field(None, alias="idare", description="Procuring entity.")
     basvuru_sahibi_str: Optional[str] = Field(None, alias="basvuruSahibi", description="Applicant.")
     ihale_konusu_str: Optional[str] = Field(None, alias="ihaleKonusu", description="Tender subject.")
+    document_url: Optional[str] = Field(None, description="Direct KurulKararGoster.aspx URL of the decision. Set once the decision's KararId is known (e.g. after its document was fetched); otherwise missing.")
 
     @computed_field
     @property
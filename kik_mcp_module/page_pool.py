@@ -0,0 +1,160 @@
+# kik_mcp_module/page_pool.py
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from playwright.async_api import Browser, BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+class KikPageSlot:
+    """One pooled browser context + page, with the state the KİK form left on it."""
+
+    def __init__(self, context: BrowserContext, page: Page):
+        self.context = context
+        self.page = page
+        self.uses = 0
+        # Canonical search (without page number) whose result grid is currently shown,
+        # so pager postbacks are only sent on a page that has the matching grid.
+        self.last_query: Optional[str] = None
+
+class KikPagePool:
+    """
+    Pool of isolated Playwright pages for the KİK site.
+
+    Every slot has its own BrowserContext (cookies, ASP.NET session and view state are
+    per slot) inside one shared Chromium. Slots are checked out exclusively, health
+    checked on checkout, recycled after max_uses checkouts and discarded after errors,
+    so concurrent searches and document fetches run in parallel instead of sharing one
+    page.
+    """
+
+    def __init__(
+        self,
+        browser_factory: Callable[[], Awaitable[Browser]],
+        context_options: Dict[str, Any],
+        size: int = 2,
+        max_uses: int = 50,
+        request_timeout: float = 60000,
+        context_setup: Optional[Callable[[BrowserContext], Awaitable[None]]] = None
+    ):
+        self._browser_factory = browser_factory
+        self._context_options = context_options
+        self._context_setup = context_setup
+        self.size = max(1, size)
+        self.max_uses = max(1, max_uses)
+        self.request_timeout = request_timeout
+        self._semaphore = asyncio.Semaphore(self.size)
+        self._idle: List[KikPageSlot] = []
+        self._in_use = 0
+        self._closed = False
+        self.last_activity = time.monotonic()
+        self._counters = {"created": 0, "recycled": 0, "discarded": 0, "unhealthy": 0}
+
+    async def _create_slot(self) -> KikPageSlot:
+        browser = await self._browser_factory()
+        context = await browser.new_context(**self._context_options)
+        try:
+            if self._context_setup:
+                await self._context_setup(context) # e.g. route handlers, before the first request
+            page = await context.new_page()
+        except Exception:
+            await context.close()
+            raise
+        page.set_default_navigation_timeout(self.request_timeout)
+        page.set_default_timeout(self.request_timeout)
+        self._counters["created"] += 1
+        logger.info(f"KikPagePool: Created page slot ({self._counters['created']} created so far).")
+        return KikPageSlot(context, page)
+
+    async def _is_healthy(self, slot: KikPageSlot) -> bool:
+        if slot.page.is_closed() or not slot.context.browser or not slot.context.browser.is_connected():
+            return False
+        try:
+            await asyncio.wait_for(slot.page.evaluate("() => document.readyState"), timeout=5)
+            return True
+        except Exception as e:
+            logger.warning(f"KikPagePool: Page slot failed its health check: {e}")
+            return False
+
+    async def _dispose(self, slot: KikPageSlot):
+        try:
+            await slot.context.close()
+        except Exception as e:
+            logger.debug(f"KikPagePool: Error while closing a page slot: {e}")
+
+    async def checkout(self) -> KikPageSlot:
+        """Waits for a free slot, returning a healthy idle one or creating a new one."""
+        await self._semaphore.acquire()
+        self._closed = False
+        try:
+            slot = None
+            while self._idle:
+                candidate = self._idle.pop()
+                if await self._is_healthy(candidate):
+                    slot = candidate
+                    break
+                self._counters["unhealthy"] += 1
+                await self._dispose(candidate)
+            if slot is None:
+                slot = await self._create_slot()
+        except BaseException:
+            self._semaphore.release()
+            raise
+        slot.uses += 1
+        self._in_use += 1
+        self.last_activity = time.monotonic()
+        return slot
+
+    async def checkin(self, slot: KikPageSlot, discard: bool = False):
+        """Returns a slot to the pool; it is closed instead if it errored or reached max_uses."""
+        self._in_use -= 1
+        self.last_activity = time.monotonic()
+        try:
+            if discard:
+                self._counters["discarded"] += 1
+                await self._dispose(slot)
+            elif self._closed:
+                await self._dispose(slot)
+            elif slot.uses >= self.max_uses:
+                self._counters["recycled"] += 1
+                await self._dispose(slot)
+            else:
+                self._idle.append(slot)
+        finally:
+            self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[KikPageSlot]:
+        """Checks out a slot for the duration of the block; slots that raised are discarded."""
+        checked_out = await self.checkout()
+        failed = False
+        try:
+            yield checked_out
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            await self.checkin(checked_out, discard=failed)
+
+    async def close(self):
+        """Closes the idle slots; slots still checked out are closed when they are checked in."""
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for slot in idle:
+            await self._dispose(slot)
+
+    @property
+    def in_use(self) -> int:
+        return self._in_use
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "size": self.size,
+            "max_uses": self.max_uses,
+            "idle": len(self._idle),
+            "in_use": self._in_use,
+            **self._counters
+        }
@@ -0,0 +1,113 @@
+# kik_mcp_module/postback.py
+# Replays the KİK ASP.NET WebForms postbacks over plain HTTP, without a browser.
+
+import http.cookiejar
+import logging
+import re
+from typing import Dict, Optional
+
+import httpx
+from bs4 import BeautifulSoup
+
+from common_mcp_module.parsing import parse_html
+
+logger = logging.getLogger(__name__)
+
+_POSTBACK_TARGET = re.compile(r"""(?:__doPostBack|WebForm_PostBackOptions)\(\s*['"]([^'"]+)['"]""")
+# Inputs a browser never serializes unless they are the control that was clicked
+_UNSERIALIZED_INPUT_TYPES = {"submit", "image", "button", "reset", "file"}
+
+
+class KikPostbackError(Exception):
+    """The site answered a replayed postback with something other than the expected form page."""
+
+
+def postback_target(href: Optional[str]) -> Optional[str]:
+    """Event target of a `javascript:__doPostBack('...')` / `WebForm_PostBackOptions("...")` link."""
+    if not href:
+        return None
+    match = _POSTBACK_TARGET.search(href)
+    return match.group(1) if match else None
+
+
+def serialize_form(soup: BeautifulSoup) -> Dict[str, str]:
+    """Fields of the page's form as a browser would submit them (hidden/text inputs, checked radios, selects)."""
+    form = soup.find("form", id="aspnetForm") or soup.find("form")
+    if form is None:
+        raise KikPostbackError("Response does not contain a form.")
+    fields: Dict[str, str] = {}
+    for tag in form.find_all(["input", "select", "textarea"]):
+        name = tag.get("name")
+        if not name or tag.has_attr("disabled"):
+            continue
+        if tag.name == "input":
+            input_type = (tag.get("type") or "text").lower()
+            if input_type in _UNSERIALIZED_INPUT_TYPES:
+                continue
+            if input_type in ("radio", "checkbox"):
+                if tag.has_attr("checked"):
+                    fields[name] = tag.get("value", "on")
+                continue
+            fields[name] = tag.get("value", "")
+        elif tag.name == "select":
+            selected = tag.find("option", selected=True) or tag.find("option")
+            if selected is not None:
+                fields[name] = selected.get("value", selected.get_text(strip=True))
+        else:
+            fields[name] = tag.get_text()
+    if "__VIEWSTATE" not in fields:
+        raise KikPostbackError("Form has no __VIEWSTATE; not an ASP.NET WebForms page.")
+    return fields
+
+
+def isolated_cookie_policy() -> http.cookiejar.CookiePolicy:
+    """Cookie policy for the shared httpx client: it stores no cookies, every PostbackSession keeps its own."""
+    return http.cookiejar.DefaultCookiePolicy(allowed_domains=[])
+
+
+class PostbackSession:
+    """
+    One browser-less visit to a WebForms page: the current form state (view state, event
+    validation, field values) and the ASP.NET session cookies. Sessions share the pooled
+    httpx client but never each other's cookies, so concurrent searches stay independent.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, url: str):
+        self.client = client
+        self.url = url
+        self.cookies: Dict[str, str] = {}
+        self.fields: Dict[str, str] = {}
+        self.soup: Optional[BeautifulSoup] = None
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Referer": self.url}
+        if self.cookies:
+            headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in self.cookies.items())
+        return headers
+
+    def _absorb(self, response: httpx.Response) -> BeautifulSoup:
+        if response.status_code != 200:
+            raise KikPostbackError(f"Unexpected HTTP {response.status_code} from {response.request.url}")
+        self.cookies.update(response.cookies.items())
+        soup = parse_html(response.text)
+        self.fields = serialize_form(soup)
+        self.soup = soup
+        return soup
+
+    async def open(self) -> BeautifulSoup:
+        """GETs the page and captures its initial form state and session cookies."""
+        response = await self.client.get(self.url, headers=self._headers())
+        return self._absorb(response)
+
+    async def post_back(self, event_target: str, overrides: Optional[Dict[str, Optional[str]]] = None) -> BeautifulSoup:
+        """Submits the current form as __doPostBack(event_target, '') would, with the given field values."""
+        if self.soup is None:
+            await self.open()
+        data = dict(self.fields)
+        for name, value in (overrides or {}).items():
+            data[name] = value or ""
+        data["__EVENTTARGET"] = event_target
+        data["__EVENTARGUMENT"] = ""
+        logger.debug(f"PostbackSession: Posting back {event_target} to {self.url}")
+        response = await self.client.post(self.url, data=data, headers=self._headers())
+        return self._absorb(response)
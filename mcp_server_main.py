@@ -1,10 +1,9 @@
 # mcp_server_main.py
-import asyncio
-import atexit
 import logging
 import os
+from contextlib import aclosing
 from pydantic import HttpUrl, Field 
-from typing import Optional, Dict, List, Literal
+from typing import Any, Optional, Dict, List, Literal
 import urllib.parse
 
 # --- Logging Configuration Start ---
@@ -31,35 +30,29 @@ root_logger.addHandler(console_handler)
 logger = logging.getLogger(__name__)
 # --- Logging Configuration End ---
 
-from fastmcp import FastMCP
+from fastmcp import Context, FastMCP
 
 # --- Module Imports ---
-from yargitay_mcp_module.client import YargitayOfficialApiClient
 from yargitay_mcp_module.models import (
     YargitayDetailedSearchRequest, YargitayDocumentMarkdown, CompactYargitaySearchResult,
-    YargitayBirimEnum
+    YargitayBirimEnum, FederatedYargitaySearchResult
 )
-from bedesten_mcp_module.client import BedestenApiClient
+from yargitay_mcp_module.federated import search_yargitay_federated as run_federated_yargitay_search
 from bedesten_mcp_module.models import (
     BedestenSearchRequest, BedestenSearchData,
     BedestenDocumentMarkdown, DanistayBirimEnum
 )
-from danistay_mcp_module.client import DanistayApiClient
 from danistay_mcp_module.models import (
     DanistayKeywordSearchRequest, DanistayDetailedSearchRequest,
     DanistayDocumentMarkdown, CompactDanistaySearchResult
 )
-from emsal_mcp_module.client import EmsalApiClient
 from emsal_mcp_module.models import (
     EmsalSearchRequest, EmsalDocumentMarkdown, CompactEmsalSearchResult
 )
-from uyusmazlik_mcp_module.client import UyusmazlikApiClient
 from uyusmazlik_mcp_module.models import (
     UyusmazlikSearchRequest, UyusmazlikSearchResponse, UyusmazlikDocumentMarkdown,
     UyusmazlikBolumEnum, UyusmazlikTuruEnum, UyusmazlikKararSonucuEnum
 )
-from anayasa_mcp_module.client import AnayasaMahkemesiApiClient
-from anayasa_mcp_module.bireysel_client import AnayasaBireyselBasvuruApiClient
 from anayasa_mcp_module.models import (
     AnayasaNormDenetimiSearchRequest,
     AnayasaSearchResult,
@@ -71,7 +64,6 @@ from anayasa_mcp_module.models import (
     AnayasaNormTuruEnum, AnayasaIncelemeSonucuEnum, AnayasaSonucGerekcesiEnum
 )
 # KIK Module Imports
-from kik_mcp_module.client import KikApiClient
 from kik_mcp_module.models import ( 
     KikKararTipi, 
     KikSearchRequest,
@@ -79,31 +71,87 @@ from kik_mcp_module.models import (
     KikDocumentMarkdown 
 )
 
-from rekabet_mcp_module.client import RekabetKurumuApiClient
 from rekabet_mcp_module.models import (
     RekabetKurumuSearchRequest,
     RekabetSearchResult,
     RekabetDocument,
     RekabetKararTuruGuidEnum
 )
+from common_mcp_module.batch import BatchDocumentResult, fetch_documents_batch
+from common_mcp_module.cache import get_document_cache
+from common_mcp_module.clients import LazyClientRegistry
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.lifecycle import LifecycleMiddleware, get_server_lifecycle
+from common_mcp_module.metrics import ToolMetricsMiddleware
+from common_mcp_module.pagination import SearchHarvestResult
+from common_mcp_module.search_cache import get_search_cache
 
 
-app = FastMCP(
+lifecycle = get_server_lifecycle()
+
+class YargiMCP(FastMCP):
+    """FastMCP whose HTTP apps and stdio runs start, drain and stop the shared resources."""
+
+    def http_app(self, *args: Any, **kwargs: Any):
+        # Covers asgi_app, fastapi_app and starlette_app, which all build on http_app()
+        return lifecycle.wrap_app(super().http_app(*args, **kwargs))
+
+    async def run_stdio_async(self, *args: Any, **kwargs: Any) -> None:
+        async with lifecycle.running():
+            await super().run_stdio_async(*args, **kwargs)
+
+app = YargiMCP(
     name="YargiMCP",
     instructions="MCP server for TR legal databases (Yargitay, Danistay, Emsal, Uyusmazlik, Anayasa-Norm, Anayasa-Bireysel, KIK).",
-    dependencies=["httpx", "beautifulsoup4", "markitdown", "pydantic", "aiohttp", "playwright"]
+    dependencies=["httpx", "beautifulsoup4", "markitdown", "pydantic", "playwright"],
+    middleware=[ToolMetricsMiddleware(), LifecycleMiddleware(lifecycle)]
 )
 
 # --- API Client Instances ---
-yargitay_client_instance = YargitayOfficialApiClient()
-danistay_client_instance = DanistayApiClient()
-emsal_client_instance = EmsalApiClient()
-uyusmazlik_client_instance = UyusmazlikApiClient()
-anayasa_norm_client_instance = AnayasaMahkemesiApiClient()
-anayasa_bireysel_client_instance = AnayasaBireyselBasvuruApiClient()
-kik_client_instance = KikApiClient()
-rekabet_client_instance = RekabetKurumuApiClient()
-bedesten_client_instance = BedestenApiClient()
+# Created on first use, so a launch does not import MarkItDown, pypdf or Playwright
+# before a tool that needs them is called
+clients = LazyClientRegistry({
+    "yargitay": "yargitay_mcp_module.client:YargitayOfficialApiClient",
+    "danistay": "danistay_mcp_module.client:DanistayApiClient",
+    "emsal": "emsal_mcp_module.client:EmsalApiClient",
+    "uyusmazlik": "uyusmazlik_mcp_module.client:UyusmazlikApiClient",
+    "anayasa_norm": "anayasa_mcp_module.client:AnayasaMahkemesiApiClient",
+    "anayasa_bireysel": "anayasa_mcp_module.bireysel_client:AnayasaBireyselBasvuruApiClient",
+    "kik": "kik_mcp_module.client:KikApiClient",
+    "rekabet": "rekabet_mcp_module.client:RekabetKurumuApiClient",
+    "bedesten": "bedesten_mcp_module.client:BedestenApiClient"
+})
+
+def __getattr__(name: str) -> Any:
+    """Keeps `from mcp_server_main import kik_client_instance` working; creates the client on access."""
+    if name.endswith("_client_instance") and name[:-len("_client_instance")] in clients.names:
+        return clients.get(name[:-len("_client_instance")])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# --- Server Lifecycle ---
+@lifecycle.on_startup
+def start_clients():
+    clients.preload_from_env()
+    if os.getenv("YARGI_KIK_PREWARM", "false").lower() in ("1", "true", "yes", "on"):
+        clients.kik.start_background_tasks()
+
+@lifecycle.on_startup
+async def load_document_cache_index():
+    # Scan the on-disk cache on a worker thread now rather than inside the first document request
+    await get_document_cache().aload_index()
+
+# Shutdown hooks run in reverse: background refreshes stop before the clients they use close
+@lifecycle.on_shutdown
+def stop_conversion_pool():
+    get_conversion_executor().shutdown()
+
+@lifecycle.on_shutdown
+async def close_clients():
+    await clients.aclose()
+
+@lifecycle.on_shutdown
+async def stop_search_refreshes():
+    await get_search_cache().aclose()
 
 
 KARAR_TURU_ADI_TO_GUID_ENUM_MAP = {
@@ -222,7 +270,7 @@ async def search_yargitay_detailed(
     
     logger.info(f"Tool 'search_yargitay_detailed' called: {search_query.model_dump_json(exclude_none=True, indent=2)}")
     try:
-        api_response = await yargitay_client_instance.search_detailed_decisions(search_query)
+        api_response = await clients.yargitay.search_detailed_decisions(search_query)
         if api_response.data:
             return CompactYargitaySearchResult(
                 decisions=api_response.data.data,
@@ -275,7 +323,7 @@ async def get_yargitay_document_markdown(id: str) -> YargitayDocumentMarkdown:
     logger.info(f"Tool 'get_yargitay_document_markdown' called for ID: {id}")
     if not id or not id.strip(): raise ValueError("Document ID must be a non-empty string.")
     try:
-        return await yargitay_client_instance.get_decision_document_as_markdown(id)
+        return await clients.yargitay.get_decision_document_as_markdown(id)
     except Exception as e:
         logger.exception(f"Error in tool 'get_yargitay_document_markdown'.")
         raise
@@ -344,7 +392,7 @@ async def search_danistay_by_keyword(
     
     logger.info(f"Tool 'search_danistay_by_keyword' called.")
     try:
-        api_response = await danistay_client_instance.search_keyword_decisions(search_query)
+        api_response = await clients.danistay.search_keyword_decisions(search_query)
         if api_response.data:
             return CompactDanistaySearchResult(
                 decisions=api_response.data.data,
@@ -443,7 +491,7 @@ async def search_danistay_detailed(
     
     logger.info(f"Tool 'search_danistay_detailed' called.")
     try:
-        api_response = await danistay_client_instance.search_detailed_decisions(search_query)
+        api_response = await clients.danistay.search_detailed_decisions(search_query)
         if api_response.data:
             return CompactDanistaySearchResult(
                 decisions=api_response.data.data,
@@ -498,7 +546,7 @@ async def get_danistay_document_markdown(id: str) -> DanistayDocumentMarkdown:
     logger.info(f"Tool 'get_danistay_document_markdown' called for ID: {id}")
     if not id or not id.strip(): raise ValueError("Document ID must be a non-empty string for Danıştay.")
     try:
-        return await danistay_client_instance.get_decision_document_as_markdown(id)
+        return await clients.danistay.get_decision_document_as_markdown(id)
     except Exception as e:
         logger.exception(f"Error in tool 'get_danistay_document_markdown'.")
         raise
@@ -589,7 +637,7 @@ async def search_emsal_detailed_decisions(
     
     logger.info(f"Tool 'search_emsal_detailed_decisions' called.")
     try:
-        api_response = await emsal_client_instance.search_detailed_decisions(search_query)
+        api_response = await clients.emsal.search_detailed_decisions(search_query)
         if api_response.data:
             return CompactEmsalSearchResult(
                 decisions=api_response.data.data,
@@ -645,7 +693,7 @@ async def get_emsal_document_markdown(id: str) -> EmsalDocumentMarkdown:
     logger.info(f"Tool 'get_emsal_document_markdown' called for ID: {id}")
     if not id or not id.strip(): raise ValueError("Document ID required for Emsal.")
     try:
-        return await emsal_client_instance.get_decision_document_as_markdown(id)
+        return await clients.emsal.get_decision_document_as_markdown(id)
     except Exception as e:
         logger.exception(f"Error in tool 'get_emsal_document_markdown'.")
         raise
@@ -749,7 +797,7 @@ async def search_uyusmazlik_decisions(
     
     logger.info(f"Tool 'search_uyusmazlik_decisions' called.")
     try:
-        return await uyusmazlik_client_instance.search_decisions(search_params)
+        return await clients.uyusmazlik.search_decisions(search_params)
     except Exception as e:
         logger.exception(f"Error in tool 'search_uyusmazlik_decisions'.")
         raise
@@ -797,7 +845,7 @@ async def get_uyusmazlik_document_markdown_from_url(document_url: HttpUrl) -> Uy
     if not document_url:
         raise ValueError("Document URL (document_url) is required for Uyuşmazlık document retrieval.")
     try:
-        return await uyusmazlik_client_instance.get_decision_document_as_markdown(str(document_url))
+        return await clients.uyusmazlik.get_decision_document_as_markdown(str(document_url))
     except Exception as e:
         logger.exception(f"Error in tool 'get_uyusmazlik_document_markdown_from_url'.")
         raise
@@ -935,7 +983,7 @@ async def search_anayasa_norm_denetimi_decisions(
     
     logger.info(f"Tool 'search_anayasa_norm_denetimi_decisions' called.")
     try:
-        return await anayasa_norm_client_instance.search_norm_denetimi_decisions(search_query)
+        return await clients.anayasa_norm.search_norm_denetimi_decisions(search_query)
     except Exception as e:
         logger.exception(f"Error in tool 'search_anayasa_norm_denetimi_decisions'.")
         raise
@@ -988,7 +1036,7 @@ async def get_anayasa_norm_denetimi_document_markdown(
         raise ValueError("Document URL is required for Anayasa Norm Denetimi document retrieval.")
     current_page_to_fetch = page_number if page_number is not None and page_number >= 1 else 1
     try:
-        return await anayasa_norm_client_instance.get_decision_document_as_markdown(document_url, page_number=current_page_to_fetch)
+        return await clients.anayasa_norm.get_decision_document_as_markdown(document_url, page_number=current_page_to_fetch)
     except Exception as e:
         logger.exception(f"Error in tool 'get_anayasa_norm_denetimi_document_markdown'.")
         raise
@@ -1055,7 +1103,7 @@ async def search_anayasa_bireysel_basvuru_report(
     
     logger.info(f"Tool 'search_anayasa_bireysel_basvuru_report' called.")
     try:
-        return await anayasa_bireysel_client_instance.search_bireysel_basvuru_report(search_query)
+        return await clients.anayasa_bireysel.search_bireysel_basvuru_report(search_query)
     except Exception as e:
         logger.exception(f"Error in tool 'search_anayasa_bireysel_basvuru_report'.")
         raise
@@ -1109,7 +1157,7 @@ async def get_anayasa_bireysel_basvuru_document_markdown(
         raise ValueError("Document URL path (e.g., /BB/YYYY/NNNN) is required for Anayasa Bireysel Başvuru document retrieval.")
     current_page_to_fetch = page_number if page_number is not None and page_number >= 1 else 1
     try:
-        return await anayasa_bireysel_client_instance.get_decision_document_as_markdown(document_url_path, page_number=current_page_to_fetch)
+        return await clients.anayasa_bireysel.get_decision_document_as_markdown(document_url_path, page_number=current_page_to_fetch)
     except Exception as e:
         logger.exception(f"Error in tool 'get_anayasa_bireysel_basvuru_document_markdown'.")
         raise
@@ -1197,7 +1245,7 @@ async def search_kik_decisions(
     
     logger.info(f"Tool 'search_kik_decisions' called.")
     try:
-        api_response = await kik_client_instance.search_decisions(search_query)
+        api_response = await clients.kik.search_decisions(search_query)
         page_param_for_log = search_query.page if hasattr(search_query, 'page') else 1
         if not api_response.decisions and api_response.total_records == 0 and page_param_for_log == 1:
              logger.warning(f"KIK search returned no decisions for query.")
@@ -1265,7 +1313,7 @@ async def get_kik_document_markdown(
     current_page_to_fetch = page_number if page_number is not None and page_number >= 1 else 1
 
     try:
-        return await kik_client_instance.get_decision_document_as_markdown(
+        return await clients.kik.get_decision_document_as_markdown(
             karar_id_b64=karar_id, 
             page_number=current_page_to_fetch
         )
@@ -1377,7 +1425,7 @@ async def search_rekabet_kurumu_decisions(
     logger.info(f"Tool 'search_rekabet_kurumu_decisions' called. Query: {search_query.model_dump_json(exclude_none=True, indent=2)}")
     try:
        
-        return await rekabet_client_instance.search_decisions(search_query)
+        return await clients.rekabet.search_decisions(search_query)
     except Exception as e:
         logger.exception("Error in tool 'search_rekabet_kurumu_decisions'.")
         return RekabetSearchResult(decisions=[], retrieved_page_number=page, total_records_found=0, total_pages=0)
@@ -1433,7 +1481,7 @@ async def get_rekabet_kurumu_document(
     
     try:
       
-        return await rekabet_client_instance.get_decision_document(karar_id, page_number=current_page_to_fetch)
+        return await clients.rekabet.get_decision_document(karar_id, page_number=current_page_to_fetch)
     except Exception as e:
         logger.exception(f"Error in tool 'get_rekabet_kurumu_document'. Karar ID: {karar_id}")
         raise 
@@ -1482,7 +1530,8 @@ async def search_yargitay_bedesten(
     """
     Searches Yargıtay decisions using Bedesten API (alternative source).
     This complements search_yargitay_detailed for comprehensive coverage.
-    Always use BOTH Yargıtay search tools for complete results.
+    Always use BOTH Yargıtay search tools for complete results, or search_yargitay_federated
+    to run both at once with merged, deduplicated results.
     
     Returns a simplified response with decision list and metadata.
     """
@@ -1501,7 +1550,7 @@ async def search_yargitay_bedesten(
     logger.info(f"Tool 'search_yargitay_bedesten' called: phrase='{phrase}', birimAdi='{birimAdi}', dateRange='{kararTarihiStart}' to '{kararTarihiEnd}', page={pageNumber}")
     
     try:
-        response = await bedesten_client_instance.search_documents(search_request)
+        response = await clients.bedesten.search_documents(search_request)
         
         # Return simplified response format
         return {
@@ -1536,11 +1585,56 @@ async def get_yargitay_bedesten_document_markdown(
         raise ValueError("Document ID must be a non-empty string.")
     
     try:
-        return await bedesten_client_instance.get_document_as_markdown(documentId)
+        return await clients.bedesten.get_document_as_markdown(documentId)
     except Exception as e:
         logger.exception("Error in tool 'get_yargitay_bedesten_document_markdown'")
         raise
 
+@app.tool(
+    description="Search Court of Cassation (Yargıtay) decisions in the official API and Bedesten at the same time, returning one deduplicated list with the source of every decision",
+    annotations={
+        "readOnlyHint": True,
+        "openWorldHint": True,
+        "idempotentHint": True
+    }
+)
+async def search_yargitay_federated(
+    phrase: str = Field(..., description="""Keyword or phrase, sent to both sources.
+    • Words: arsa payı
+    • Exact phrase: "arsa payı" (supported by both sources)"""),
+    birim: YargitayBirimEnum = Field("", description="Yargıtay chamber/board (e.g. '3. Hukuk Dairesi'); empty string for all chambers."),
+    baslangicTarihi: str = Field("", description="Start date for decision search (DD.MM.YYYY)."),
+    bitisTarihi: str = Field("", description="End date for decision search (DD.MM.YYYY)."),
+    pageSize: int = Field(10, ge=1, le=100, description="Results per page, requested from each source."),
+    pageNumber: int = Field(1, ge=1, description="Page number, requested from each source.")
+) -> FederatedYargitaySearchResult:
+    """
+    Searches Yargıtay decisions in both the official Yargıtay API and Bedesten concurrently.
+    
+    Replaces calling search_yargitay_detailed and search_yargitay_bedesten one after the
+    other: both searches run in parallel, decisions returned by both sources are merged
+    by (daire, esasNo, kararNo), and the list is ranked newest first, with decisions
+    confirmed by both sources ahead on the same date.
+    
+    Output Format:
+    • decisions: daire, esasNo, kararNo, kararTarihi and sources ("yargitay", "bedesten")
+    • yargitay_id → get_yargitay_document_markdown; bedesten_document_id → get_yargitay_bedesten_document_markdown
+    • total_records per source; errors lists a source that failed (the other's results are still returned)
+    
+    For operators only the official API supports (+, -, *), use search_yargitay_detailed.
+    """
+    logger.info(f"Tool 'search_yargitay_federated' called: phrase='{phrase}', birim='{birim}', page={pageNumber}")
+    try:
+        return await run_federated_yargitay_search(
+            clients.yargitay, clients.bedesten,
+            phrase=phrase, birim=birim,
+            baslangic_tarihi=baslangicTarihi, bitis_tarihi=bitisTarihi,
+            page_size=pageSize, page_number=pageNumber
+        )
+    except Exception as e:
+        logger.exception("Error in tool 'search_yargitay_federated'")
+        raise
+
 # --- MCP Tools for Bedesten (Alternative Danıştay Search) ---
 @app.tool(
     description="Search Council of State (Danıştay) decisions using the Bedesten API - a powerful alternative data source. This tool provides access to administrative court decisions with comprehensive filtering options including chamber (daire) selection (27 options), date ranges, and exact phrase matching. Use this alongside search_danistay_by_keyword and search_danistay_detailed for complete coverage of administrative law decisions.",
@@ -1601,7 +1695,7 @@ async def search_danistay_bedesten(
     logger.info(f"Tool 'search_danistay_bedesten' called: phrase='{phrase}', birimAdi='{birimAdi}', dateRange='{kararTarihiStart}' to '{kararTarihiEnd}', page={pageNumber}")
     
     try:
-        response = await bedesten_client_instance.search_documents(search_request)
+        response = await clients.bedesten.search_documents(search_request)
         
         # Return simplified response format
         return {
@@ -1636,7 +1730,7 @@ async def get_danistay_bedesten_document_markdown(
         raise ValueError("Document ID must be a non-empty string.")
     
     try:
-        return await bedesten_client_instance.get_document_as_markdown(documentId)
+        return await clients.bedesten.get_document_as_markdown(documentId)
     except Exception as e:
         logger.exception("Error in tool 'get_danistay_bedesten_document_markdown'")
         raise
@@ -1691,7 +1785,7 @@ async def search_yerel_hukuk_bedesten(
     logger.info(f"Tool 'search_yerel_hukuk_bedesten' called: phrase='{phrase}', dateRange='{kararTarihiStart}' to '{kararTarihiEnd}', page={pageNumber}")
     
     try:
-        response = await bedesten_client_instance.search_documents(search_request)
+        response = await clients.bedesten.search_documents(search_request)
         
         # Return simplified response format
         return {
@@ -1726,7 +1820,7 @@ async def get_yerel_hukuk_bedesten_document_markdown(
         raise ValueError("Document ID must be a non-empty string.")
     
     try:
-        return await bedesten_client_instance.get_document_as_markdown(documentId)
+        return await clients.bedesten.get_document_as_markdown(documentId)
     except Exception as e:
         logger.exception("Error in tool 'get_yerel_hukuk_bedesten_document_markdown'")
         raise
@@ -1796,7 +1890,7 @@ async def search_istinaf_hukuk_bedesten(
     logger.info(f"Tool 'search_istinaf_hukuk_bedesten' called: phrase='{phrase}', dateRange='{kararTarihiStart}' to '{kararTarihiEnd}', page={pageNumber}")
     
     try:
-        response = await bedesten_client_instance.search_documents(search_request)
+        response = await clients.bedesten.search_documents(search_request)
         
         # Return simplified response format
         return {
@@ -1846,7 +1940,7 @@ async def get_istinaf_hukuk_bedesten_document_markdown(
         raise ValueError("Document ID must be a non-empty string.")
     
     try:
-        return await bedesten_client_instance.get_document_as_markdown(documentId)
+        return await clients.bedesten.get_document_as_markdown(documentId)
     except Exception as e:
         logger.exception("Error in tool 'get_istinaf_hukuk_bedesten_document_markdown'")
         raise
@@ -1923,7 +2017,7 @@ async def search_kyb_bedesten(
     logger.info(f"Tool 'search_kyb_bedesten' called: phrase='{phrase}', dateRange='{kararTarihiStart}' to '{kararTarihiEnd}', page={pageNumber}")
     
     try:
-        response = await bedesten_client_instance.search_documents(search_request)
+        response = await clients.bedesten.search_documents(search_request)
         
         # Return simplified response format
         return {
@@ -1979,59 +2073,137 @@ async def get_kyb_bedesten_document_markdown(
         raise ValueError("Document ID must be a non-empty string.")
     
     try:
-        return await bedesten_client_instance.get_document_as_markdown(documentId)
+        return await clients.bedesten.get_document_as_markdown(documentId)
     except Exception as e:
         logger.exception("Error in tool 'get_kyb_bedesten_document_markdown'")
         raise
 
-# --- Application Shutdown Handling ---
-def perform_cleanup():
-    logger.info("MCP Server performing cleanup...")
+# --- MCP Tool for Batch Document Retrieval ---
+@app.tool(
+    description="Retrieve the full texts of up to 20 Yargıtay, Danıştay, Emsal or Bedesten decisions in one call, fetched concurrently and returned in order with per-document errors",
+    annotations={
+        "readOnlyHint": True,
+        "openWorldHint": True,
+        "idempotentHint": True
+    }
+)
+async def get_documents_markdown_batch(
+    source: Literal["yargitay", "danistay", "emsal", "bedesten"] = Field(..., description="Which document tool the IDs belong to: yargitay (get_yargitay_document_markdown), danistay (get_danistay_document_markdown), emsal (get_emsal_document_markdown) or bedesten (any get_*_bedesten_document_markdown)."),
+    ids: List[str] = Field(..., min_length=1, max_length=20, description="Document IDs from that source's search results, e.g. the top hits of a search.")
+) -> BatchDocumentResult:
+    """
+    Retrieves several decision documents in Markdown format with a single call.
+    
+    Instead of calling a get_*_document_markdown tool once per search hit, pass the IDs
+    of the hits you want to read. Documents are fetched concurrently (bounded) and
+    converted in parallel, so the call takes about as long as the slowest document.
+    
+    Input Requirements:
+    • source: yargitay, danistay, emsal or bedesten
+    • ids: 1-20 document IDs from that source's search results
+    
+    Output Format:
+    • items: one entry per requested ID, in the same order
+    • Each item holds the same document the single-document tool returns, or an error
+    • A failing ID does not fail the others; succeeded/failed give the counts
+    
+    Use for:
+    • Reading the top results of a search at once
+    • Comparing several decisions side by side
+    """
+    logger.info(f"Tool 'get_documents_markdown_batch' called for {len(ids)} {source} documents")
+    fetchers = {
+        "yargitay": lambda: clients.yargitay.get_decision_document_as_markdown,
+        "danistay": lambda: clients.danistay.get_decision_document_as_markdown,
+        "emsal": lambda: clients.emsal.get_decision_document_as_markdown,
+        "bedesten": lambda: clients.bedesten.get_document_as_markdown
+    }
     try:
-        loop = asyncio.get_event_loop_policy().get_event_loop()
-        if loop.is_closed(): 
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-    except RuntimeError: 
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    clients_to_close = [
-        globals().get('yargitay_client_instance'),
-        globals().get('danistay_client_instance'),
-        globals().get('emsal_client_instance'),
-        globals().get('uyusmazlik_client_instance'),
-        globals().get('anayasa_norm_client_instance'),
-        globals().get('anayasa_bireysel_client_instance'),
-        globals().get('kik_client_instance'),
-        globals().get('rekabet_client_instance'),
-        globals().get('bedesten_client_instance')
-    ]
-    async def close_all_clients_async():
-        tasks = []
-        for client_instance in clients_to_close:
-            if client_instance and hasattr(client_instance, 'close_client_session') and callable(client_instance.close_client_session):
-                logger.info(f"Scheduling close for client session: {client_instance.__class__.__name__}")
-                tasks.append(client_instance.close_client_session())
-        if tasks:
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            for i, result in enumerate(results):
-                if isinstance(result, Exception):
-                    client_name = "Unknown Client"
-                    if i < len(clients_to_close) and clients_to_close[i] is not None:
-                        client_name = clients_to_close[i].__class__.__name__
-                    logger.error(f"Error closing client {client_name}: {result}")
+        return await fetch_documents_batch(source, ids, fetchers[source]())
+    except Exception as e:
+        logger.exception("Error in tool 'get_documents_markdown_batch'")
+        raise
+
+# --- MCP Tool for Multi-Page Search Harvesting ---
+@app.tool(
+    description="Collect up to 1000 results of a search across all its pages in one call, for any paginated source, with progress notifications per page",
+    annotations={
+        "readOnlyHint": True,
+        "openWorldHint": True,
+        "idempotentHint": True
+    }
+)
+async def harvest_search_results(
+    ctx: Context,
+    source: Literal[
+        "yargitay", "danistay_keyword", "danistay_detailed", "emsal", "bedesten",
+        "anayasa_norm", "anayasa_bireysel", "kik", "rekabet"
+    ] = Field(..., description="Which search to run: yargitay (search_yargitay_detailed), danistay_keyword (search_danistay_by_keyword), danistay_detailed (search_danistay_detailed), emsal (search_emsal_detailed_decisions), bedesten (any search_*_bedesten; pass itemTypeList), anayasa_norm (search_anayasa_norm_denetimi_decisions), anayasa_bireysel (search_anayasa_bireysel_basvuru_report), kik (search_kik_decisions) or rekabet (search_rekabet_kurumu_decisions)."),
+    search_params: Dict[str, Any] = Field(default_factory=dict, description="Search filters, named as the parameters of that search tool (e.g. {\"arananKelime\": \"kira\"} for yargitay, {\"phrase\": \"kira\", \"itemTypeList\": [\"YARGITAYKARARI\"]} for bedesten). Page size and page number are managed by the harvest and ignored."),
+    max_results: int = Field(100, ge=1, le=1000, description="Maximum number of results to collect.")
+) -> SearchHarvestResult:
+    """
+    Collects the results of a search across pages with a single call.
+    
+    Instead of calling a search tool again and again with increasing page numbers,
+    name the search and its filters. Pages are fetched at the largest size the source
+    allows, the next page is requested while the current one is processed, and the
+    harvest stops at max_results or when the source's total is reached. A progress
+    notification is sent after every page.
+    
+    Output Format:
+    • decisions: the collected results, in the source's order, in that search tool's format
+    • total_records: total matches reported by the source (if it reports one)
+    • complete: whether every matching result was collected
+    
+    Use for:
+    • Building a full list of decisions for a query or chamber and period
+    • Counting and surveying results before reading documents
+    """
+    logger.info(f"Tool 'harvest_search_results' called: source={source}, max_results={max_results}, search_params={search_params}")
+    params = dict(search_params)
+    total_records: Optional[int] = None
+
+    async def report_page(harvested: int, total: Optional[int]):
+        nonlocal total_records
+        total_records = total
+        expected = min(max_results, total) if total is not None else max_results
+        await ctx.report_progress(harvested, expected, f"{harvested} {source} results collected")
+
     try:
-        if loop.is_running(): 
-            asyncio.ensure_future(close_all_clients_async(), loop=loop)
-            logger.info("Client cleanup tasks scheduled on running event loop.")
+        if source == "yargitay":
+            results = clients.yargitay.iter_search(YargitayDetailedSearchRequest(**params), max_results, report_page)
+        elif source == "danistay_keyword":
+            results = clients.danistay.iter_search(DanistayKeywordSearchRequest(**params), max_results, report_page)
+        elif source == "danistay_detailed":
+            results = clients.danistay.iter_search(DanistayDetailedSearchRequest(**params), max_results, report_page)
+        elif source == "emsal":
+            results = clients.emsal.iter_search(EmsalSearchRequest(**params), max_results, report_page)
+        elif source == "bedesten":
+            search_data = BedestenSearchData(**{"pageSize": 10, "pageNumber": 1, **params})
+            results = clients.bedesten.iter_search(BedestenSearchRequest(data=search_data), max_results, report_page)
+        elif source == "anayasa_norm":
+            results = clients.anayasa_norm.iter_search(AnayasaNormDenetimiSearchRequest(**params), max_results, report_page)
+        elif source == "anayasa_bireysel":
+            results = clients.anayasa_bireysel.iter_search(AnayasaBireyselReportSearchRequest(**params), max_results, report_page)
+        elif source == "kik":
+            results = clients.kik.iter_search(KikSearchRequest(**params), max_results, report_page)
         else:
-            loop.run_until_complete(close_all_clients_async())
-            logger.info("Client cleanup tasks completed via run_until_complete.")
-    except Exception as e: 
-        logger.error(f"Error during atexit cleanup execution: {e}", exc_info=True)
-    logger.info("MCP Server atexit cleanup process finished.")
+            params["KararTuruID"] = KARAR_TURU_ADI_TO_GUID_ENUM_MAP.get(params.pop("KararTuru", ""), RekabetKararTuruGuidEnum.TUMU)
+            results = clients.rekabet.iter_search(RekabetKurumuSearchRequest(**params), max_results, report_page)
 
-atexit.register(perform_cleanup)
+        decisions = []
+        async with aclosing(results) as decision_iterator:
+            async for decision in decision_iterator:
+                decisions.append(decision)
+        complete = len(decisions) < max_results or (total_records is not None and len(decisions) >= total_records)
+        return SearchHarvestResult(
+            source=source, decisions=decisions, total_records=total_records,
+            returned=len(decisions), complete=complete
+        )
+    except Exception as e:
+        logger.exception("Error in tool 'harvest_search_results'")
+        raise
 
 def main():
     logger.info(f"Starting {app.name} server via main() function...")
@@ -1,15 +1,14 @@
 # rekabet_mcp_module/client.py
 
 import httpx
-from bs4 import BeautifulSoup
-from typing import List, Optional, Tuple, Dict, Any
+from typing import AsyncIterator, List, Optional, Tuple, Dict, Any
 import logging
 import html
 import re
 import io # For io.BytesIO
 from urllib.parse import urlencode, urljoin, quote, parse_qs, urlparse
-from markitdown import MarkItDown
 import math
+import os
 
 # pypdf for PDF processing (lighter alternative to PyMuPDF)
 from pypdf import PdfReader, PdfWriter # PyPDF2'nin devamı niteliğindeki pypdf
@@ -22,6 +21,14 @@ from .models import (
     RekabetKararTuruGuidEnum
 )
 from pydantic import HttpUrl # Ensure HttpUrl is imported from pydantic
+from common_mcp_module.cache import MemoryCache, get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_pdf_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.parsing import only, parse_html
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers(): # Pragma: no cover
@@ -39,7 +46,8 @@ class RekabetKurumuApiClient:
     # DOCUMENT_MARKDOWN_CHUNK_SIZE = 5000 
 
     def __init__(self, request_timeout: float = 60.0):
-        self.http_client = httpx.AsyncClient(
+        self.http_client = create_http_client(
+            "rekabet",
             base_url=self.BASE_URL,
             headers={
                 "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -50,6 +58,8 @@ class RekabetKurumuApiClient:
             verify=True,
             follow_redirects=True
         )
+        # Downloaded decision PDFs, split into pages, plus the pages converted so far (keyed by karar_id)
+        self.pdf_cache = MemoryCache("rekabet_pdf", max_bytes=int(os.getenv("YARGI_REKABET_PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)))
 
     def _build_search_query_params(self, params: RekabetKurumuSearchRequest) -> List[Tuple[str, str]]:
         query_params: List[Tuple[str, str]] = []
@@ -70,6 +80,8 @@ class RekabetKurumuApiClient:
             
         return query_params
 
+    @cache_search("rekabet.search", keyword_fields=("sayfaAdi", "PdfText"))
+    @coalesce("rekabet.search")
     async def search_decisions(self, params: RekabetKurumuSearchRequest) -> RekabetSearchResult:
         request_path = self.SEARCH_PATH
         final_query_params = self._build_search_query_params(params)
@@ -83,7 +95,8 @@ class RekabetKurumuApiClient:
             logger.error(f"RekabetKurumuApiClient: HTTP request error during search: {e}")
             raise
         
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Only the result list and the pager with the total are built into the tree
+        soup = parse_html(html_content, only("div#kararList", "div.yazi01"))
         processed_decisions: List[RekabetDecisionSummary] = []
         total_records: Optional[int] = None
         total_pages: Optional[int] = None
@@ -207,8 +220,27 @@ class RekabetKurumuApiClient:
             retrieved_page_number=params.page, total_pages=total_pages if total_pages is not None else 0
         )
 
+    def iter_search(
+        self,
+        params: RekabetKurumuSearchRequest,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[RekabetDecisionSummary]:
+        """
+        Yields up to max_results decisions matching params from page 1 on (params.page is
+        ignored; the site fixes the page size), prefetching the next page while the current
+        one is consumed.
+        """
+        async def fetch_page(page_number: int) -> SearchPage:
+            result = await self.search_decisions(params.model_copy(update={"page": page_number}))
+            return SearchPage(result.decisions, result.total_records_found, result.total_pages or None)
+
+        return iter_search_results(fetch_page, max_results, None, on_page)
+
     async def _extract_pdf_url_and_landing_page_metadata(self, karar_id: str, landing_page_html: str, landing_page_url: str) -> Dict[str, Any]:
-        soup = BeautifulSoup(landing_page_html, 'html.parser')
+        # The PDF URL is needed before the PDF download, so this cannot share the conversion job;
+        # only the title and the elements that may link the PDF are built into the tree
+        soup = parse_html(landing_page_html, only("title", "a", "iframe", "embed"))
         data: Dict[str, Any] = {
             "pdf_url": None,
             "title_on_landing_page": soup.title.string.strip() if soup.title and soup.title.string else f"Rekabet Kurumu Kararı {karar_id}",
@@ -255,47 +287,36 @@ class RekabetKurumuApiClient:
             logger.error(f"General error downloading PDF from {pdf_url}: {e}")
         return None
 
-    def _extract_single_pdf_page_as_pdf_bytes(self, original_pdf_bytes: bytes, page_number_to_extract: int) -> Tuple[Optional[bytes], int]:
-        total_pages_in_original_pdf = 0
-        single_page_pdf_bytes: Optional[bytes] = None
-        
+    @staticmethod
+    def _split_pdf_into_single_page_pdfs(original_pdf_bytes: bytes) -> List[bytes]:
+        """Parses the PDF once and returns every page as its own single-page PDF (index 0 is page 1)."""
         if not original_pdf_bytes:
             logger.warning("No original PDF bytes provided for page extraction.")
-            return None, 0
+            return []
 
+        page_pdfs: List[bytes] = []
         try:
-            pdf_stream = io.BytesIO(original_pdf_bytes)
-            reader = PdfReader(pdf_stream)
-            total_pages_in_original_pdf = len(reader.pages)
-            
-            if not (0 < page_number_to_extract <= total_pages_in_original_pdf):
-                logger.warning(f"Requested page number ({page_number_to_extract}) is out of PDF page range (1-{total_pages_in_original_pdf}).")
-                return None, total_pages_in_original_pdf
-
-            writer = PdfWriter()
-            writer.add_page(reader.pages[page_number_to_extract - 1]) # pypdf is 0-indexed
-            
-            output_pdf_stream = io.BytesIO()
-            writer.write(output_pdf_stream)
-            single_page_pdf_bytes = output_pdf_stream.getvalue()
-            
-            logger.debug(f"Page {page_number_to_extract} of original PDF (total {total_pages_in_original_pdf} pages) extracted as new PDF using pypdf.")
-            
+            reader = PdfReader(io.BytesIO(original_pdf_bytes))
+            for page in reader.pages:
+                writer = PdfWriter()
+                writer.add_page(page)
+                output_pdf_stream = io.BytesIO()
+                writer.write(output_pdf_stream)
+                page_pdfs.append(output_pdf_stream.getvalue())
+            logger.debug(f"Original PDF split into {len(page_pdfs)} single-page PDFs using pypdf.")
         except Exception as e:
-            logger.error(f"Error extracting PDF page using pypdf: {e}", exc_info=True)
-            return None, total_pages_in_original_pdf 
-        return single_page_pdf_bytes, total_pages_in_original_pdf
+            logger.error(f"Error splitting PDF into pages using pypdf: {e}", exc_info=True)
+            return []
+        return page_pdfs
 
-    def _convert_pdf_bytes_to_markdown(self, pdf_bytes: bytes, source_url_for_logging: str) -> Optional[str]:
+    @staticmethod
+    def _convert_pdf_bytes_to_markdown(pdf_bytes: bytes, source_url_for_logging: str) -> Optional[str]:
         if not pdf_bytes:
             logger.warning(f"No PDF bytes provided for Markdown conversion (source: {source_url_for_logging}).")
             return None
         
-        pdf_stream = io.BytesIO(pdf_bytes)
         try:
-            md_converter = MarkItDown(enable_plugins=False) 
-            conversion_result = md_converter.convert(pdf_stream) 
-            markdown_text = conversion_result.text_content
+            markdown_text = convert_pdf_to_markdown(pdf_bytes)
             
             if not markdown_text:
                  logger.warning(f"MarkItDown returned empty content from PDF byte stream (source: {source_url_for_logging}). PDF page might be image-based or MarkItDown could not process the PDF stream.")
@@ -304,6 +325,76 @@ class RekabetKurumuApiClient:
             logger.error(f"MarkItDown conversion error for PDF byte stream (source: {source_url_for_logging}): {e}", exc_info=True)
             return None
 
+    @staticmethod
+    def _decision_pdf_size(decision_pdf: Dict[str, Any]) -> int:
+        return sum(len(page_pdf) for page_pdf in decision_pdf["page_pdfs"]) + \
+            sum(len(markdown.encode("utf-8")) for markdown in decision_pdf["page_markdown"].values())
+
+    @coalesce("rekabet.pdf")
+    async def _load_decision_pdf(self, karar_id: str) -> Dict[str, Any]:
+        """
+        Returns the decision's PDF split into single-page PDFs, together with the landing
+        page metadata and the pages converted so far. The landing page and PDF are
+        downloaded and parsed only once per decision; later page requests are served from
+        the in-memory PDF cache. Concurrent requests for different pages of the same
+        decision share one download.
+        """
+        decision_pdf = self.pdf_cache.get(karar_id)
+        if decision_pdf is not None:
+            return decision_pdf
+
+        full_landing_page_url = urljoin(self.BASE_URL, f"{self.DECISION_LANDING_PATH_TEMPLATE}?kararId={karar_id}")
+        decision_pdf = {
+            "pdf_url": None,
+            "title": f"Rekabet Kurumu Kararı {karar_id}", # Default
+            "page_pdfs": [],
+            "page_markdown": {},
+            "error_message": None
+        }
+        error_message: Optional[str] = None
+        original_pdf_bytes: Optional[bytes] = None
+
+        async with self.http_client.stream("GET", full_landing_page_url) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").lower()
+            final_url_of_response = HttpUrl(str(response.url))
+
+            if "application/pdf" in content_type:
+                logger.info(f"URL {final_url_of_response} is a direct PDF. Processing content.")
+                decision_pdf["pdf_url"] = final_url_of_response
+                original_pdf_bytes = await response.aread()
+            elif "text/html" in content_type:
+                logger.info(f"URL {final_url_of_response} is an HTML landing page. Looking for PDF link.")
+                landing_page_html_bytes = await response.aread()
+                detected_charset = response.charset_encoding or 'utf-8'
+                try: landing_page_html = landing_page_html_bytes.decode(detected_charset)
+                except UnicodeDecodeError: landing_page_html = landing_page_html_bytes.decode('utf-8', errors='replace')
+
+                if landing_page_html.strip():
+                    landing_page_data = await self._extract_pdf_url_and_landing_page_metadata(karar_id, landing_page_html, str(final_url_of_response))
+                    pdf_url_str_from_html = landing_page_data.get("pdf_url")
+                    if landing_page_data.get("title_on_landing_page"): decision_pdf["title"] = landing_page_data.get("title_on_landing_page")
+                    if pdf_url_str_from_html:
+                        decision_pdf["pdf_url"] = HttpUrl(pdf_url_str_from_html)
+                        original_pdf_bytes = await self._download_pdf_bytes(str(decision_pdf["pdf_url"]))
+                    else: error_message = "PDF URL not found on HTML landing page."
+                else: error_message = "Decision landing page content is empty."
+            else: error_message = f"Unexpected content type ({content_type}) for URL: {final_url_of_response}"
+
+        if original_pdf_bytes:
+            decision_pdf["page_pdfs"] = await get_conversion_executor().run(
+                RekabetKurumuApiClient._split_pdf_into_single_page_pdfs, original_pdf_bytes)
+            if not decision_pdf["page_pdfs"]:
+                error_message = "PDF could not be processed or page count was zero (original PDF might be invalid)."
+        elif not error_message:
+            error_message = "PDF content could not be downloaded or identified."
+
+        decision_pdf["error_message"] = error_message
+        if decision_pdf["page_pdfs"]:
+            self.pdf_cache.set(karar_id, decision_pdf, self._decision_pdf_size(decision_pdf))
+        return decision_pdf
+
+    @coalesce("rekabet.document")
     async def get_decision_document(self, karar_id: str, page_number: int = 1) -> RekabetDocument:
         if not karar_id:
              return RekabetDocument(
@@ -314,6 +405,11 @@ class RekabetKurumuApiClient:
 
         decision_url_path = f"{self.DECISION_LANDING_PATH_TEMPLATE}?kararId={karar_id}"
         full_landing_page_url = urljoin(self.BASE_URL, decision_url_path)
+        document_cache_key = f"{karar_id}:{page_number}"
+
+        cached_document = await get_document_cache().aget("rekabet", document_cache_key)
+        if cached_document is not None:
+            return RekabetDocument(**cached_document)
         
         logger.info(f"RekabetKurumuApiClient: Getting decision document: {full_landing_page_url}, Requested PDF Page: {page_number}")
 
@@ -324,48 +420,27 @@ class RekabetKurumuApiClient:
         total_pdf_pages: int = 0
         
         try:
-            async with self.http_client.stream("GET", full_landing_page_url) as response:
-                response.raise_for_status()
-                content_type = response.headers.get("content-type", "").lower()
-                final_url_of_response = HttpUrl(str(response.url))
-                original_pdf_bytes: Optional[bytes] = None
-
-                if "application/pdf" in content_type:
-                    logger.info(f"URL {final_url_of_response} is a direct PDF. Processing content.")
-                    pdf_url_to_report = final_url_of_response
-                    original_pdf_bytes = await response.aread()
-                elif "text/html" in content_type:
-                    logger.info(f"URL {final_url_of_response} is an HTML landing page. Looking for PDF link.")
-                    landing_page_html_bytes = await response.aread()
-                    detected_charset = response.charset_encoding or 'utf-8'
-                    try: landing_page_html = landing_page_html_bytes.decode(detected_charset)
-                    except UnicodeDecodeError: landing_page_html = landing_page_html_bytes.decode('utf-8', errors='replace')
-
-                    if landing_page_html.strip():
-                        landing_page_data = self._extract_pdf_url_and_landing_page_metadata(karar_id, landing_page_html, str(final_url_of_response))
-                        pdf_url_str_from_html = landing_page_data.get("pdf_url")
-                        if landing_page_data.get("title_on_landing_page"): title_to_report = landing_page_data.get("title_on_landing_page")
-                        if pdf_url_str_from_html:
-                            pdf_url_to_report = HttpUrl(pdf_url_str_from_html)
-                            original_pdf_bytes = await self._download_pdf_bytes(str(pdf_url_to_report))
-                        else: error_message = (error_message or "") + " PDF URL not found on HTML landing page."
-                    else: error_message = "Decision landing page content is empty."
-                else: error_message = f"Unexpected content type ({content_type}) for URL: {final_url_of_response}"
-
-                if original_pdf_bytes:
-                    single_page_pdf_bytes, total_pdf_pages_from_extraction = self._extract_single_pdf_page_as_pdf_bytes(original_pdf_bytes, page_number)
-                    total_pdf_pages = total_pdf_pages_from_extraction 
-
-                    if single_page_pdf_bytes:
-                        markdown_for_requested_page = self._convert_pdf_bytes_to_markdown(single_page_pdf_bytes, str(pdf_url_to_report or full_landing_page_url))
-                        if not markdown_for_requested_page:
+            decision_pdf = await self._load_decision_pdf(karar_id)
+            pdf_url_to_report = decision_pdf["pdf_url"]
+            title_to_report = decision_pdf["title"]
+            error_message = decision_pdf["error_message"]
+            total_pdf_pages = len(decision_pdf["page_pdfs"])
+
+            if total_pdf_pages > 0:
+                if 0 < page_number <= total_pdf_pages:
+                    markdown_for_requested_page = decision_pdf["page_markdown"].get(page_number)
+                    if markdown_for_requested_page is None:
+                        markdown_for_requested_page = await get_conversion_executor().run(
+                            RekabetKurumuApiClient._convert_pdf_bytes_to_markdown,
+                            decision_pdf["page_pdfs"][page_number - 1], str(pdf_url_to_report or full_landing_page_url))
+                        if markdown_for_requested_page:
+                            decision_pdf["page_markdown"][page_number] = markdown_for_requested_page
+                            self.pdf_cache.set(karar_id, decision_pdf, self._decision_pdf_size(decision_pdf))
+                        else:
                             error_message = (error_message or "") + f"; Could not convert page {page_number} of PDF to Markdown."
-                    elif total_pdf_pages > 0 : 
-                        error_message = (error_message or "") + f"; Could not extract page {page_number} from PDF (page may be out of range or extraction failed)."
-                    else: 
-                         error_message = (error_message or "") + "; PDF could not be processed or page count was zero (original PDF might be invalid)."
-                elif not error_message: 
-                    error_message = "PDF content could not be downloaded or identified."
+                else:
+                    logger.warning(f"Requested page number ({page_number}) is out of PDF page range (1-{total_pdf_pages}).")
+                    error_message = (error_message or "") + f"; Could not extract page {page_number} from PDF (page may be out of range or extraction failed)."
             
             is_paginated = total_pdf_pages > 1
             current_page_final = page_number
@@ -380,12 +455,16 @@ class RekabetKurumuApiClient:
                  error_message = (error_message or "") + "; Failed to produce Markdown from PDF page."
 
 
-            return RekabetDocument(
+            document = RekabetDocument(
                 source_landing_page_url=full_landing_page_url, karar_id=karar_id,
                 title_on_landing_page=title_to_report, pdf_url=pdf_url_to_report,
                 markdown_chunk=markdown_for_requested_page, current_page=current_page_final,
                 total_pages=total_pdf_pages, is_paginated=is_paginated,
                 error_message=error_message.strip("; ") if error_message else None )
+            if markdown_for_requested_page and not document.error_message:
+                await get_document_cache().aset("rekabet", document_cache_key, document.model_dump(mode="json"),
+                                         metadata={"karar_id": karar_id, "page_number": page_number})
+            return document
 
         except httpx.HTTPStatusError as e: error_msg_detail = f"HTTP Status error {e.response.status_code} while processing decision page."
         except httpx.RequestError as e: error_msg_detail = f"HTTP Request error while processing decision page: {str(e)}"
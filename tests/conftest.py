@@ -0,0 +1,44 @@
+# tests/conftest.py
+# Shared fixtures: a controllable clock so the upstream state machines can be tested without real waits.
+
+import asyncio
+
+import pytest
+
+
+class FakeClock:
+    """Stands in for the `time` module; asyncio.sleep through `sleep` advances it instead of waiting."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    perf_counter = monotonic
+    time = monotonic
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    async def sleep(self, delay: float):
+        if delay > 0:
+            self.sleeps.append(delay)
+            self.now += delay
+        await _real_sleep(0)
+
+
+_real_sleep = asyncio.sleep
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A FakeClock that replaces time.* and asyncio.sleep inside common_mcp_module."""
+    from common_mcp_module import breaker, limiter, retry
+
+    fake = FakeClock()
+    for module in (breaker, limiter, retry):
+        monkeypatch.setattr(module, "time", fake)
+    monkeypatch.setattr(asyncio, "sleep", fake.sleep)
+    return fake
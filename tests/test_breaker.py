@@ -0,0 +1,157 @@
+# tests/test_breaker.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from common_mcp_module.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry, CircuitBreakerTransport, CircuitOpenError
+
+REQUEST = httpx.Request("GET", "https://example.org/")
+
+
+def open_breaker(threshold=3, cooldown=30.0):
+    breaker = CircuitBreaker("example.org", failure_threshold=threshold, cooldown=cooldown)
+    for _ in range(threshold):
+        assert breaker.before_request(REQUEST) is False
+        breaker.record_failure("HTTP 503")
+    return breaker
+
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("example.org", failure_threshold=3)
+    breaker.record_failure("ConnectError")
+    breaker.record_failure("ConnectError")
+    assert breaker.state == CLOSED
+    breaker.record_failure("ReadTimeout")
+    assert breaker.state == OPEN
+    assert breaker.stats()["last_failure"] == "ReadTimeout"
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker("example.org", failure_threshold=3)
+    breaker.record_failure("HTTP 503")
+    breaker.record_failure("HTTP 503")
+    breaker.record_success()
+    breaker.record_failure("HTTP 503")
+    breaker.record_failure("HTTP 503")
+    assert breaker.state == CLOSED
+
+
+def test_open_circuit_fails_fast_until_cooldown(clock):
+    breaker = open_breaker(cooldown=30.0)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(REQUEST)
+    clock.advance(20.0)
+    assert breaker.retry_in() == 10.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(REQUEST)
+    assert breaker.stats()["rejected"] == 2
+
+
+def test_one_probe_after_cooldown(clock):
+    breaker = open_breaker(cooldown=30.0)
+    clock.advance(30.0)
+    assert breaker.before_request(REQUEST) is True
+    assert breaker.state == HALF_OPEN
+    # Everything else keeps failing fast while the probe is out
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request(REQUEST)
+    assert breaker.stats()["probes"] == 1
+
+
+def test_probe_success_closes(clock):
+    breaker = open_breaker()
+    clock.advance(30.0)
+    probe = breaker.before_request(REQUEST)
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert breaker.before_request(REQUEST) is False
+
+
+def test_probe_failure_reopens_for_another_cooldown(clock):
+    breaker = open_breaker(cooldown=30.0)
+    clock.advance(30.0)
+    probe = breaker.before_request(REQUEST)
+    breaker.record_failure("HTTP 502", probe)
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == 30.0
+    assert breaker.stats()["opened"] == 2
+
+
+def test_straggler_success_does_not_close_a_half_open_circuit(clock):
+    breaker = open_breaker()
+    clock.advance(30.0)
+    probe = breaker.before_request(REQUEST)
+    breaker.record_success(probe=False) # Admitted before the circuit opened
+    assert breaker.state == HALF_OPEN
+    breaker.record_failure("ReadTimeout", probe)
+    assert breaker.state == OPEN
+
+
+def test_abandoned_probe_lets_the_next_request_probe(clock):
+    breaker = open_breaker()
+    clock.advance(30.0)
+    probe = breaker.before_request(REQUEST)
+    breaker.record_abandoned(probe)
+    assert breaker.state == HALF_OPEN
+    assert breaker.before_request(REQUEST) is True
+
+
+def test_transport_feeds_the_breaker(clock):
+    outcomes = [httpx.Response(503), httpx.Response(503), httpx.Response(404)]
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return outcomes[len(calls) - 1]
+
+    registry = CircuitBreakerRegistry()
+    transport = CircuitBreakerTransport("test", httpx.MockTransport(handler), registry)
+    breaker = registry.for_host("example.org")
+    breaker.failure_threshold = 2
+
+    async def get():
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.get("https://example.org/")
+
+    async def scenario():
+        await get()
+        await get()
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpenError):
+            await get()
+        assert len(calls) == 2 # The open circuit did not reach the upstream
+
+        clock.advance(breaker.cooldown)
+        assert (await get()).status_code == 404 # A 4xx is an answer: the host is up
+        assert breaker.state == CLOSED
+
+    asyncio.run(scenario())
+    assert registry.stats()["degraded"] == []
+
+
+@pytest.mark.parametrize("error, counted", [
+    (httpx.ConnectError("refused"), True),
+    (httpx.ReadTimeout("slow"), True),
+    (httpx.PoolTimeout("local pool busy"), False),
+])
+def test_transport_errors(clock, error, counted):
+    def handler(request):
+        raise error
+
+    registry = CircuitBreakerRegistry()
+    transport = CircuitBreakerTransport("test", httpx.MockTransport(handler), registry)
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=transport) as client:
+            with pytest.raises(type(error)):
+                await client.get("https://example.org/")
+
+    asyncio.run(scenario())
+    assert registry.for_host("example.org").stats()["consecutive_failures"] == (1 if counted else 0)
+
+
+def test_circuit_open_error_is_a_request_error():
+    # The clients catch httpx.RequestError; an open circuit must go down the same path
+    assert issubclass(CircuitOpenError, httpx.RequestError)
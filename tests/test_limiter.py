@@ -0,0 +1,193 @@
+# tests/test_limiter.py
+
+import asyncio
+
+import httpx
+import pytest
+
+from common_mcp_module.limiter import HostLimiter, LimitedTransport, UpstreamLimiterRegistry, retry_after_seconds
+
+
+def ok():
+    return httpx.Response(200)
+
+
+def test_limit_grows_by_one_per_limit_successes(clock):
+    limiter = HostLimiter("example.org", max_in_flight=16, rate=0)
+    limiter.limit = 4.0
+    for _ in range(4):
+        limiter.release(response=ok(), latency=0.1)
+    assert int(limiter.limit) == 4
+    limiter.release(response=ok(), latency=0.1)
+    assert int(limiter.limit) == 5
+
+
+def test_limit_is_capped_at_max_in_flight(clock):
+    limiter = HostLimiter("example.org", max_in_flight=2, rate=0)
+    for _ in range(10):
+        limiter.release(response=ok(), latency=0.1)
+    assert limiter.limit == 2.0
+
+
+def test_throttled_response_halves_limit_once_per_cooldown(clock):
+    limiter = HostLimiter("example.org", max_in_flight=16, min_in_flight=3, rate=0)
+    limiter.release(response=httpx.Response(503))
+    assert limiter.limit == 8.0
+    # Responses to requests sent before the decrease do not cut it again
+    limiter.release(response=httpx.Response(502))
+    assert limiter.limit == 8.0
+    clock.advance(1.0)
+    limiter.release(response=httpx.Response(429))
+    assert limiter.limit == 4.0
+    clock.advance(1.0)
+    limiter.release(response=httpx.Response(500))
+    assert limiter.limit == 3.0 # min_in_flight
+    assert limiter.stats()["throttled"] == 4
+
+
+def test_retry_after_pauses_new_requests(clock):
+    limiter = HostLimiter("example.org", rate=0)
+    limiter.release(response=httpx.Response(429, headers={"Retry-After": "2"}))
+    assert limiter.stats()["paused_seconds"] == 2.0
+
+    asyncio.run(limiter.acquire())
+    assert clock.sleeps == [2.0]
+
+
+def test_retry_after_seconds_is_capped():
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "3600"})) == 60.0
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "soon"})) is None
+    assert retry_after_seconds(httpx.Response(429)) is None
+
+
+@pytest.mark.parametrize("error, decreased", [
+    (httpx.ReadTimeout("slow"), True),
+    (httpx.ConnectError("refused"), True),
+    (httpx.PoolTimeout("local pool busy"), False),
+    (asyncio.CancelledError(), False),
+])
+def test_errors_that_decrease_the_limit(clock, error, decreased):
+    limiter = HostLimiter("example.org", max_in_flight=16, rate=0)
+    limiter.release(error=error)
+    assert limiter.limit == (8.0 if decreased else 16.0)
+
+
+def test_latency_spike_decreases_after_warmup(clock):
+    limiter = HostLimiter("example.org", max_in_flight=16, rate=0, latency_spike_factor=3.0)
+    limiter.limit = 10.0
+    limiter.release(response=ok(), latency=5.0) # A slow first sample only starts the average
+    limiter.limit = 10.0
+    for _ in range(9):
+        limiter.release(response=ok(), latency=1.0)
+    grown = limiter.limit
+    assert grown > 10.0
+    limiter.release(response=ok(), latency=10.0)
+    assert limiter.limit == grown * 0.5
+
+
+def test_token_bucket_spaces_requests_after_burst(clock):
+    limiter = HostLimiter("example.org", rate=2.0, burst=2.0)
+
+    async def scenario():
+        for _ in range(3):
+            await limiter.acquire()
+
+    asyncio.run(scenario())
+    assert clock.sleeps == [0.5]
+
+    # Idle time refills the bucket, up to the burst
+    clock.advance(10.0)
+    clock.sleeps.clear()
+    asyncio.run(scenario())
+    assert clock.sleeps == [0.5]
+
+
+def test_waiters_are_admitted_in_order(clock):
+    limiter = HostLimiter("example.org", max_in_flight=1, rate=0)
+    admitted = []
+
+    async def request(name):
+        await limiter.acquire()
+        admitted.append(name)
+
+    async def scenario():
+        await limiter.acquire()
+        tasks = [asyncio.create_task(request(name)) for name in "abc"]
+        await asyncio.sleep(0)
+        assert limiter.waiting == 3
+        for _ in tasks:
+            limiter.release(response=ok())
+            await asyncio.sleep(0)
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+    assert admitted == ["a", "b", "c"]
+
+
+def test_woken_waiter_beaten_to_the_slot_keeps_its_place(clock):
+    limiter = HostLimiter("example.org", max_in_flight=1, rate=0)
+    admitted = []
+
+    async def request(name):
+        await limiter.acquire()
+        admitted.append(name)
+
+    async def scenario():
+        await limiter.acquire()
+        first = asyncio.create_task(request("first"))
+        await asyncio.sleep(0)
+        late = asyncio.create_task(request("late")) # Queues before "first" gets to run again
+        limiter.release(response=ok()) # Wakes "first"...
+        await limiter.acquire() # ...but this request takes the free slot without waiting
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert admitted == [] and limiter.waiting == 2
+        limiter.release(response=ok())
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert admitted == ["first"]
+        limiter.release(response=ok())
+        await asyncio.gather(first, late)
+
+    asyncio.run(scenario())
+    assert admitted == ["first", "late"]
+
+
+def test_cancelled_waiter_leaves_the_queue(clock):
+    limiter = HostLimiter("example.org", max_in_flight=1, rate=0)
+
+    async def scenario():
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert limiter.waiting == 0
+
+    asyncio.run(scenario())
+
+
+def test_limited_transport_raises_pool_timeout_when_queue_wait_runs_out(clock):
+    registry = UpstreamLimiterRegistry()
+    transport = LimitedTransport("test", httpx.MockTransport(lambda request: httpx.Response(200)), registry)
+    limiter = registry.for_host("example.org")
+    limiter.limit = 1.0
+
+    async def scenario():
+        await limiter.acquire() # Hold the only slot
+        async with httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(5.0, pool=0.01)) as client:
+            with pytest.raises(httpx.PoolTimeout):
+                await client.get("https://example.org/")
+        limiter.release(response=ok())
+        async with httpx.AsyncClient(transport=transport) as client:
+            response = await client.get("https://example.org/")
+        assert response.status_code == 200
+
+    asyncio.run(scenario())
+    stats = limiter.stats()
+    assert stats["queue_timeouts"] == 1
+    assert stats["in_flight"] == 0
+    assert stats["waiting"] == 0
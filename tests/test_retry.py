@@ -0,0 +1,143 @@
+# tests/test_retry.py
+
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from common_mcp_module.retry import READ_ONLY, RetryPolicy, RetryTransport, is_retryable_request
+
+
+@pytest.fixture(autouse=True)
+def longest_backoff(monkeypatch):
+    """Full jitter always picks the upper bound, so delays are predictable."""
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+
+
+def send(policy, outcomes, method="GET", **kwargs):
+    """Sends one request through a RetryTransport whose upstream answers with `outcomes` in turn."""
+    calls = []
+
+    def handler(request):
+        outcome = outcomes[min(len(calls), len(outcomes) - 1)]
+        calls.append(request)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def scenario():
+        transport = RetryTransport("test", httpx.MockTransport(handler), policy)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.request(method, "https://example.org/search", **kwargs)
+
+    return asyncio.run(scenario()), calls
+
+
+async def _chunks():
+    yield b"q=1"
+
+
+@pytest.mark.parametrize("request_, retryable", [
+    (httpx.Request("GET", "https://example.org/"), True),
+    (httpx.Request("POST", "https://example.org/", data={"q": "1"}), False),
+    (httpx.Request("POST", "https://example.org/", data={"q": "1"}, extensions=READ_ONLY), True),
+    (httpx.Request("POST", "https://example.org/", json={"q": "1"}, extensions=READ_ONLY), True),
+    (httpx.Request("POST", "https://example.org/", content=_chunks(), extensions=READ_ONLY), False),
+    (httpx.Request("PUT", "https://example.org/", content=b"{}"), False),
+    (httpx.Request("DELETE", "https://example.org/"), False),
+    (httpx.Request("PUT", "https://example.org/", content=b"{}", extensions=READ_ONLY), True),
+    (httpx.Request("HEAD", "https://example.org/"), True),
+])
+def test_is_retryable_request(request_, retryable):
+    assert is_retryable_request(request_) is retryable
+
+
+def test_delay_uses_exponential_backoff_capped_at_max():
+    policy = RetryPolicy(backoff=0.5, max_backoff=3.0)
+    assert [policy.delay(attempt) for attempt in range(1, 5)] == [0.5, 1.0, 2.0, 3.0]
+
+
+def test_delay_honours_a_longer_retry_after():
+    policy = RetryPolicy(backoff=0.5)
+    assert policy.delay(1, httpx.Response(429, headers={"Retry-After": "4"})) == 4.0
+    assert policy.delay(3, httpx.Response(503, headers={"Retry-After": "1"})) == 2.0
+
+
+def test_retries_retryable_status_until_success(clock):
+    response, calls = send(RetryPolicy(attempts=3, backoff=0.5), [httpx.Response(503), httpx.Response(502), httpx.Response(200)])
+    assert response.status_code == 200
+    assert len(calls) == 3
+    assert clock.sleeps == [0.5, 1.0]
+
+
+def test_returns_last_response_when_attempts_run_out(clock):
+    response, calls = send(RetryPolicy(attempts=3, backoff=0.5), [httpx.Response(503, text="down")])
+    assert response.status_code == 503
+    assert response.text == "down"
+    assert len(calls) == 3
+
+
+def test_other_statuses_are_not_retried(clock):
+    response, calls = send(RetryPolicy(attempts=3), [httpx.Response(500), httpx.Response(200)])
+    assert response.status_code == 500
+    assert len(calls) == 1
+
+
+def test_waits_for_retry_after(clock):
+    response, calls = send(RetryPolicy(attempts=2, backoff=0.1), [httpx.Response(429, headers={"Retry-After": "5"}), httpx.Response(200)])
+    assert response.status_code == 200
+    assert clock.sleeps == [5.0]
+
+
+def test_no_retry_that_would_end_past_the_deadline(clock):
+    policy = RetryPolicy(attempts=5, backoff=1.0, deadline=2.5)
+    response, calls = send(policy, [httpx.Response(503)])
+    # Waits 1s, then 2s would end at 3s > 2.5s: gives up after the second attempt
+    assert response.status_code == 503
+    assert len(calls) == 2
+    assert clock.sleeps == [1.0]
+
+
+def test_retry_after_past_the_deadline_returns_at_once(clock):
+    policy = RetryPolicy(attempts=3, backoff=0.1, deadline=10.0)
+    response, calls = send(policy, [httpx.Response(503, headers={"Retry-After": "30"}), httpx.Response(200)])
+    assert response.status_code == 503
+    assert len(calls) == 1
+    assert clock.sleeps == []
+
+
+def test_retries_connection_errors_and_reraises_the_last(clock):
+    response, calls = send(RetryPolicy(attempts=2, backoff=0.1), [httpx.ConnectError("refused"), httpx.Response(200)])
+    assert response.status_code == 200
+
+    with pytest.raises(httpx.ReadTimeout):
+        send(RetryPolicy(attempts=2, backoff=0.1), [httpx.ConnectError("refused"), httpx.ReadTimeout("slow")])
+
+
+def test_pool_timeout_is_not_retried(clock):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.PoolTimeout("local pool busy")
+
+    async def scenario():
+        transport = RetryTransport("test", httpx.MockTransport(handler), RetryPolicy(attempts=3))
+        async with httpx.AsyncClient(transport=transport) as client:
+            await client.get("https://example.org/")
+
+    with pytest.raises(httpx.PoolTimeout):
+        asyncio.run(scenario())
+    assert len(calls) == 1
+
+
+def test_post_is_retried_only_when_read_only(clock):
+    outcomes = [httpx.Response(503), httpx.Response(200)]
+    response, calls = send(RetryPolicy(attempts=3, backoff=0.1), outcomes, method="POST", data={"q": "1"})
+    assert response.status_code == 503
+    assert len(calls) == 1
+
+    response, calls = send(RetryPolicy(attempts=3, backoff=0.1), outcomes, method="POST", data={"q": "1"}, extensions=READ_ONLY)
+    assert response.status_code == 200
+    assert [request.content for request in calls] == [b"q=1", b"q=1"]
@@ -1,16 +1,11 @@
 # uyusmazlik_mcp_module/client.py
 
 import httpx 
-import aiohttp 
-from bs4 import BeautifulSoup
 from typing import Dict, Any, List, Optional, Union, Tuple 
 import logging
 import html
 import re
-import tempfile
-import os
-from markitdown import MarkItDown
-from urllib.parse import urljoin, urlencode # urlencode for aiohttp form data
+from urllib.parse import urljoin, urlencode
 
 from .models import (
     UyusmazlikSearchRequest,
@@ -21,6 +16,14 @@ from .models import (
     UyusmazlikTuruEnum,
     UyusmazlikKararSonucuEnum
 )
+from common_mcp_module.cache import get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.parsing import only, parse_html
+from common_mcp_module.retry import READ_ONLY
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import get_transport_registry
 
 logger = logging.getLogger(__name__)
 if not logger.hasHandlers():
@@ -54,20 +57,48 @@ class UyusmazlikApiClient:
     SEARCH_ENDPOINT = "/Arama/Search" 
     # Individual documents are fetched by their full URLs obtained from search results.
 
-    def __init__(self, request_timeout: float = 30.0):
-        self.request_timeout = request_timeout # Store timeout for aiohttp and httpx
-        # Headers for aiohttp search. httpx for docs will create its own.
-        self.default_aiohttp_search_headers = {
+    def __init__(
+        self,
+        request_timeout: float = 30.0,
+        max_connections: Optional[int] = None,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: Optional[float] = None
+    ):
+        self.request_timeout = request_timeout
+        # Keep-alive limits of the pool; unset values come from the transport registry (YARGI_HTTP_UYUSMAZLIK_*)
+        registry_limits = get_transport_registry().limits_for("uyusmazlik")
+        self.pool_limits = httpx.Limits(
+            max_connections=max_connections if max_connections is not None else registry_limits.max_connections,
+            max_keepalive_connections=max_keepalive_connections if max_keepalive_connections is not None else registry_limits.max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry if keepalive_expiry is not None else registry_limits.keepalive_expiry
+        )
+        # Search is an AJAX form post; document pages are plain GETs on the same host.
+        # Accept-Encoding is left to httpx so only encodings it can decode are advertised.
+        self.default_search_headers = {
             "Accept": "*/*", # Mimicking browser headers provided by user
-            "Accept-Encoding": "gzip, deflate, br, zstd",
-            "Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7",
             "X-Requested-With": "XMLHttpRequest",
             "Origin": self.BASE_URL,
             "Referer": self.BASE_URL + "/",
-
+            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8"
         }
+        self._http_client: Optional[httpx.AsyncClient] = None
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Returns the pooled HTTP client shared by searches and document fetches, creating it on first use."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = get_transport_registry().create_client(
+                "uyusmazlik",
+                base_url=self.BASE_URL,
+                headers={"Accept-Language": "tr-TR,tr;q=0.9,en-US;q=0.8,en;q=0.7"},
+                limits=self.pool_limits,
+                timeout=self.request_timeout,
+                verify=False # SSL verification disabled as per original user code - use with caution
+            )
+        return self._http_client
 
 
+    @cache_search("uyusmazlik.search", keyword_fields=("icerik", "tumce", "wild_card", "hepsi", "herhangi_birisi", "not_hepsi"))
+    @coalesce("uyusmazlik.search")
     async def search_decisions(
         self,
         params: UyusmazlikSearchRequest
@@ -106,36 +137,37 @@ class UyusmazlikApiClient:
         add_to_form_data("Hepsi", params.hepsi)
         add_to_form_data("Herhangibirisi", params.herhangi_birisi)
         add_to_form_data("NotHepsi", params.not_hepsi)
-        # X-Requested-With is handled by default_aiohttp_search_headers
+        # X-Requested-With is handled by default_search_headers
 
         search_url = urljoin(self.BASE_URL, self.SEARCH_ENDPOINT)
-        # For aiohttp, data for application/x-www-form-urlencoded should be a dict or str.
-        # Using urlencode for list of tuples.
+        # The form repeats keys (KararSonucuList), so the list of tuples is encoded explicitly.
         encoded_form_payload = urlencode(form_data_list, encoding='UTF-8') 
 
-        logger.info(f"UyusmazlikApiClient (aiohttp): Performing search to {search_url} with form_data: {encoded_form_payload}")
+        logger.info(f"UyusmazlikApiClient: Performing search to {search_url} with form_data: {encoded_form_payload}")
         
         html_content = ""
-        aiohttp_headers = self.default_aiohttp_search_headers.copy()
-        aiohttp_headers["Content-Type"] = "application/x-www-form-urlencoded; charset=UTF-8"
-
         try:
-            # Create a new session for each call for simplicity with aiohttp here
-            async with aiohttp.ClientSession(headers=aiohttp_headers) as session:
-                async with session.post(search_url, data=encoded_form_payload, timeout=self.request_timeout) as response:
-                    response.raise_for_status() # Raises ClientResponseError for 400-599
-                    html_content = await response.text(encoding='utf-8') # Ensure correct encoding
-                    logger.debug("UyusmazlikApiClient (aiohttp): Received HTML response for search.")
+            response = await self._get_http_client().post(
+                self.SEARCH_ENDPOINT,
+                content=encoded_form_payload.encode("utf-8"),
+                headers=self.default_search_headers,
+                extensions=READ_ONLY
+            )
+            response.raise_for_status()
+            response.encoding = "utf-8" # Ensure correct encoding
+            html_content = response.text
+            logger.debug("UyusmazlikApiClient: Received HTML response for search.")
         
-        except aiohttp.ClientError as e:
-            logger.error(f"UyusmazlikApiClient (aiohttp): HTTP client error during search: {e}")
+        except httpx.HTTPError as e:
+            logger.error(f"UyusmazlikApiClient: HTTP client error during search: {e}")
             raise # Re-raise to be handled by the MCP tool
         except Exception as e:
-            logger.error(f"UyusmazlikApiClient (aiohttp): Error processing search request: {e}")
+            logger.error(f"UyusmazlikApiClient: Error processing search request: {e}")
             raise
 
         # --- HTML Parsing (remains the same as previous version) ---
-        soup = BeautifulSoup(html_content, 'html.parser')
+        # Only the result table and the record count label are built into the tree
+        soup = parse_html(html_content, only("table.table-hover", "div.label-important"))
         total_records_text_div = soup.find("div", class_="pull-right label label-important")
         total_records = None
         if total_records_text_div:
@@ -184,7 +216,8 @@ class UyusmazlikApiClient:
             total_records_found=total_records
         )
 
-    def _convert_html_to_markdown_uyusmazlik(self, full_decision_html_content: str) -> Optional[str]:
+    @staticmethod
+    def _convert_html_to_markdown_uyusmazlik(full_decision_html_content: str) -> Optional[str]:
         """Converts direct HTML content (from an Uyuşmazlık decision page) to Markdown."""
         if not full_decision_html_content: 
             return None
@@ -194,33 +227,26 @@ class UyusmazlikApiClient:
         html_input_for_markdown = processed_html
 
         markdown_text = None
-        temp_file_path = None
         try:
-            md_converter = MarkItDown()
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_file:
-                tmp_file.write(html_input_for_markdown)
-                temp_file_path = tmp_file.name
-            
-            conversion_result = md_converter.convert(temp_file_path)
-            markdown_text = conversion_result.text_content
+            markdown_text = convert_html_to_markdown(html_input_for_markdown)
             logger.info("UyusmazlikApiClient: HTML to Markdown conversion successful.")
         except Exception as e:
             logger.error(f"UyusmazlikApiClient: Error during MarkItDown HTML to Markdown conversion: {e}")
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
         return markdown_text
 
+    @coalesce("uyusmazlik.document")
     async def get_decision_document_as_markdown(self, document_url: str) -> UyusmazlikDocumentMarkdown:
         """
         Retrieves a specific Uyuşmazlık decision from its full URL and returns content as Markdown.
         """
-        logger.info(f"UyusmazlikApiClient (httpx for docs): Fetching Uyuşmazlık document for Markdown from URL: {document_url}")
-        try:
-            # Using a new httpx.AsyncClient instance for this GET request for simplicity
-            async with httpx.AsyncClient(verify=False, timeout=self.request_timeout) as doc_fetch_client:
+        cached_document = await get_document_cache().aget("uyusmazlik", document_url)
+        if cached_document is not None:
+            return UyusmazlikDocumentMarkdown(**cached_document)
 
-                 get_response = await doc_fetch_client.get(document_url, headers={"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"})
+        logger.info(f"UyusmazlikApiClient: Fetching Uyuşmazlık document for Markdown from URL: {document_url}")
+        try:
+            # Reuses the pooled connection opened by the preceding search
+            get_response = await self._get_http_client().get(document_url, headers={"Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8"})
             get_response.raise_for_status()
             html_content_from_api = get_response.text
 
@@ -228,15 +254,21 @@ class UyusmazlikApiClient:
                 logger.warning(f"UyusmazlikApiClient: Received empty or non-string HTML from URL {document_url}.")
                 return UyusmazlikDocumentMarkdown(source_url=document_url, markdown_content=None)
 
-            markdown_content = self._convert_html_to_markdown_uyusmazlik(html_content_from_api)
-            return UyusmazlikDocumentMarkdown(source_url=document_url, markdown_content=markdown_content)
+            markdown_content = await get_conversion_executor().run(UyusmazlikApiClient._convert_html_to_markdown_uyusmazlik, html_content_from_api)
+            document = UyusmazlikDocumentMarkdown(source_url=document_url, markdown_content=markdown_content)
+            if markdown_content:
+                await get_document_cache().aset("uyusmazlik", document_url, document.model_dump(mode="json"), metadata={"source_url": document_url})
+            return document
         except httpx.RequestError as e:
-            logger.error(f"UyusmazlikApiClient (httpx for docs): HTTP error fetching Uyuşmazlık document from {document_url}: {e}")
+            logger.error(f"UyusmazlikApiClient: HTTP error fetching Uyuşmazlık document from {document_url}: {e}")
             raise
         except Exception as e:
-            logger.error(f"UyusmazlikApiClient (httpx for docs): General error processing Uyuşmazlık document from {document_url}: {e}")
+            logger.error(f"UyusmazlikApiClient: General error processing Uyuşmazlık document from {document_url}: {e}")
             raise
 
     async def close_client_session(self):
-
-        logger.info("UyusmazlikApiClient: No persistent client session from __init__ to close.")
\ No newline at end of file
+        """Closes the pooled HTTPX client if it was created."""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+            logger.info("UyusmazlikApiClient: HTTP client session closed.")
+        self._http_client = None
\ No newline at end of file
@@ -2,13 +2,10 @@
 
 import httpx
 from bs4 import BeautifulSoup # Still needed for pre-processing HTML before markitdown
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, List, Optional
 import logging
 import html
 import re
-import tempfile
-import os
-from markitdown import MarkItDown
 
 from .models import (
     YargitayDetailedSearchRequest,
@@ -17,6 +14,15 @@ from .models import (
     YargitayDocumentMarkdown,     
     CompactYargitaySearchResult 
 )
+from common_mcp_module.cache import get_document_cache
+from common_mcp_module.coalescing import coalesce
+from common_mcp_module.conversion import convert_html_to_markdown
+from common_mcp_module.executor import get_conversion_executor
+from common_mcp_module.metrics import phase_timer
+from common_mcp_module.pagination import DEFAULT_MAX_RESULTS, PageCallback, SearchPage, iter_search_results
+from common_mcp_module.retry import READ_ONLY
+from common_mcp_module.search_cache import cache_search
+from common_mcp_module.transport import create_http_client
 
 logger = logging.getLogger(__name__)
 # Basic logging configuration if no handlers are configured
@@ -33,9 +39,11 @@ class YargitayOfficialApiClient:
     # This should be confirmed with the actual API.
     DETAILED_SEARCH_ENDPOINT = "/aramadetaylist" 
     DOCUMENT_ENDPOINT = "/getDokuman"
+    MAX_PAGE_SIZE = 100 # Largest pageSize the search endpoint accepts
 
     def __init__(self, request_timeout: float = 60.0):
-        self.http_client = httpx.AsyncClient(
+        self.http_client = create_http_client(
+            "yargitay",
             base_url=self.BASE_URL,
             headers={
                 "Content-Type": "application/json; charset=UTF-8",
@@ -48,6 +56,8 @@ class YargitayOfficialApiClient:
             verify=False # SSL verification disabled as per original user code - use with caution
         )
 
+    @cache_search("yargitay.search", keyword_fields=("arananKelime",))
+    @coalesce("yargitay.search")
     async def search_detailed_decisions(
         self, 
         search_params: YargitayDetailedSearchRequest
@@ -62,12 +72,14 @@ class YargitayOfficialApiClient:
         logger.info(f"YargitayOfficialApiClient: Performing detailed search with payload: {request_payload}")
 
         try:
-            response = await self.http_client.post(self.DETAILED_SEARCH_ENDPOINT, json=request_payload)
+            response = await self.http_client.post(self.DETAILED_SEARCH_ENDPOINT, json=request_payload, extensions=READ_ONLY)
             response.raise_for_status() # Raise an exception for HTTP 4xx or 5xx status codes
-            response_json_data = response.json()
+            with phase_timer("parse"):
+                response_json_data = response.json()
             
             # Validate and parse the response using Pydantic models
-            api_response = YargitayApiSearchResponse(**response_json_data)
+            with phase_timer("validate"):
+                api_response = YargitayApiSearchResponse(**response_json_data)
 
             # Populate the document_url for each decision entry
             if api_response.data and api_response.data.data:
@@ -83,7 +95,30 @@ class YargitayOfficialApiClient:
             logger.error(f"YargitayOfficialApiClient: Error processing or validating detailed search response: {e}")
             raise
 
-    def _convert_html_to_markdown(self, html_from_api_data_field: str) -> Optional[str]:
+    def iter_search(
+        self,
+        search_params: YargitayDetailedSearchRequest,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        on_page: Optional[PageCallback] = None
+    ) -> AsyncIterator[YargitayApiDecisionEntry]:
+        """
+        Yields up to max_results decisions matching search_params, fetching pages of the
+        largest allowed size from page 1 (the pageSize/pageNumber of search_params are
+        ignored) and prefetching the next page while the current one is consumed.
+        """
+        page_size = min(self.MAX_PAGE_SIZE, max(1, max_results))
+
+        async def fetch_page(page_number: int) -> SearchPage:
+            response = await self.search_detailed_decisions(
+                search_params.model_copy(update={"pageSize": page_size, "pageNumber": page_number}))
+            if not response.data:
+                return SearchPage([], 0)
+            return SearchPage(response.data.data, response.data.recordsTotal)
+
+        return iter_search_results(fetch_page, max_results, page_size, on_page)
+
+    @staticmethod
+    def _convert_html_to_markdown(html_from_api_data_field: str) -> Optional[str]:
         """
         Takes raw HTML string (from Yargitay API 'data' field for a document),
         pre-processes it, and converts it to Markdown using MarkItDown.
@@ -108,28 +143,16 @@ class YargitayOfficialApiClient:
         html_to_convert = processed_html
 
         markdown_output = None
-        temp_file_path = None
         try:
-            md_converter = MarkItDown() # Plugins disabled as per basic usage
-            
-            # Write the HTML to a temporary file for MarkItDown to process
-            with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".html", encoding="utf-8") as tmp_html_file:
-                tmp_html_file.write(html_to_convert)
-                temp_file_path = tmp_html_file.name
-            
-            conversion_result = md_converter.convert(temp_file_path)
-            markdown_output = conversion_result.text_content
-            
+            # Shared converter, converted from memory (no temporary file round-trip)
+            markdown_output = convert_html_to_markdown(html_to_convert)
             logger.info("Successfully converted HTML to Markdown.")
-
         except Exception as e:
             logger.error(f"Error during MarkItDown HTML to Markdown conversion: {e}")
-        finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.remove(temp_file_path) # Clean up the temporary file
         
         return markdown_output
 
+    @coalesce("yargitay.document")
     async def get_decision_document_as_markdown(self, id: str) -> YargitayDocumentMarkdown:
         """
         Retrieves a specific Yargitay decision by its ID and returns its content
@@ -138,6 +161,10 @@ class YargitayOfficialApiClient:
         """
         document_api_url = f"{self.DOCUMENT_ENDPOINT}?id={id}"
         source_url = f"{self.BASE_URL}{document_api_url}" # The original URL of the document
+        cached_document = await get_document_cache().aget("yargitay", id)
+        if cached_document is not None:
+            return YargitayDocumentMarkdown(**cached_document)
+
         logger.info(f"YargitayOfficialApiClient: Fetching document for Markdown conversion (ID: {id})")
 
         try:
@@ -145,20 +172,24 @@ class YargitayOfficialApiClient:
             response.raise_for_status()
             
             # Expecting JSON response with HTML content in the 'data' field
-            response_json = response.json()
+            with phase_timer("parse"):
+                response_json = response.json()
             html_content_from_api = response_json.get("data")
 
             if not isinstance(html_content_from_api, str):
                 logger.error(f"YargitayOfficialApiClient: 'data' field in API response is not a string or not found (ID: {id}).")
                 raise ValueError("Expected HTML content not found in API response's 'data' field.")
 
-            markdown_content = self._convert_html_to_markdown(html_content_from_api)
+            markdown_content = await get_conversion_executor().run(YargitayOfficialApiClient._convert_html_to_markdown, html_content_from_api)
 
-            return YargitayDocumentMarkdown(
+            document = YargitayDocumentMarkdown(
                 id=id,
                 markdown_content=markdown_content,
                 source_url=source_url
             )
+            if markdown_content: # Failed conversions are not cached so they can be retried
+                await get_document_cache().aset("yargitay", id, document.model_dump(mode="json"), metadata={"source_url": source_url})
+            return document
         except httpx.RequestError as e:
             logger.error(f"YargitayOfficialApiClient: HTTP error fetching document for Markdown (ID: {id}): {e}")
             raise
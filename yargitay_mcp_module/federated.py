@@ -0,0 +1,162 @@
+# yargitay_mcp_module/federated.py
+# Runs the official Yargıtay search and the Bedesten Yargıtay search together and merges them.
+
+import asyncio
+import logging
+import re
+from datetime import date, datetime
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from bedesten_mcp_module.models import BedestenDecisionEntry, BedestenSearchData, BedestenSearchRequest
+from .models import (
+    FederatedYargitayDecision,
+    FederatedYargitaySearchResult,
+    YargitayApiDecisionEntry,
+    YargitayDetailedSearchRequest
+)
+
+if TYPE_CHECKING: # The clients pull in the conversion stack; callers pass instances they already created
+    from bedesten_mcp_module.client import BedestenApiClient
+    from .client import YargitayOfficialApiClient
+
+logger = logging.getLogger(__name__)
+if not logger.hasHandlers():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+_NON_ALNUM = re.compile(r"[^0-9a-zçğıöşü]+")
+
+
+def _normalize(value: Optional[str]) -> str:
+    """Case, whitespace and punctuation insensitive form used to match the two sources' fields."""
+    if not value:
+        return ""
+    return _NON_ALNUM.sub("", value.replace("I", "ı").replace("İ", "i").lower())
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    """Parses DD.MM.YYYY (official API) or ISO 8601 (Bedesten) decision dates."""
+    if not value:
+        return None
+    for parse in (lambda v: datetime.strptime(v[:10], "%d.%m.%Y"), lambda v: datetime.fromisoformat(v.replace("Z", "+00:00"))):
+        try:
+            return parse(value.strip()).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _bedesten_date(value: str, end_of_day: bool) -> Optional[str]:
+    """DD.MM.YYYY -> the ISO 8601 form Bedesten filters expect."""
+    parsed = _parse_date(value)
+    if parsed is None:
+        return None
+    return f"{parsed.isoformat()}T23:59:59.999Z" if end_of_day else f"{parsed.isoformat()}T00:00:00.000Z"
+
+
+def _decision_key(daire: Optional[str], esas_no: Optional[str], karar_no: Optional[str]) -> Tuple[str, str, str]:
+    return (_normalize(daire), _normalize(esas_no), _normalize(karar_no))
+
+
+def merge_yargitay_results(
+    official: List[YargitayApiDecisionEntry],
+    bedesten: List[BedestenDecisionEntry]
+) -> List[FederatedYargitayDecision]:
+    """
+    Deduplicates by (daire, esasNo, kararNo) and ranks newest decision date first; on the
+    same date decisions found by both sources come first, then the better original rank.
+    """
+    merged: Dict[Tuple[str, str, str], FederatedYargitayDecision] = {}
+    ranks: Dict[Tuple[str, str, str], int] = {}
+    dates: Dict[Tuple[str, str, str], Optional[date]] = {}
+
+    for rank, entry in enumerate(official):
+        key = _decision_key(entry.daire, entry.esasNo, entry.kararNo)
+        if key in merged: # Same decision listed twice by one source
+            continue
+        merged[key] = FederatedYargitayDecision(
+            daire=entry.daire, esasNo=entry.esasNo, kararNo=entry.kararNo, kararTarihi=entry.kararTarihi,
+            sources=["yargitay"], yargitay_id=entry.id
+        )
+        ranks[key] = rank
+        dates[key] = _parse_date(entry.kararTarihi)
+
+    for rank, entry in enumerate(bedesten):
+        key = _decision_key(entry.birimAdi, entry.esasNo, entry.kararNo)
+        existing = merged.get(key)
+        if existing is not None:
+            if "bedesten" not in existing.sources:
+                existing.sources.append("bedesten")
+                existing.bedesten_document_id = entry.documentId
+                ranks[key] = min(ranks[key], rank)
+            continue
+        merged[key] = FederatedYargitayDecision(
+            daire=entry.birimAdi, esasNo=entry.esasNo, kararNo=entry.kararNo,
+            kararTarihi=entry.kararTarihiStr or entry.kararTarihi,
+            sources=["bedesten"], bedesten_document_id=entry.documentId
+        )
+        ranks[key] = rank
+        dates[key] = _parse_date(entry.kararTarihiStr) or _parse_date(entry.kararTarihi)
+
+    def sort_key(key: Tuple[str, str, str]):
+        decision_date = dates[key]
+        return (decision_date is None, -(decision_date.toordinal() if decision_date else 0), -len(merged[key].sources), ranks[key])
+
+    return [merged[key] for key in sorted(merged, key=sort_key)]
+
+
+async def search_yargitay_federated(
+    yargitay_client: "YargitayOfficialApiClient",
+    bedesten_client: "BedestenApiClient",
+    phrase: str,
+    birim: str = "",
+    baslangic_tarihi: str = "",
+    bitis_tarihi: str = "",
+    page_size: int = 10,
+    page_number: int = 1
+) -> FederatedYargitaySearchResult:
+    """
+    Searches both Yargıtay sources concurrently. If one source fails, the result holds the
+    other source's decisions and the failure is reported in `errors`.
+    """
+    official_request = YargitayDetailedSearchRequest(
+        arananKelime=phrase, birimYrgKurulDaire=birim,
+        baslangicTarihi=baslangic_tarihi, bitisTarihi=bitis_tarihi,
+        pageSize=page_size, pageNumber=page_number
+    )
+    bedesten_request = BedestenSearchRequest(data=BedestenSearchData(
+        pageSize=page_size, pageNumber=page_number, itemTypeList=["YARGITAYKARARI"],
+        phrase=phrase, birimAdi=birim or None,
+        kararTarihiStart=_bedesten_date(baslangic_tarihi, end_of_day=False),
+        kararTarihiEnd=_bedesten_date(bitis_tarihi, end_of_day=True)
+    ))
+
+    official_response, bedesten_response = await asyncio.gather(
+        yargitay_client.search_detailed_decisions(official_request),
+        bedesten_client.search_documents(bedesten_request),
+        return_exceptions=True
+    )
+
+    errors: Dict[str, str] = {}
+    total_records: Dict[str, int] = {}
+    official_entries: List[YargitayApiDecisionEntry] = []
+    bedesten_entries: List[BedestenDecisionEntry] = []
+    if isinstance(official_response, BaseException):
+        logger.warning(f"Federated Yargitay search: official API failed: {official_response}")
+        errors["yargitay"] = f"{type(official_response).__name__}: {official_response}"
+    elif official_response.data:
+        official_entries = official_response.data.data
+        total_records["yargitay"] = official_response.data.recordsTotal
+    if isinstance(bedesten_response, BaseException):
+        logger.warning(f"Federated Yargitay search: Bedesten failed: {bedesten_response}")
+        errors["bedesten"] = f"{type(bedesten_response).__name__}: {bedesten_response}"
+    else:
+        bedesten_entries = bedesten_response.data.emsalKararList
+        total_records["bedesten"] = bedesten_response.data.total
+
+    return FederatedYargitaySearchResult(
+        decisions=merge_yargitay_results(official_entries, bedesten_entries),
+        total_records=total_records,
+        errors=errors,
+        requested_page=page_number,
+        page_size=page_size
+    )
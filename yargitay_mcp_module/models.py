@@ -141,4 +141,24 @@ class CompactYargitaySearchResult(BaseModel):
     decisions: List[YargitayApiDecisionEntry]
     total_records: int
     requested_page: int
-    page_size: int
\ No newline at end of file
+    page_size: int
+
+
+class FederatedYargitayDecision(BaseModel):
+    """A Yargıtay decision found by the official API, by Bedesten, or by both."""
+    daire: Optional[str] = Field(None, description="The chamber (Daire) that made the decision.")
+    esasNo: Optional[str] = Field(None, description="Case registry number (Esas No).")
+    kararNo: Optional[str] = Field(None, description="Decision number (Karar No).")
+    kararTarihi: Optional[str] = Field(None, description="Date of the decision (Karar Tarihi), DD.MM.YYYY.")
+    sources: List[Literal["yargitay", "bedesten"]] = Field(..., description="Which sources returned this decision.")
+    yargitay_id: Optional[str] = Field(None, description="ID for get_yargitay_document_markdown, if the official API returned it.")
+    bedesten_document_id: Optional[str] = Field(None, description="documentId for get_yargitay_bedesten_document_markdown, if Bedesten returned it.")
+
+
+class FederatedYargitaySearchResult(BaseModel):
+    """Merged, deduplicated results of one page of both Yargıtay searches."""
+    decisions: List[FederatedYargitayDecision]
+    total_records: Dict[str, int] = Field(default_factory=dict, description="Total matches reported by each source.")
+    errors: Dict[str, str] = Field(default_factory=dict, description="Sources that failed; the results come from the others.")
+    requested_page: int
+    page_size: int